@@ -0,0 +1,88 @@
+"""Time the keyed comparator against the whole-tree DeepDiff engine.
+
+Each run changes, adds and removes 1% of resources. DeepDiff with
+``ignore_order`` is super-linear, so it is skipped above ``--deepdiff-max``.
+A second pass compares unchanged scans with and without scan-time digests::
+
+    python benchmarks/bench_comparator.py --sizes 1000,10000,100000
+"""
+
+import argparse
+import copy
+import time
+
+from drift_detection.comparator import DriftComparator
+from drift_detection.hashing import RESOURCE_KEYS, resource_digests
+
+TYPES = ("ec2", "rds", "lambda")
+
+
+def snapshots(size):
+    per_type = size // len(TYPES)
+    baseline = {
+        "environment": "bench",
+        "timestamp": "2024-01-01T00:00:00",
+        "resources": {
+            "ec2": [
+                {"instance_id": f"i-{i:08x}", "instance_type": "t3.micro"}
+                for i in range(per_type)
+            ],
+            "rds": [
+                {"db_instance_identifier": f"db-{i}", "db_instance_class": "db.t3"}
+                for i in range(per_type)
+            ],
+            "lambda": [
+                {"function_name": f"fn-{i}", "runtime": "python3.11"}
+                for i in range(per_type)
+            ],
+        },
+    }
+    current = copy.deepcopy(baseline)
+    current["timestamp"] = "2024-01-02T00:00:00"
+    step = 100
+    for resource_type, resources in current["resources"].items():
+        key, field = RESOURCE_KEYS[resource_type], list(resources[0])[1]
+        added = [dict(r, **{key: f"{r[key]}-new"}) for r in resources[::step]]
+        for record in resources[::step]:
+            record[field] = "changed"
+        del resources[1::step]
+        resources.extend(added)
+    return baseline, current
+
+
+def timed(engine, baseline, current):
+    start = time.perf_counter()
+    result = DriftComparator(engine=engine).compare(baseline, current)
+    elapsed = time.perf_counter() - start
+    summary = result["drift_summary"]
+    return elapsed, {kind: len(paths) for kind, paths in summary.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--deepdiff-max", type=int, default=10000)
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        baseline, current = snapshots(size)
+        for engine in ("keyed", "deepdiff"):
+            if engine == "deepdiff" and size > args.deepdiff_max:
+                print(f"{size:>7} {engine:>8}: skipped (--deepdiff-max)")
+                continue
+            elapsed, counts = timed(engine, baseline, current)
+            print(f"{size:>7} {engine:>8}: {elapsed:8.3f}s  {counts}")
+
+    print("\nno drift:")
+    for size in (int(s) for s in args.sizes.split(",")):
+        baseline, _ = snapshots(size)
+        current = copy.deepcopy(baseline)
+        plain, _ = timed("keyed", baseline, current)
+        baseline["digests"] = resource_digests(baseline["resources"])
+        current["digests"] = resource_digests(current["resources"])
+        hashed, _ = timed("keyed", baseline, current)
+        print(f"{size:>7}: {plain:8.4f}s without digests, {hashed:8.6f}s with")
+
+
+if __name__ == "__main__":
+    main()
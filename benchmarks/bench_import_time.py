@@ -0,0 +1,63 @@
+"""Measure import cost of the package and CLI with ``python -X importtime``.
+
+Reports total import time and whether heavy dependencies were loaded::
+
+    python benchmarks/bench_import_time.py --runs 5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("boto3", "botocore", "deepdiff", "structlog")
+
+SCENARIOS = {
+    "import drift_detection": ["-c", "import drift_detection"],
+    "import drift_detection.cli": ["-c", "import drift_detection.cli"],
+    "drift-detect --help": ["-m", "drift_detection.cli", "--help"],
+}
+
+
+def import_profile(args):
+    """Return (total microseconds, top-level modules imported) for one run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        if not name.startswith("  "):
+            # Only top-level entries, so nested imports are not double counted
+            total += int(cumulative)
+        modules.add(name.strip().split(".")[0])
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, scenario in SCENARIOS.items():
+        totals = []
+        for _ in range(args.runs):
+            total, modules = import_profile(scenario)
+            totals.append(total)
+        heavy = [name for name in HEAVY_MODULES if name in modules] or ["none"]
+        print(
+            f"{label:>28}: {statistics.median(totals) / 1000:7.1f} ms "
+            f"(heavy deps: {', '.join(heavy)})"
+        )
+
+
+if __name__ == "__main__":
+    main()
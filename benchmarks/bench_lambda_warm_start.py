@@ -0,0 +1,84 @@
+"""Compare Lambda handler latency on cold and warm containers.
+
+Runs the handler under moto. "no reuse" clears the client registry before
+every invocation, which is what each run paid before clients were cached::
+
+    python benchmarks/bench_lambda_warm_start.py --invocations 10
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import statistics
+import time
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+REGION = "us-east-1"
+BUCKET = "drift-bench"
+HANDLER_PATH = Path(__file__).resolve().parent.parent / "lambda" / "handler.py"
+
+
+def load_handler():
+    """Import lambda/handler.py as a module."""
+    spec = importlib.util.spec_from_file_location("drift_lambda_handler", HANDLER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def setup_account():
+    """Create the drift bucket, an SNS topic and a baseline for dev."""
+    boto3.client("s3", region_name=REGION).create_bucket(Bucket=BUCKET)
+    topic = boto3.client("sns", region_name=REGION).create_topic(Name="drift")
+    os.environ["SNS_TOPIC_ARN"] = topic["TopicArn"]
+
+    from drift_detection.scanner import AWSScanner
+    from drift_detection.storage import S3Storage
+
+    storage = S3Storage(bucket_name=BUCKET, region=REGION)
+    storage.save_baseline("dev", AWSScanner(region=REGION).scan_environment("dev"))
+
+
+def time_invocations(module, invocations, reuse):
+    """Return per-invocation wall times in milliseconds."""
+    module.registry.clear()
+    times = []
+    for _ in range(invocations):
+        if not reuse:
+            module.registry.clear()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            module.handler({}, None)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--invocations", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ["AWS_REGION"] = REGION
+    os.environ["DRIFT_BUCKET"] = BUCKET
+    os.environ["ENVIRONMENTS"] = "dev"
+
+    with mock_aws():
+        setup_account()
+        module = load_handler()
+        for label, reuse in (("no reuse", False), ("registry", True)):
+            times = time_invocations(module, args.invocations, reuse)
+            print(
+                f"{label:>9}: first {times[0]:7.1f} ms, "
+                f"warm median {statistics.median(times[1:]):7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Time the storage pipeline on the S3, local-directory and in-memory backends.
+
+Each backend saves a baseline, a deduplicated scan and a report, then
+loads them back. S3 runs against moto, so no AWS account is needed::
+
+    pip install -e ".[dev]"
+    python benchmarks/bench_storage_backends.py --resources 2000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import boto3
+from moto import mock_aws
+
+from drift_detection.storage import open_storage
+
+REGION = "us-east-1"
+BUCKET = "bench-storage"
+
+
+def snapshot(resources):
+    return {
+        "environment": "bench",
+        "timestamp": "2024-01-01T00:00:00",
+        "resources": {
+            "ec2": [
+                {"id": f"i-{i:08x}", "type": "t3.micro", "tags": {"Name": f"n{i}"}}
+                for i in range(resources)
+            ]
+        },
+    }
+
+
+def run(storage, data):
+    start = time.perf_counter()
+    storage.save_baseline("bench", data)
+    key = storage.save_scan("bench", data)
+    storage.save_report("bench", {"drift_detected": False})
+    assert storage.load_baseline("bench") == data
+    assert storage.load_scan(key) == data
+    storage.query_history("bench")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resources", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", REGION)
+
+    data = snapshot(args.resources)
+    with mock_aws(), tempfile.TemporaryDirectory() as directory:
+        boto3.client("s3", region_name=REGION).create_bucket(Bucket=BUCKET)
+        for uri in (f"s3://{BUCKET}", f"file://{directory}", "mem://bench"):
+            elapsed = run(open_storage(uri, region=REGION), data)
+            print(
+                f"{uri.split(':')[0]:>5}: {elapsed:.2f}s for {args.resources} resources"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Measure peak Python memory for saving and loading a large snapshot.
+
+Compares the buffered path (encode or read the whole body at once) with
+S3Storage's streaming multipart upload and ranged download, using an
+in-memory stand-in for S3 so only the client side is measured::
+
+    python benchmarks/bench_storage_memory.py --resources 100000
+"""
+
+import argparse
+import gzip
+import json
+import re
+import tracemalloc
+from unittest.mock import patch
+
+from drift_detection.storage import S3Storage
+
+MIB = 1024 * 1024
+
+
+class FakeS3:
+    """Keeps uploaded objects compressed in a dict; supports ranges."""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = (bytes(Body), kwargs)
+        return {"ETag": '"put"'}
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self.uploads[Key] = ([], kwargs)
+        return {"UploadId": Key}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[Key][0].append((PartNumber, len(Body)))
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.objects[Key] = (b"", self.uploads.pop(Key)[1])
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        body, meta = self.objects[Key]
+        response = {"ETag": '"put"', **meta}
+        if Range:
+            start, end = map(int, re.match(r"bytes=(\d+)-(\d+)", Range).groups())
+            response["ContentRange"] = f"bytes {start}-{end}/{len(body)}"
+            body = body[start : end + 1]
+        response["Body"] = _Body(body)
+        return response
+
+
+class _Body:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+def snapshot(resources):
+    return {
+        "environment": "bench",
+        "resources": {
+            "ec2": [
+                {"id": f"i-{i:08x}", "type": "t3.micro", "tags": {"Name": f"n{i}"}}
+                for i in range(resources)
+            ]
+        },
+    }
+
+
+def peak(func):
+    tracemalloc.start()
+    func()
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return top / MIB
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resources", type=int, default=100000)
+    args = parser.parse_args()
+
+    data = snapshot(args.resources)
+    fake = FakeS3()
+    with patch("drift_detection.storage.boto3.client", return_value=fake):
+        storage = S3Storage("bench", storage_format="json+gzip", part_size=5 * MIB)
+
+    compact = gzip.compress(json.dumps(data).encode())
+    fake.objects["compact"] = (compact, {"ContentEncoding": "gzip"})
+
+    scenarios = {
+        "save buffered": lambda: gzip.compress(json.dumps(data, indent=2).encode()),
+        "save streamed": lambda: storage._save_json("big", data),
+        "load buffered": lambda: json.loads(gzip.decompress(compact)),
+        "load streamed": lambda: storage._load_json("compact"),
+    }
+    print(f"{args.resources} resources, {len(compact) / MIB:.1f} MiB compressed")
+    for label, func in scenarios.items():
+        print(f"  {label}: {peak(func):7.1f} MiB peak")
+    print("  (load peaks include the decoded document itself)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Count AWS API calls per scan with and without the bulk tag index.
+
+Runs against moto, so no AWS account is needed::
+
+    pip install -e ".[dev]"
+    python benchmarks/bench_tag_index.py --resources 200
+"""
+
+import argparse
+import os
+import time
+from collections import Counter
+
+import boto3
+from moto import mock_aws
+
+from drift_detection.scanner import AWSScanner
+
+REGION = "us-east-1"
+ENVIRONMENTS = ["dev", "staging", "prod"]
+
+
+def _tags(env):
+    return [{"Key": "Environment", "Value": env}]
+
+
+def populate(count):
+    """Create tagged S3 buckets, Lambda functions, RDS instances and ECS services."""
+    s3 = boto3.client("s3", region_name=REGION)
+    lam = boto3.client("lambda", region_name=REGION)
+    rds = boto3.client("rds", region_name=REGION)
+    ecs = boto3.client("ecs", region_name=REGION)
+    iam = boto3.client("iam", region_name=REGION)
+
+    role_arn = iam.create_role(
+        RoleName="bench-role", AssumeRolePolicyDocument="{}", Path="/"
+    )["Role"]["Arn"]
+    ecs.create_cluster(clusterName="bench")
+
+    for i in range(count):
+        env = ENVIRONMENTS[i % len(ENVIRONMENTS)]
+        s3.create_bucket(Bucket=f"bench-bucket-{i}")
+        s3.put_bucket_tagging(
+            Bucket=f"bench-bucket-{i}", Tagging={"TagSet": _tags(env)}
+        )
+        lam.create_function(
+            FunctionName=f"bench-fn-{i}",
+            Runtime="python3.11",
+            Role=role_arn,
+            Handler="index.handler",
+            Code={"ZipFile": b"def handler(event, context): pass"},
+            Tags={"Environment": env},
+        )
+        if i % 10 == 0:
+            rds.create_db_instance(
+                DBInstanceIdentifier=f"bench-db-{i}",
+                DBInstanceClass="db.t3.micro",
+                Engine="postgres",
+                Tags=_tags(env),
+            )
+            ecs.create_service(
+                cluster="bench",
+                serviceName=f"bench-svc-{i}",
+                desiredCount=1,
+                tags=[{"key": "Environment", "value": env}],
+            )
+
+
+def count_calls(scanner):
+    """Attach a per-operation call counter to every scanner client."""
+    calls = Counter()
+
+    def _count(model, **kwargs):
+        calls[model.name] += 1
+
+    for client in (
+        scanner.ec2,
+        scanner.rds,
+        scanner.s3,
+        scanner.lambda_client,
+        scanner.ecs,
+        scanner.tagging,
+    ):
+        client.meta.events.register("before-call", _count)
+    return calls
+
+
+def run(use_tag_index):
+    scanner = AWSScanner(region=REGION, max_workers=1, use_tag_index=use_tag_index)
+    calls = count_calls(scanner)
+    start = time.perf_counter()
+    snapshot = scanner.scan_account(ENVIRONMENTS)
+    elapsed = time.perf_counter() - start
+    found = sum(
+        len(items) for scan in snapshot.values() for items in scan["resources"].values()
+    )
+    return calls, elapsed, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resources", type=int, default=100)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", REGION)
+
+    with mock_aws():
+        populate(args.resources)
+        for label, use_tag_index in (("per-resource", False), ("tag index", True)):
+            calls, elapsed, found = run(use_tag_index)
+            print(
+                f"{label:>12}: {sum(calls.values()):5d} API calls, "
+                f"{found} resources, {elapsed:.2f}s"
+            )
+            for operation, count in sorted(calls.items()):
+                print(f"{'':>14}{operation}: {count}")
+
+
+if __name__ == "__main__":
+    main()
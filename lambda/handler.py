@@ -3,53 +3,120 @@
 import json
 import os
 
+from drift_detection.cache import LocalCache
+from drift_detection.clients import ClientRegistry
 from drift_detection.comparator import DriftComparator
+from drift_detection.cost_analyzer import CostAnalyzer
+from drift_detection.defaults import (
+    DEFAULT_CACHE_MAX_BYTES,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PIPELINE_WORKERS,
+    DEFAULT_STORAGE_FORMAT,
+)
 from drift_detection.notifier import SNSNotifier
+from drift_detection.pipeline import DetectionPipeline
+from drift_detection.pricing import PricingCatalog
 from drift_detection.reporter import DriftReporter
 from drift_detection.scanner import AWSScanner
-from drift_detection.storage import S3Storage
+from drift_detection.storage import open_storage
+
+# Module-level so warm containers reuse the session, clients and limiter
+registry = ClientRegistry()
 
 
 def handler(event, context):
     """Lambda handler for scheduled drift detection."""
-    bucket = os.environ["DRIFT_BUCKET"]
+    storage_uri = os.environ.get("STORAGE_URI") or f"s3://{os.environ['DRIFT_BUCKET']}"
     sns_topic = os.environ["SNS_TOPIC_ARN"]
     region = os.environ.get("AWS_REGION", "us-east-1")
     environments = os.environ.get("ENVIRONMENTS", "dev,staging,prod").split(",")
+    scan_workers = int(os.environ.get("SCAN_WORKERS", DEFAULT_MAX_WORKERS))
+    # Environments compared, reported and alerted on concurrently
+    pipeline_workers = int(os.environ.get("PIPELINE_WORKERS", DEFAULT_PIPELINE_WORKERS))
+    incremental = os.environ.get("INCREMENTAL", "false").lower() == "true"
+    storage_format = os.environ.get("STORAGE_FORMAT", DEFAULT_STORAGE_FORMAT)
+    # /tmp outlives warm invocations, so unchanged baselines are not refetched
+    cache_dir = os.environ.get("BASELINE_CACHE_DIR", "/tmp/drift-baselines")
+    # Catalog from 'drift-detect import-pricing', e.g. shipped in a layer
+    pricing_db = os.environ.get("PRICING_DB")
 
-    scanner = AWSScanner(region=region)
-    storage = S3Storage(bucket_name=bucket, region=region)
-    comparator = DriftComparator()
-    reporter = DriftReporter()
-    notifier = SNSNotifier(region=region)
+    scanner = registry.get(
+        ("scanner", scan_workers),
+        region,
+        lambda session: AWSScanner(
+            region=region, max_workers=scan_workers, session=session
+        ),
+    )
+    storage = registry.get(
+        ("storage", storage_uri, storage_format, cache_dir),
+        region,
+        lambda session: open_storage(
+            storage_uri,
+            region=region,
+            session=session,
+            storage_format=storage_format,
+            cache=LocalCache(cache_dir, max_bytes=DEFAULT_CACHE_MAX_BYTES),
+        ),
+    )
+    scanner.rate_limiter.reset_metrics()
+    pipeline = DetectionPipeline(
+        scanner=scanner,
+        storage=storage,
+        comparator=DriftComparator(slim=True),
+        reporter=DriftReporter(
+            CostAnalyzer(
+                region=region,
+                pricing=(
+                    registry.get(
+                        ("pricing", pricing_db),
+                        region,
+                        lambda _: PricingCatalog(pricing_db),
+                    )
+                    if pricing_db
+                    else None
+                ),
+            )
+        ),
+        notifier=lambda: registry.get(
+            "notifier",
+            region,
+            lambda session: SNSNotifier(region=region, session=session),
+        ),
+        sns_topic=sns_topic,
+        max_workers=pipeline_workers,
+    )
 
     results = []
-
-    for env in environments:
-        print(f"Scanning environment: {env}")
-
-        baseline_data = storage.load_baseline(env)
-        if not baseline_data:
+    for outcome in pipeline.run(environments, incremental=incremental):
+        env = outcome.environment
+        if outcome.status == "no_baseline":
             print(f"No baseline found for {env}, skipping")
             results.append({"environment": env, "status": "no_baseline"})
-            continue
-
-        current_data = scanner.scan_environment(env)
-        drift_result = comparator.compare(baseline_data, current_data)
-        report = reporter.generate_report(drift_result)
-        storage.save_report(env, report)
-
-        if drift_result["drift_detected"]:
-            message_id = notifier.send_alert(report, sns_topic, min_risk="high")
+        elif outcome.status == "scan_failed":
+            for resource_type, error in outcome.scan_errors.items():
+                print(f"{resource_type} scan failed for {env}: {error}")
+            results.append(
+                {
+                    "environment": env,
+                    "status": "scan_failed",
+                    "errors": outcome.scan_errors,
+                }
+            )
+        elif outcome.status == "drift_detected":
             results.append(
                 {
                     "environment": env,
                     "status": "drift_detected",
-                    "risk": report["risk_assessment"]["overall_risk"],
-                    "alert_sent": message_id is not None,
+                    "risk": outcome.report["risk_assessment"]["overall_risk"],
+                    "alert_sent": outcome.message_id is not None,
                 }
             )
         else:
             results.append({"environment": env, "status": "no_drift"})
 
-    return {"statusCode": 200, "body": json.dumps({"results": results})}
+    body = {
+        "results": results,
+        "api_metrics": scanner.rate_limiter.metrics(),
+        "baseline_cache": storage.cache.stats() if storage.cache else None,
+    }
+    return {"statusCode": 200, "body": json.dumps(body)}
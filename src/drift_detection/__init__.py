@@ -2,19 +2,36 @@
 
 """Multi-environment infrastructure drift detection system."""
 
-from drift_detection.comparator import DriftComparator  # noqa: E402
-from drift_detection.cost_analyzer import CostAnalyzer  # noqa: E402
-from drift_detection.notifier import SNSNotifier  # noqa: E402
-from drift_detection.reporter import DriftReporter  # noqa: E402
-from drift_detection.risk_scorer import RiskLevel, RiskScorer  # noqa: E402
-from drift_detection.scanner import AWSScanner  # noqa: E402
-from drift_detection.storage import S3Storage  # noqa: E402
+import importlib  # noqa: E402
+from typing import TYPE_CHECKING, Any, List  # noqa: E402
+
+if TYPE_CHECKING:
+    from drift_detection.comparator import DriftComparator  # noqa: F401
+    from drift_detection.cost_analyzer import CostAnalyzer  # noqa: F401
+    from drift_detection.notifier import SNSNotifier  # noqa: F401
+    from drift_detection.orchestrator import ScanOrchestrator, ScanTarget  # noqa: F401
+    from drift_detection.reporter import DriftReporter  # noqa: F401
+    from drift_detection.risk_scorer import RiskLevel, RiskScorer  # noqa: F401
+    from drift_detection.scanner import AWSScanner  # noqa: F401
+    from drift_detection.storage import (  # noqa: F401
+        LocalStorage,
+        MemoryStorage,
+        S3Storage,
+        Storage,
+        open_storage,
+    )
 
 __version__ = "0.1.0"
 
 __all__ = [
     "AWSScanner",
+    "ScanOrchestrator",
+    "ScanTarget",
+    "Storage",
     "S3Storage",
+    "LocalStorage",
+    "MemoryStorage",
+    "open_storage",
     "DriftComparator",
     "DriftReporter",
     "CostAnalyzer",
@@ -22,3 +39,34 @@ __all__ = [
     "RiskLevel",
     "SNSNotifier",
 ]
+
+# Public names are imported on first access so that importing the package
+# (or running the CLI's --help) does not load boto3 or deepdiff
+_EXPORTS = {
+    "AWSScanner": "drift_detection.scanner",
+    "ScanOrchestrator": "drift_detection.orchestrator",
+    "ScanTarget": "drift_detection.orchestrator",
+    "Storage": "drift_detection.storage",
+    "S3Storage": "drift_detection.storage",
+    "LocalStorage": "drift_detection.storage",
+    "MemoryStorage": "drift_detection.storage",
+    "open_storage": "drift_detection.storage",
+    "DriftComparator": "drift_detection.comparator",
+    "DriftReporter": "drift_detection.reporter",
+    "CostAnalyzer": "drift_detection.cost_analyzer",
+    "RiskScorer": "drift_detection.risk_scorer",
+    "RiskLevel": "drift_detection.risk_scorer",
+    "SNSNotifier": "drift_detection.notifier",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,140 @@
+"""On-disk cache of S3 objects, revalidated by ETag."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    """A cached object body with the S3 metadata needed to decode it."""
+
+    etag: str
+    body: bytes
+    content_type: Optional[str] = None
+    content_encoding: Optional[str] = None
+    version_id: Optional[str] = None
+
+
+class LocalCache:
+    """Size-bounded LRU cache of object bodies in a local directory.
+
+    Each entry is a ``<digest>.body`` file plus a ``<digest>.meta`` JSON
+    file holding the ETag, where ``digest`` hashes the bucket and key. The
+    directory survives between runs (``/tmp`` in warm Lambda containers, a
+    user cache dir for the CLI), so a caller can send the stored ETag as
+    ``IfNoneMatch`` and only download objects that actually changed.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._sizes: "OrderedDict[str, int]" = self._load_index()
+
+    def get(self, bucket: str, key: str) -> Optional[CacheEntry]:
+        """Return the cached entry for an object, if any."""
+        digest = self._digest(bucket, key)
+        with self._lock:
+            if digest not in self._sizes:
+                return None
+            try:
+                with open(self._path(digest, "meta")) as f:
+                    meta = json.load(f)
+                with open(self._path(digest, "body"), "rb") as f:
+                    body = f.read()
+            except (OSError, ValueError):
+                # Another process evicted it or left it half-written
+                self._remove(digest)
+                return None
+            self._sizes.move_to_end(digest)
+            # Persist recency so the next process rebuilds the same order
+            os.utime(self._path(digest, "body"))
+        return CacheEntry(body=body, **meta)
+
+    def put(self, bucket: str, key: str, entry: CacheEntry) -> None:
+        """Store an object body, evicting least recently used entries."""
+        if len(entry.body) > self.max_bytes:
+            return
+        digest = self._digest(bucket, key)
+        meta = entry._asdict()
+        del meta["body"]
+        with self._lock:
+            # Body first: a meta file is only trusted once its body exists
+            self._write(self._path(digest, "body"), entry.body)
+            self._write(self._path(digest, "meta"), json.dumps(meta).encode())
+            self._sizes[digest] = len(entry.body)
+            self._sizes.move_to_end(digest)
+            self._evict()
+
+    def record(self, hit: bool) -> None:
+        """Count a lookup that was (or was not) served from the cache."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the cache size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._sizes),
+                "bytes": sum(self._sizes.values()),
+            }
+
+    def _evict(self) -> None:
+        total = sum(self._sizes.values())
+        while total > self.max_bytes and self._sizes:
+            digest, size = next(iter(self._sizes.items()))
+            self._remove(digest)
+            total -= size
+            self.evictions += 1
+
+    def _remove(self, digest: str) -> None:
+        self._sizes.pop(digest, None)
+        for suffix in ("meta", "body"):
+            try:
+                os.remove(self._path(digest, suffix))
+            except FileNotFoundError:
+                pass
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        """Rebuild LRU order from body file modification times."""
+        bodies = []
+        for name in os.listdir(self.directory):
+            digest, ext = os.path.splitext(name)
+            if ext != ".body":
+                continue
+            path = os.path.join(self.directory, name)
+            if os.path.exists(self._path(digest, "meta")):
+                stat = os.stat(path)
+                bodies.append((stat.st_mtime, digest, stat.st_size))
+        return OrderedDict((digest, size) for _, digest, size in sorted(bodies))
+
+    def _write(self, path: str, data: bytes) -> None:
+        # Atomic rename so concurrent readers never see partial files
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{digest}.{suffix}")
+
+    @staticmethod
+    def _digest(bucket: str, key: str) -> str:
+        return hashlib.sha256(f"{bucket}/{key}".encode()).hexdigest()
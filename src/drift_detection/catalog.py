@@ -0,0 +1,129 @@
+"""Per-environment index of saved scans and reports."""
+
+import bisect
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from drift_detection.defaults import DEFAULT_CATALOG_MAX_ENTRIES
+
+RISK_LEVELS = ["info", "low", "medium", "high", "critical"]
+
+# Fixed width so string order matches time order
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+class CatalogEntry(NamedTuple):
+    """What history queries need to know about one saved object."""
+
+    key: str
+    kind: str
+    timestamp: str
+    drift_detected: Optional[bool] = None
+    overall_risk: Optional[str] = None
+    cost_impact: Optional[float] = None
+
+
+def format_timestamp(moment: datetime) -> str:
+    """Format a UTC datetime the way catalog entries store it."""
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+def report_entry(key: str, timestamp: str, report: Dict[str, Any]) -> CatalogEntry:
+    """Build the catalog entry summarising a drift report."""
+    cost = report.get("cost_impact", {})
+    return CatalogEntry(
+        key=key,
+        kind="report",
+        timestamp=timestamp,
+        drift_detected=report.get("drift_detected"),
+        overall_risk=report.get("risk_assessment", {}).get("overall_risk"),
+        cost_impact=cost.get("monthly_impact", cost.get("total_monthly_impact")),
+    )
+
+
+class Catalog:
+    """Time-ordered entries for one environment, queryable without bodies.
+
+    Only the newest ``max_entries`` are kept; older scans and reports stay
+    in storage but drop out of history queries.
+    """
+
+    def __init__(
+        self,
+        environment: str,
+        entries: Iterable[CatalogEntry] = (),
+        max_entries: int = DEFAULT_CATALOG_MAX_ENTRIES,
+    ):
+        self.environment = environment
+        self.max_entries = max_entries
+        self.entries: List[CatalogEntry] = sorted(entries, key=lambda e: e.timestamp)
+        self._timestamps = [entry.timestamp for entry in self.entries]
+        self._trim()
+
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Any], max_entries: int = DEFAULT_CATALOG_MAX_ENTRIES
+    ) -> "Catalog":
+        """Rebuild a catalog saved with ``to_dict``."""
+        return cls(
+            data["environment"],
+            (CatalogEntry(*row) for row in data["entries"]),
+            max_entries,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize entries compactly as rows in field order."""
+        return {
+            "environment": self.environment,
+            "fields": list(CatalogEntry._fields),
+            "entries": [list(entry) for entry in self.entries],
+        }
+
+    def add(self, entry: CatalogEntry) -> None:
+        """Insert an entry, keeping time order."""
+        index = bisect.bisect_right(self._timestamps, entry.timestamp)
+        self._timestamps.insert(index, entry.timestamp)
+        self.entries.insert(index, entry)
+        self._trim()
+
+    def _trim(self) -> None:
+        """Drop the oldest entries beyond ``max_entries``."""
+        excess = len(self.entries) - self.max_entries
+        if excess > 0:
+            del self.entries[:excess]
+            del self._timestamps[:excess]
+
+    def query(
+        self,
+        kind: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_risk: Optional[str] = None,
+        drift_only: bool = False,
+    ) -> List[CatalogEntry]:
+        """Return entries in a time range matching the filters, oldest first."""
+        start = (
+            bisect.bisect_left(self._timestamps, format_timestamp(since))
+            if since
+            else 0
+        )
+        end = (
+            bisect.bisect_right(self._timestamps, format_timestamp(until))
+            if until
+            else len(self.entries)
+        )
+        threshold = RISK_LEVELS.index(min_risk) if min_risk else None
+
+        matches = []
+        for entry in self.entries[start:end]:
+            if kind and entry.kind != kind:
+                continue
+            if drift_only and not entry.drift_detected:
+                continue
+            if threshold is not None and (
+                entry.overall_risk not in RISK_LEVELS
+                or RISK_LEVELS.index(entry.overall_risk) < threshold
+            ):
+                continue
+            matches.append(entry)
+        return matches
@@ -0,0 +1,64 @@
+"""Structured records of individual drift changes."""
+
+import re
+from typing import Any, Hashable, List, NamedTuple, Optional
+
+from drift_detection.hashing import RESOURCE_KEYS
+
+CHANGE_TYPES = ("added", "removed", "changed")
+
+# One subscript of a diff path: a quoted key or a list index
+_SUBSCRIPT = re.compile(r"""\[(?:'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)"|(\d+))\]""")
+
+
+class Change(NamedTuple):
+    """One added or removed resource, or one changed field of a resource.
+
+    ``field_name`` is the innermost changed key, or None when the whole
+    resource was added or removed; ``path`` is the DeepDiff-style path
+    reports show for it.
+    """
+
+    change_type: str
+    resource_type: str
+    resource_id: Optional[Hashable]
+    field_name: Optional[str]
+    old_value: Any
+    new_value: Any
+    path: str
+
+
+def format_path(resource_type: str, resource_id: Hashable, *fields: Any) -> str:
+    """Build the path of a resource or field, e.g. ``root['ec2']['i-1']['x']``."""
+    return "root" + "".join(
+        f"[{part!r}]" for part in (resource_type, resource_id, *fields)
+    )
+
+
+def parse_change_path(path: str, change_type: str) -> Change:
+    """Build a change record from a diff path such as ``root['ec2']['i-1']['x']``.
+
+    The resource type is the first quoted segment naming a known type, the
+    subscript after it is the resource's ID (a key or list index) and the
+    last quoted segment after that is the field, so keyed and DeepDiff
+    paths (``root['ec2'][0]['x']``) parse alike. Values are not known.
+    """
+    parts: List[Any] = []
+    for match in _SUBSCRIPT.finditer(path):
+        single, double, index = match.groups()
+        if index is not None:
+            parts.append(int(index))
+        else:
+            parts.append(single if single is not None else double)
+    for position, part in enumerate(parts):
+        if part in RESOURCE_KEYS:
+            resource_type = part
+            resource_id = parts[position + 1] if position + 1 < len(parts) else None
+            fields = [f for f in parts[position + 2 :] if isinstance(f, str)]
+            field_name = fields[-1] if fields else None
+            break
+    else:
+        resource_type, resource_id = "unknown", None
+        keys = [part for part in parts if isinstance(part, str)]
+        field_name = keys[-1] if len(keys) >= 2 else None
+    return Change(change_type, resource_type, resource_id, field_name, None, None, path)
@@ -1,42 +1,174 @@
 """Command-line interface for drift detection system."""
 
 import sys
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
 
 import click
-import structlog
-
-from drift_detection.comparator import DriftComparator
-from drift_detection.notifier import SNSNotifier
-from drift_detection.reporter import DriftReporter
-from drift_detection.scanner import AWSScanner
-from drift_detection.storage import S3Storage
-
-# Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.add_log_level,
-        structlog.dev.ConsoleRenderer(),
-    ]
+
+from drift_detection.defaults import (
+    DEFAULT_CACHE_MAX_BYTES,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PIPELINE_WORKERS,
+    DEFAULT_STORAGE_FORMAT,
 )
-logger = structlog.get_logger()
+
+if TYPE_CHECKING:
+    from drift_detection.pipeline import DetectionPipeline, EnvironmentOutcome
+    from drift_detection.scanner import AWSScanner
+
+# AWS clients, deepdiff and structlog are imported on first use, so
+# commands like --help never pay for them
+
+
+@lru_cache(maxsize=None)
+def _structlog_logger() -> Any:
+    """Import and configure structured logging."""
+    import structlog
+
+    structlog.configure(
+        processors=[
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.add_log_level,
+            structlog.dev.ConsoleRenderer(),
+        ]
+    )
+    return structlog.get_logger()
+
+
+class _LazyLogger:
+    """Forwards log calls to structlog, configuring it on first use."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(_structlog_logger(), name)
+
+
+logger = _LazyLogger()
+
+
+def _build_scanner(obj: Dict[str, Any]) -> Any:
+    from drift_detection.scanner import AWSScanner
+
+    return AWSScanner(region=obj["region"], max_workers=obj["scan_workers"])
+
+
+def _build_storage(obj: Dict[str, Any]) -> Any:
+    from drift_detection.cache import LocalCache
+    from drift_detection.storage import open_storage
+
+    uri = obj["storage_uri"] or (obj["bucket"] and f"s3://{obj['bucket']}")
+    if not uri:
+        raise click.UsageError("One of --bucket or --storage is required")
+    cache = None
+    if obj["cache_dir"]:
+        cache = LocalCache(obj["cache_dir"], max_bytes=DEFAULT_CACHE_MAX_BYTES)
+    return open_storage(
+        uri,
+        region=obj["region"],
+        storage_format=obj["storage_format"],
+        cache=cache,
+    )
+
+
+def _build_comparator(obj: Dict[str, Any]) -> Any:
+    from drift_detection.comparator import DriftComparator
+
+    return DriftComparator(slim=True)
+
+
+def _build_reporter(obj: Dict[str, Any]) -> Any:
+    from drift_detection.cost_analyzer import CostAnalyzer
+    from drift_detection.pricing import PricingCatalog
+    from drift_detection.reporter import DriftReporter
+
+    pricing = PricingCatalog(obj["pricing_db"]) if obj["pricing_db"] else None
+    return DriftReporter(CostAnalyzer(region=obj["region"], pricing=pricing))
+
+
+def _build_notifier(obj: Dict[str, Any]) -> Any:
+    from drift_detection.notifier import SNSNotifier
+
+    return SNSNotifier(region=obj["region"])
+
+
+class _Components(dict):
+    """Context object that builds components the first time a command uses them."""
+
+    factories: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+        "scanner": _build_scanner,
+        "storage": _build_storage,
+        "comparator": _build_comparator,
+        "reporter": _build_reporter,
+        "notifier": _build_notifier,
+    }
+
+    def __missing__(self, name: str) -> Any:
+        if name not in self.factories:
+            raise KeyError(name)
+        self[name] = component = self.factories[name](self)
+        return component
 
 
 @click.group()
 @click.option("--region", default="us-east-1", help="AWS region")
-@click.option("--bucket", required=True, help="S3 bucket for storage")
+@click.option("--bucket", default=None, help="S3 bucket for storage")
+@click.option(
+    "--storage",
+    envvar="DRIFT_STORAGE",
+    default=None,
+    help="Storage URI instead of --bucket: s3://bucket, file:///dir or mem://",
+)
 @click.option("--sns-topic", default=None, help="SNS topic ARN for alerts")
+@click.option(
+    "--scan-workers",
+    default=DEFAULT_MAX_WORKERS,
+    show_default=True,
+    help="Resource types scanned in parallel (1 = sequential)",
+)
+@click.option(
+    "--storage-format",
+    default=DEFAULT_STORAGE_FORMAT,
+    show_default=True,
+    help="Format for saved objects: json, json-pretty or msgpack, "
+    "optionally +gzip or +zstd",
+)
+@click.option(
+    "--cache-dir",
+    envvar="DRIFT_CACHE_DIR",
+    default=None,
+    help="Directory caching baselines locally, revalidated by ETag",
+)
+@click.option(
+    "--pricing-db",
+    envvar="DRIFT_PRICING_DB",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Pricing catalog from 'import-pricing'; default: built-in t3 prices",
+)
 @click.pass_context
-def cli(ctx: click.Context, region: str, bucket: str, sns_topic: str) -> None:
+def cli(
+    ctx: click.Context,
+    region: str,
+    bucket: Optional[str],
+    storage: Optional[str],
+    sns_topic: str,
+    scan_workers: int,
+    storage_format: str,
+    cache_dir: Optional[str],
+    pricing_db: Optional[str],
+) -> None:
     """Multi-environment drift detection system."""
     ctx.ensure_object(dict)
+    ctx.obj = _Components(ctx.obj)
     ctx.obj["region"] = region
     ctx.obj["bucket"] = bucket
+    ctx.obj["storage_uri"] = storage
     ctx.obj["sns_topic"] = sns_topic
-    ctx.obj["scanner"] = AWSScanner(region=region)
-    ctx.obj["storage"] = S3Storage(bucket_name=bucket, region=region)
-    ctx.obj["comparator"] = DriftComparator()
-    ctx.obj["reporter"] = DriftReporter()
+    ctx.obj["scan_workers"] = scan_workers
+    ctx.obj["storage_format"] = storage_format
+    ctx.obj["cache_dir"] = cache_dir
+    ctx.obj["pricing_db"] = pricing_db
 
 
 @cli.command()
@@ -50,6 +182,7 @@ def scan(ctx: click.Context, environment: str) -> None:
     storage = ctx.obj["storage"]
 
     scan_data = scanner.scan_environment(environment)
+    _report_scan_errors(scanner, environment)
     key = storage.save_scan(environment, scan_data)
 
     logger.info("scan_completed", environment=environment, s3_key=key)
@@ -67,6 +200,12 @@ def baseline(ctx: click.Context, environment: str) -> None:
     storage = ctx.obj["storage"]
 
     scan_data = scanner.scan_environment(environment)
+    if _report_scan_errors(scanner, environment):
+        click.echo(f"✗ Scan of {environment} incomplete; baseline not saved.")
+        sys.exit(1)
+    # Saved with the baseline so detection only prices what drifted
+    cost_analyzer = ctx.obj["reporter"].cost_analyzer
+    scan_data["cost_totals"] = cost_analyzer.environment_totals(scan_data["resources"])
     key = storage.save_baseline(environment, scan_data)
 
     logger.info("baseline_created", environment=environment, s3_key=key)
@@ -75,44 +214,101 @@ def baseline(ctx: click.Context, environment: str) -> None:
 
 @cli.command()
 @click.argument("environment")
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Reuse tags of unchanged resources from the last snapshot",
+)
 @click.pass_context
-def detect(ctx: click.Context, environment: str) -> None:
+def detect(ctx: click.Context, environment: str, incremental: bool) -> None:
     """Detect drift by comparing current state to baseline."""
     logger.info("drift_detection_started", environment=environment)
+    (outcome,) = _pipeline(ctx, max_workers=1).run(
+        [environment], incremental=incremental, per_environment=True
+    )
+    if not _show_outcome(ctx, outcome):
+        sys.exit(1)
 
-    scanner = ctx.obj["scanner"]
-    storage = ctx.obj["storage"]
-    comparator = ctx.obj["comparator"]
-    reporter = ctx.obj["reporter"]
 
-    # Load baseline
-    baseline_data = storage.load_baseline(environment)
-    if not baseline_data:
-        logger.error("baseline_not_found", environment=environment)
-        msg = f"✗ No baseline found for {environment}. Run 'baseline' first."
-        click.echo(msg)
+@cli.command()
+@click.option(
+    "--per-environment",
+    is_flag=True,
+    help="Rescan the account for each environment instead of one snapshot",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Reuse tags of unchanged resources from the last snapshots",
+)
+@click.option(
+    "--pipeline-workers",
+    default=DEFAULT_PIPELINE_WORKERS,
+    show_default=True,
+    help="Environments processed concurrently (1 = sequential)",
+)
+@click.pass_context
+def detect_all(
+    ctx: click.Context, per_environment: bool, incremental: bool, pipeline_workers: int
+) -> None:
+    """Detect drift across all environments."""
+    environments = ["dev", "staging", "prod"]
+
+    outcomes = _pipeline(ctx, max_workers=pipeline_workers).run(
+        environments, incremental=incremental, per_environment=per_environment
+    )
+
+    # Printed in environment order once all have finished
+    failed = False
+    for outcome in outcomes:
+        click.echo(f"\n{'='*50}")
+        click.echo(f"Environment: {outcome.environment}")
+        click.echo(f"{'='*50}")
+        if not _show_outcome(ctx, outcome):
+            failed = True
+    if failed:
         sys.exit(1)
 
-    # Scan current state
-    current_data = scanner.scan_environment(environment)
 
-    # Compare and detect drift
-    drift_result = comparator.compare(baseline_data, current_data)
+def _pipeline(ctx: click.Context, max_workers: int) -> "DetectionPipeline":
+    """Build a detection pipeline from the context's components."""
+    from drift_detection.pipeline import DetectionPipeline
+
+    return DetectionPipeline(
+        scanner=ctx.obj["scanner"],
+        storage=ctx.obj["storage"],
+        comparator=ctx.obj["comparator"],
+        reporter=ctx.obj["reporter"],
+        notifier=lambda: ctx.obj["notifier"],
+        sns_topic=ctx.obj.get("sns_topic"),
+        max_workers=max_workers,
+    )
 
-    # Generate report
-    report = reporter.generate_report(drift_result)
-    key = storage.save_report(environment, report)
 
-    # Send SNS alert if configured
-    sns_topic = ctx.obj.get("sns_topic")
-    if sns_topic and drift_result["drift_detected"]:
-        notifier = SNSNotifier(region=ctx.obj["region"])
-        message_id = notifier.send_alert(report, sns_topic, min_risk="high")
-        if message_id:
-            logger.info("sns_alert_sent", message_id=message_id)
+def _show_outcome(ctx: click.Context, outcome: "EnvironmentOutcome") -> bool:
+    """Display one environment's detection outcome; False if it failed."""
+    environment = outcome.environment
+
+    if outcome.status == "no_baseline":
+        logger.error("baseline_not_found", environment=environment)
+        msg = f"✗ No baseline found for {environment}. Run 'baseline' first."
+        click.echo(msg)
+        return False
+
+    if _report_scan_errors(ctx.obj["scanner"], environment):
+        # An incomplete scan would show the missing resources as removed
+        click.echo(f"✗ Scan of {environment} incomplete; skipping comparison.")
+        return False
+
+    report = outcome.report
+    if report is None:
+        # Only failures carry no report, and they were reported above
+        return False
+    if outcome.message_id:
+        logger.info("sns_alert_sent", message_id=outcome.message_id)
 
     # Display results
-    if drift_result["drift_detected"]:
+    if outcome.status == "drift_detected":
         risk = report["risk_assessment"]["overall_risk"]
         risk_emoji = _get_risk_emoji(risk)
 
@@ -134,11 +330,22 @@ def detect(ctx: click.Context, environment: str) -> None:
         cost = report["cost_impact"]
         if cost["monthly_impact"] != 0:
             impact_sign = "+" if cost["monthly_impact"] > 0 else ""
+            percentage = (
+                f" ({cost['impact_percentage']:+.1f}%)"
+                if "impact_percentage" in cost
+                else ""
+            )
             click.echo(
                 f"  💰 Cost Impact: {impact_sign}"
-                f"${cost['monthly_impact']:.2f}/month "
-                f"({cost['impact_percentage']:+.1f}%)"
+                f"${cost['monthly_impact']:.2f}/month{percentage}"
             )
+            for mover in report.get("cost_movers", [])[:3]:
+                delta = mover["monthly_delta"]
+                click.echo(
+                    f"    {'+' if delta > 0 else '-'}${abs(delta):.2f}/month "
+                    f"{mover['resource_type']} {mover['resource_id']} "
+                    f"({mover['change_type']})"
+                )
 
         # Show top recommendations
         click.echo("\n  Recommendations:")
@@ -146,26 +353,152 @@ def detect(ctx: click.Context, environment: str) -> None:
             click.echo(f"    • {rec}")
 
         # Show SNS alert status
-        if sns_topic:
+        if ctx.obj.get("sns_topic"):
             click.echo("\n  📧 Alert sent to SNS topic")
     else:
         logger.info("no_drift", environment=environment)
         click.echo(f"✓ No drift detected in {environment}")
 
-    click.echo(f"\n  Report saved: {key}")
+    click.echo(f"\n  Report saved: {outcome.report_key}")
+    return True
 
 
 @cli.command()
+@click.argument("environments", nargs=-1, required=True)
+@click.option("--regions", required=True, help="Comma-separated regions to scan")
+@click.option(
+    "--role-arn",
+    "role_arns",
+    multiple=True,
+    help="Role to assume per account (repeatable); default: current credentials",
+)
+@click.option(
+    "--max-concurrency",
+    default=DEFAULT_MAX_CONCURRENCY,
+    show_default=True,
+    help="Resource-type scans in flight across all targets",
+)
 @click.pass_context
-def detect_all(ctx: click.Context) -> None:
-    """Detect drift across all environments."""
-    environments = ["dev", "staging", "prod"]
+def scan_matrix(
+    ctx: click.Context,
+    environments: Tuple[str, ...],
+    regions: str,
+    role_arns: Tuple[str, ...],
+    max_concurrency: int,
+) -> None:
+    """Scan environments across several regions and accounts at once."""
+    from drift_detection.orchestrator import ScanOrchestrator
+
+    try:
+        orchestrator = ScanOrchestrator.from_matrix(
+            regions=[r.strip() for r in regions.split(",") if r.strip()],
+            role_arns=list(role_arns) or [None],
+            max_concurrency=max_concurrency,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    logger.info("matrix_scan_started", targets=len(orchestrator.targets))
+
+    snapshot = orchestrator.scan(list(environments))
+    key = ctx.obj["storage"].save_matrix_scan(snapshot)
+
+    for name, target in snapshot["targets"].items():
+        status = "✓" if target["status"] == "ok" else "✗"
+        click.echo(f"{status} {name}: {target['duration_seconds']:.2f}s")
+        if "error" in target:
+            click.echo(f"    {target['error']}")
+        for env, errors in target.get("scan_errors", {}).items():
+            click.echo(f"    {env}: failed {', '.join(sorted(errors))}")
+
+    logger.info("matrix_scan_completed", s3_key=key)
+    click.echo(f"\n  Matrix scan saved: {key}")
 
-    for env in environments:
-        click.echo(f"\n{'='*50}")
-        click.echo(f"Environment: {env}")
-        click.echo(f"{'='*50}")
-        ctx.invoke(detect, environment=env)
+
+@cli.command()
+@click.argument("price_lists", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--output",
+    required=True,
+    type=click.Path(dir_okay=False),
+    help="Catalog file to create or update (then pass as --pricing-db)",
+)
+def import_pricing(price_lists: Tuple[str, ...], output: str) -> None:
+    """Build a pricing catalog from AWS bulk price-list CSV exports.
+
+    Download the AmazonEC2 and AmazonRDS offer files as CSV from the AWS
+    Price List bulk API; rows for every region are kept.
+    """
+    from drift_detection.pricing import import_price_lists
+
+    try:
+        counts = import_price_lists(output, price_lists)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for service, count in counts.items():
+        click.echo(f"✓ {count} {service} prices imported")
+    if "rds" in counts:
+        click.echo("  RDS prices are MySQL Single-AZ rates, used for every engine")
+    click.echo(f"\n  Catalog saved: {output}")
+
+
+@cli.command()
+@click.argument("environment")
+@click.option(
+    "--kind", type=click.Choice(["scan", "report"]), default=None, help="Entry type"
+)
+@click.option("--days", type=int, default=None, help="Only the last N days")
+@click.option(
+    "--min-risk",
+    type=click.Choice(["info", "low", "medium", "high", "critical"]),
+    default=None,
+    help="Only reports at or above this risk",
+)
+@click.option("--drift-only", is_flag=True, help="Only reports that found drift")
+@click.pass_context
+def history(
+    ctx: click.Context,
+    environment: str,
+    kind: Optional[str],
+    days: Optional[int],
+    min_risk: Optional[str],
+    drift_only: bool,
+) -> None:
+    """List saved scans and reports from the environment's catalog."""
+    from datetime import datetime, timedelta
+
+    since = datetime.utcnow() - timedelta(days=days) if days is not None else None
+    entries = ctx.obj["storage"].query_history(
+        environment, kind=kind, since=since, min_risk=min_risk, drift_only=drift_only
+    )
+
+    for entry in entries:
+        line = f"{entry.timestamp}  {entry.kind:<6}  {entry.key}"
+        if entry.kind == "report":
+            risk = entry.overall_risk or "info"
+            line += f"  {_get_risk_emoji(risk)} {risk.upper()}"
+            if entry.cost_impact:
+                line += f"  ${entry.cost_impact:+.2f}/mo"
+        click.echo(line)
+    click.echo(f"\n  {len(entries)} entries")
+
+
+def _report_scan_errors(scanner: "AWSScanner", environment: str) -> bool:
+    """Warn about resource types that failed to scan; True if any did."""
+    logger.info(
+        "scan_api_metrics",
+        environment=environment,
+        metrics=scanner.rate_limiter.metrics(),
+    )
+    errors = scanner.scan_errors.get(environment, {})
+    for resource_type, error in errors.items():
+        logger.warning(
+            "scan_error",
+            environment=environment,
+            resource_type=resource_type,
+            error=error,
+        )
+        click.echo(f"⚠ {resource_type} scan failed: {error}", err=True)
+    return bool(errors)
 
 
 def _get_risk_emoji(risk_level: str) -> str:
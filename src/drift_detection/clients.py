@@ -0,0 +1,49 @@
+"""Process-wide reuse of boto3 sessions and AWS-backed components."""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ClientRegistry:
+    """Lazily creates one boto3 session per region and caches what uses it.
+
+    Creating sessions and clients costs credential resolution and endpoint
+    and model loading. Keeping a registry at module level lets warm Lambda
+    containers (or long-running processes) build them once and reuse them.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: Dict[str, boto3.Session] = {}
+        self._components: Dict[Tuple[Hashable, str], Any] = {}
+        self._lock = threading.RLock()
+
+    def session(self, region: str) -> boto3.Session:
+        """Return the shared session for a region."""
+        with self._lock:
+            if region not in self._sessions:
+                logger.info(f"Creating boto3 session for {region}")
+                self._sessions[region] = boto3.Session(region_name=region)
+            return self._sessions[region]
+
+    def get(
+        self, key: Hashable, region: str, factory: Callable[[boto3.Session], T]
+    ) -> T:
+        """Return the cached component for ``key``, building it on first use."""
+        with self._lock:
+            if (key, region) not in self._components:
+                self._components[(key, region)] = factory(self.session(region))
+            component: T = self._components[(key, region)]
+            return component
+
+    def clear(self) -> None:
+        """Drop every cached session and component."""
+        with self._lock:
+            self._sessions.clear()
+            self._components.clear()
@@ -1,44 +1,185 @@
 """Drift detection and comparison logic."""
 
 import logging
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
-from deepdiff import DeepDiff
+from drift_detection.changes import CHANGE_TYPES, Change
+from drift_detection.hashing import DIGEST_VERSION, canonical_json, index_resources
+
+if TYPE_CHECKING:
+    from deepdiff import DeepDiff
 
 logger = logging.getLogger(__name__)
 
+ENGINES = ("keyed", "deepdiff")
+
 
 class DriftComparator:
     """Compares infrastructure configurations to detect drift."""
 
+    def __init__(self, engine: str = "keyed", slim: bool = False):
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown comparator engine '{engine}': use 'keyed' to match "
+                "resources by natural key, or 'deepdiff' to diff the whole tree"
+            )
+        if slim and engine != "keyed":
+            raise ValueError(
+                "Slim results, which keep only changed resources' records, "
+                "need the keyed engine"
+            )
+        self.engine = engine
+        self.slim = slim
+
     def compare(
         self, baseline: Dict[str, Any], current: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Compare baseline and current configurations."""
         logger.info(f"Comparing {baseline['environment']} baseline with current state")
 
-        diff = DeepDiff(
-            baseline["resources"],
-            current["resources"],
-            ignore_order=True,
-            report_repetition=True,
-        )
-
-        drift_detected = len(diff) > 0
-        drift_summary = self._summarize_drift(diff)
-
-        return {
+        changed_resources: Dict[str, Dict[str, Any]] = {}
+        result: Dict[str, Any] = {
             "environment": current["environment"],
             "baseline_timestamp": baseline["timestamp"],
             "current_timestamp": current["timestamp"],
-            "drift_detected": drift_detected,
-            "drift_summary": drift_summary,
-            "detailed_diff": diff.to_dict() if drift_detected else {},
-            "baseline_resources": baseline["resources"],
-            "current_resources": current["resources"],
         }
+        if self.engine == "keyed":
+            changes = self._keyed_diff(
+                baseline["resources"],
+                current["resources"],
+                _digests(baseline),
+                _digests(current),
+                changed_resources,
+            )
+            result["drift_detected"] = bool(changes)
+            result["drift_summary"] = self._summarize_changes(changes)
+            result["changes"] = changes
+            result["changed_resources"] = changed_resources
+            if not self.slim:
+                result["detailed_diff"] = _detailed_diff(changes)
+        else:
+            diff = self._deepdiff(baseline["resources"], current["resources"])
+            detailed_diff = diff.to_dict() if diff else {}
+            result["drift_detected"] = len(detailed_diff) > 0
+            result["drift_summary"] = self._summarize_drift(diff)
+            result["detailed_diff"] = detailed_diff
+        if "cost_totals" in baseline:
+            result["baseline_cost_totals"] = baseline["cost_totals"]
+        if not self.slim:
+            result["baseline_resources"] = baseline["resources"]
+            result["current_resources"] = current["resources"]
+        return result
 
-    def _summarize_drift(self, diff: DeepDiff) -> Dict[str, List[str]]:
+    def _keyed_diff(
+        self,
+        baseline: Dict[str, List[Any]],
+        current: Dict[str, List[Any]],
+        baseline_digests: Optional[Dict[str, Any]] = None,
+        current_digests: Optional[Dict[str, Any]] = None,
+        changed_resources: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> List[Change]:
+        """Diff resources matched by natural key into change records.
+
+        Before/after records of differing resources are collected into
+        ``changed_resources`` as ``{type: {key: {"before", "after"}}}``.
+        """
+        if changed_resources is None:
+            changed_resources = {}
+        old_types: Dict[str, Any] = {}
+        new_types: Dict[str, Any] = {}
+        if baseline_digests is not None and current_digests is not None:
+            if baseline_digests["root"] == current_digests["root"]:
+                logger.info("Digest roots match; skipping resource comparison")
+                return []
+            old_types = baseline_digests["types"]
+            new_types = current_digests["types"]
+
+        changes: List[Change] = []
+
+        resource_types = list(baseline) + [t for t in current if t not in baseline]
+        for resource_type in resource_types:
+            old_records = baseline.get(resource_type, [])
+            new_records = current.get(resource_type, [])
+            old_hashes: Dict[str, str] = {}
+            new_hashes: Dict[str, str] = {}
+            old_digest = old_types.get(resource_type)
+            new_digest = new_types.get(resource_type)
+            if old_digest and new_digest:
+                if old_digest["root"] == new_digest["root"]:
+                    continue
+                old_hashes = old_digest["resources"]
+                new_hashes = new_digest["resources"]
+
+            old = index_resources(resource_type, old_records)
+            new = index_resources(resource_type, new_records)
+            prefix = f"root[{resource_type!r}]"
+
+            records: Dict[str, Any] = {}
+            for key, position in old.items():
+                path = f"{prefix}[{key!r}]"
+                if key not in new:
+                    record = old_records[position]
+                    changes.append(
+                        Change("removed", resource_type, key, None, record, None, path)
+                    )
+                    records[key] = {"before": record, "after": None}
+                    continue
+                if old_hashes and old_hashes.get(key) == new_hashes.get(key):
+                    continue
+                record, new_record = old_records[position], new_records[new[key]]
+                fields = len(changes)
+                for field_path, field, old_value, new_value in _diff_values(
+                    path, record, new_record
+                ):
+                    changes.append(
+                        Change(
+                            "changed",
+                            resource_type,
+                            key,
+                            field,
+                            old_value,
+                            new_value,
+                            field_path,
+                        )
+                    )
+                if len(changes) > fields:
+                    records[key] = {"before": record, "after": new_record}
+            for key, position in new.items():
+                if key not in old:
+                    record = new_records[position]
+                    path = f"{prefix}[{key!r}]"
+                    changes.append(
+                        Change("added", resource_type, key, None, None, record, path)
+                    )
+                    records[key] = {"before": None, "after": record}
+            if records:
+                changed_resources[resource_type] = records
+
+        return changes
+
+    def _summarize_changes(self, changes: List[Change]) -> Dict[str, List[str]]:
+        """Create human-readable drift summary from change records."""
+        summary: Dict[str, List[str]] = {
+            change_type: [] for change_type in CHANGE_TYPES
+        }
+        for change in changes:
+            summary[change.change_type].append(change.path)
+        return summary
+
+    def _deepdiff(
+        self, baseline: Dict[str, Any], current: Dict[str, Any]
+    ) -> "DeepDiff":
+        # Imported here: deepdiff is slow to import and only needed to compare
+        from deepdiff import DeepDiff
+
+        return DeepDiff(
+            baseline,
+            current,
+            ignore_order=True,
+            report_repetition=True,
+        )
+
+    def _summarize_drift(self, diff: "DeepDiff") -> Dict[str, List[str]]:
         """Create human-readable drift summary."""
         summary: Dict[str, List[str]] = {
             "added": [],
@@ -59,3 +200,48 @@ class DriftComparator:
                 summary["changed"].append(str(item))
 
         return summary
+
+
+def _digests(scan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return a scan's digest tree if it has one this version understands."""
+    digests: Optional[Dict[str, Any]] = scan.get("digests")
+    if digests and digests.get("version") == DIGEST_VERSION:
+        return digests
+    return None
+
+
+def _detailed_diff(changes: List[Change]) -> Dict[str, Any]:
+    """Render change records in DeepDiff's result shape."""
+    diff: Dict[str, Any] = {}
+    for change in changes:
+        if change.change_type == "added":
+            diff.setdefault("dictionary_item_added", []).append(change.path)
+        elif change.change_type == "removed":
+            diff.setdefault("dictionary_item_removed", []).append(change.path)
+        else:
+            diff.setdefault("values_changed", {})[change.path] = {
+                "old_value": change.old_value,
+                "new_value": change.new_value,
+            }
+    return diff
+
+
+def _diff_values(
+    path: str, old: Any, new: Any, field: Optional[str] = None
+) -> Iterator[Tuple[str, Optional[str], Any, Any]]:
+    """Yield (path, field, old, new) per differing field, recursing into dicts."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in list(old) + [k for k in new if k not in old]:
+            field_path = f"{path}[{key!r}]"
+            if key not in new:
+                yield field_path, key, old[key], None
+            elif key not in old:
+                yield field_path, key, None, new[key]
+            elif old[key] != new[key]:
+                yield from _diff_values(field_path, old[key], new[key], key)
+    elif isinstance(old, list) and isinstance(new, list):
+        # Nested lists (e.g. subnets) are compared as unordered collections
+        if sorted(map(canonical_json, old)) != sorted(map(canonical_json, new)):
+            yield path, field, old, new
+    else:
+        yield path, field, old, new
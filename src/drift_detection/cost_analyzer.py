@@ -1,11 +1,16 @@
 """Cost impact analysis for infrastructure drift."""
 
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from drift_detection.changes import Change
+from drift_detection.hashing import index_resources
+from drift_detection.pricing import PricingCatalog
 
 logger = logging.getLogger(__name__)
 
-COST_PER_HOUR = {
+# Hourly prices: per-instance-type tables for ec2/rds, rates for the rest
+COST_PER_HOUR: Dict[str, Any] = {
     "ec2": {
         "t3.micro": 0.0104,
         "t3.small": 0.0208,
@@ -48,27 +53,103 @@ ECS_TASK_SIZES = {
     "2vCPU-4GB": (2.0, 4.0),
 }
 
+# Bump when pricing changes, so totals saved with baselines are recomputed
+COST_TOTALS_VERSION = 2
+
+# Fields each resource type's price depends on, per _resource_cost
+PRICED_FIELDS = {
+    "ec2": {"instance_type", "state"},
+    "rds": {"db_instance_class"},
+    "lambda": {"memory_size"},
+    "ecs": {"desired_count"},
+    "vpc": {"has_nat_gateway"},
+}
+
 
 class CostAnalyzer:
     """Analyzes cost impact of infrastructure drift."""
 
+    def __init__(
+        self, region: str = "us-east-1", pricing: Optional[PricingCatalog] = None
+    ):
+        self.region = region
+        # Instance types the catalog does not list fall back to COST_PER_HOUR
+        self.pricing = pricing
+
     def analyze_cost_impact(self, drift_result: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate cost impact of drift."""
+        """Calculate cost impact of drift, with per-resource details."""
         if not drift_result["drift_detected"]:
             return {"total_monthly_impact": 0.0, "details": []}
 
-        baseline_cost = self._calculate_environment_cost(
-            drift_result.get("baseline_resources", {})
-        )
-        current_cost = self._calculate_environment_cost(
-            drift_result.get("current_resources", {})
+        if "changed_resources" not in drift_result:
+            # DeepDiff results: price both trees in full, once per resource
+            before = self._cost_table(drift_result.get("baseline_resources", {}))
+            after = self._cost_table(drift_result.get("current_resources", {}))
+            details = _sorted_rows(
+                _cost_row(*item, before.get(item), after.get(item))
+                for item in {**before, **after}
+                if before.get(item) != after.get(item)
+            )
+            baseline_cost, current_cost = sum(before.values()), sum(after.values())
+            return dict(
+                self._impact(baseline_cost, current_cost - baseline_cost),
+                details=details,
+            )
+
+        # Keyed results: only the changed resources are priced
+        details = self._resource_deltas(
+            drift_result["changed_resources"], drift_result.get("changes")
         )
+        hourly_delta = sum(row["hourly_delta"] for row in details)
+
+        totals = drift_result.get("baseline_cost_totals")
+        if (
+            totals
+            and totals.get("version") == COST_TOTALS_VERSION
+            and totals.get("pricing") == self._pricing_id()
+        ):
+            baseline_cost = totals["hourly_cost"]
+        elif "baseline_resources" in drift_result:
+            baseline_cost = self._calculate_environment_cost(
+                drift_result["baseline_resources"]
+            )
+        else:
+            logger.info("Baseline has no cost totals; re-run 'baseline' to add them")
+            return {
+                "monthly_impact": round(hourly_delta * 730, 2),
+                "details": details,
+            }
+        return dict(self._impact(baseline_cost, hourly_delta), details=details)
+
+    def environment_totals(self, resources: Dict[str, Any]) -> Dict[str, Any]:
+        """Price a whole environment, for saving alongside its baseline."""
+        return {
+            "version": COST_TOTALS_VERSION,
+            "pricing": self._pricing_id(),
+            "hourly_cost": self._calculate_environment_cost(resources),
+        }
+
+    def _pricing_id(self) -> Optional[str]:
+        """Identify the prices in use; None for the built-in table."""
+        if self.pricing is None:
+            return None
+        return f"{self.region}/{self.pricing.version}"
 
-        monthly_impact = (current_cost - baseline_cost) * 730
+    def _instance_price(self, service: str, instance_type: str) -> float:
+        """Hourly price of an instance type, from the catalog if it has one."""
+        if self.pricing is not None and instance_type:
+            price = self.pricing.hourly(self.region, service, instance_type)
+            if price is not None:
+                return price
+        return float(COST_PER_HOUR[service].get(instance_type, 0))
+
+    def _impact(self, baseline_cost: float, hourly_delta: float) -> Dict[str, Any]:
+        """Summarize an hourly baseline cost and delta as monthly figures."""
+        monthly_impact = hourly_delta * 730
 
         return {
             "baseline_monthly_cost": round(baseline_cost * 730, 2),
-            "current_monthly_cost": round(current_cost * 730, 2),
+            "current_monthly_cost": round((baseline_cost + hourly_delta) * 730, 2),
             "monthly_impact": round(monthly_impact, 2),
             "impact_percentage": round(
                 (
@@ -80,48 +161,132 @@ class CostAnalyzer:
             ),
         }
 
+    def _resource_deltas(
+        self,
+        changed_resources: Dict[str, Dict[str, Any]],
+        changes: Optional[Iterable[Change]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Price each changed resource before and after the drift.
+
+        Given the change records, resources whose changed fields cannot
+        affect their price are skipped without being priced. Resources
+        whose cost did not move are left out.
+        """
+        priced: Optional[Set[Tuple[str, Hashable]]] = None
+        if changes is not None:
+            priced = {
+                (change.resource_type, change.resource_id)
+                for change in changes
+                if change.change_type != "changed"
+                or change.field_name in PRICED_FIELDS.get(change.resource_type, ())
+            }
+
+        rows = []
+        for resource_type, records in changed_resources.items():
+            for key, change in records.items():
+                if priced is not None and (resource_type, key) not in priced:
+                    continue
+                before, after = change["before"], change["after"]
+                row = _cost_row(
+                    resource_type,
+                    key,
+                    (
+                        None
+                        if before is None
+                        else self._resource_cost(resource_type, before)
+                    ),
+                    (
+                        None
+                        if after is None
+                        else self._resource_cost(resource_type, after)
+                    ),
+                )
+                if row["hourly_delta"] != 0:
+                    rows.append(row)
+        return _sorted_rows(rows)
+
+    def _cost_table(self, resources: Dict[str, Any]) -> Dict[Tuple[str, str], float]:
+        """Price every resource, keyed by (type, natural key)."""
+        return {
+            (resource_type, key): self._resource_cost(resource_type, records[position])
+            for resource_type, records in resources.items()
+            for key, position in index_resources(resource_type, records).items()
+        }
+
     def _calculate_environment_cost(self, resources: Dict[str, Any]) -> float:
         """Calculate hourly cost for environment resources."""
-        total_cost = 0.0
+        return sum(
+            self._resource_cost(resource_type, record)
+            for resource_type, records in resources.items()
+            for record in records
+        )
 
+    def _resource_cost(self, resource_type: str, record: Dict[str, Any]) -> float:
+        """Calculate hourly cost of a single resource."""
         # EC2 instances
-        for instance in resources.get("ec2", []):
-            instance_type = instance.get("instance_type", "")
-            if instance.get("state") == "running":
-                cost = COST_PER_HOUR["ec2"].get(instance_type, 0)
-                total_cost += cost
+        if resource_type == "ec2":
+            if record.get("state") != "running":
+                return 0.0
+            return self._instance_price("ec2", record.get("instance_type", ""))
 
         # RDS instances
-        for db in resources.get("rds", []):
-            instance_class = db.get("db_instance_class", "")
-            cost = COST_PER_HOUR["rds"].get(instance_class, 0)
-            total_cost += cost
+        if resource_type == "rds":
+            return self._instance_price("rds", record.get("db_instance_class", ""))
 
         # S3 buckets (estimate 10GB per bucket)
-        s3_count = len(resources.get("s3", []))
-        total_cost += s3_count * 10 * COST_PER_HOUR["s3_storage_gb"]
+        if resource_type == "s3":
+            return 10 * float(COST_PER_HOUR["s3_storage_gb"])
 
         # Lambda functions (estimate 1M invocations/month, 1s duration)
-        for func in resources.get("lambda", []):
-            memory_mb = func.get("memory_size", 128)
-            memory_gb = LAMBDA_MEMORY_TO_GB.get(memory_mb, 0.125)
+        if resource_type == "lambda":
+            memory_mb: int = record.get("memory_size", 128)
+            memory_gb = LAMBDA_MEMORY_TO_GB.get(memory_mb, memory_mb / 1024)
             # 1M invocations * 1s * memory GB / 730 hours
             monthly_gb_seconds = 1_000_000 * 1 * memory_gb
-            hourly_cost = monthly_gb_seconds * COST_PER_HOUR["lambda_gb_second"] / 730
-            total_cost += hourly_cost
+            return monthly_gb_seconds * float(COST_PER_HOUR["lambda_gb_second"]) / 730
 
         # ECS services (assume 1vCPU-2GB per service)
-        for service in resources.get("ecs", []):
-            desired_count = service.get("desired_count", 1)
+        if resource_type == "ecs":
+            desired_count: int = record.get("desired_count", 1)
             vcpu, memory_gb = ECS_TASK_SIZES.get("1vCPU-2GB", (1.0, 2.0))
-            service_cost = desired_count * COST_PER_HOUR["ecs_fargate_vcpu"] * vcpu
-            service_cost += desired_count * COST_PER_HOUR["ecs_fargate_gb"] * memory_gb
-            total_cost += service_cost
+            vcpu_rate = float(COST_PER_HOUR["ecs_fargate_vcpu"])
+            gb_rate = float(COST_PER_HOUR["ecs_fargate_gb"])
+            service_cost = desired_count * vcpu_rate * vcpu
+            service_cost += desired_count * gb_rate * memory_gb
+            return service_cost
 
         # VPC costs (NAT gateways if present)
-        for vpc in resources.get("vpc", []):
+        if resource_type == "vpc":
             # Check if VPC has NAT gateway (simplified check)
-            if vpc.get("has_nat_gateway", False):
-                total_cost += COST_PER_HOUR["nat_gateway"]
+            if record.get("has_nat_gateway", False):
+                return float(COST_PER_HOUR["nat_gateway"])
+
+        return 0.0
+
+
+def _cost_row(
+    resource_type: str,
+    resource_id: Hashable,
+    before: Optional[float],
+    after: Optional[float],
+) -> Dict[str, Any]:
+    """Describe one resource's hourly cost before and after drift."""
+    before_hourly = before or 0.0
+    after_hourly = after or 0.0
+    hourly_delta = after_hourly - before_hourly
+    return {
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "change_type": (
+            "added" if before is None else "removed" if after is None else "changed"
+        ),
+        "before_hourly": before_hourly,
+        "after_hourly": after_hourly,
+        "hourly_delta": hourly_delta,
+        "monthly_delta": round(hourly_delta * 730, 2),
+    }
+
 
-        return total_cost
+def _sorted_rows(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Order cost rows by how far they moved, largest first."""
+    return sorted(rows, key=lambda row: abs(row["hourly_delta"]), reverse=True)
@@ -0,0 +1,26 @@
+"""Default tuning values, importable without pulling in boto3."""
+
+# One worker per resource type scans everything in parallel
+DEFAULT_MAX_WORKERS = 6
+
+# Resource-type scans allowed in flight across all orchestrated targets
+DEFAULT_MAX_CONCURRENCY = 16
+
+# Serializer and compression for objects written by S3Storage
+DEFAULT_STORAGE_FORMAT = "json+gzip"
+
+# Upper bound on the local baseline cache (Lambda /tmp defaults to 512 MiB)
+DEFAULT_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+# Concurrent requests when writing or reassembling deduplicated scans
+DEFAULT_TRANSFER_WORKERS = 8
+
+# Multipart upload part and ranged download size (S3 minimum part is 5 MiB)
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+# Environments compared, reported and alerted on concurrently
+DEFAULT_PIPELINE_WORKERS = 4
+
+# History entries kept per environment catalog; older ones are dropped so
+# every save's read-modify-write stays small (about a year of hourly runs)
+DEFAULT_CATALOG_MAX_ENTRIES = 20_000
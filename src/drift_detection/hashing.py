@@ -0,0 +1,88 @@
+"""Canonical encoding, content hashes and Merkle digests for scan records."""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+# Field identifying a resource across scans, per resource type
+RESOURCE_KEYS = {
+    "vpc": "vpc_id",
+    "ec2": "instance_id",
+    "rds": "db_instance_identifier",
+    "s3": "bucket_name",
+    "lambda": "function_name",
+    "ecs": "service_name",
+}
+
+DIGEST_VERSION = 1
+
+
+def canonical_json(data: Any) -> bytes:
+    """Encode ``data`` so equal documents always produce equal bytes."""
+    return json.dumps(
+        data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode()
+
+
+def content_hash(data: Any) -> str:
+    """Return the SHA-256 hex digest of ``data``'s canonical encoding."""
+    return hashlib.sha256(canonical_json(data)).hexdigest()
+
+
+def resource_key(resource_type: str, record: Any) -> Optional[str]:
+    """Return a record's natural key, or None if its type has none."""
+    key_field = RESOURCE_KEYS.get(resource_type)
+    if key_field and isinstance(record, dict) and key_field in record:
+        return str(record[key_field])
+    return None
+
+
+def index_resources(
+    resource_type: str, records: Sequence[Any], hashes: Optional[Sequence[str]] = None
+) -> Dict[str, int]:
+    """Map each record's key to its position, keeping duplicate keys distinct.
+
+    Records without a natural key are keyed by content hash, so identical
+    records still pair up across scans.
+    """
+    indexed: Dict[str, int] = {}
+    for position, record in enumerate(records):
+        key = resource_key(resource_type, record)
+        if key is None:
+            key = hashes[position] if hashes else content_hash(record)
+        if key in indexed:
+            # e.g. same-named ECS services in different clusters
+            occurrence = 2
+            while f"{key}#{occurrence}" in indexed:
+                occurrence += 1
+            key = f"{key}#{occurrence}"
+        indexed[key] = position
+    return indexed
+
+
+def resource_digests(
+    resources: Mapping[str, Sequence[Any]],
+    hashes: Optional[Mapping[str, List[str]]] = None,
+) -> Dict[str, Any]:
+    """Build a Merkle-style digest tree over a scan's resources.
+
+    Each resource is hashed, each type's root hashes its ``key -> hash``
+    map, and the overall root hashes the type roots, so two scans with
+    equal roots are equal without looking further. ``hashes`` may supply
+    precomputed per-record hashes in list order (as scan manifests do).
+    """
+    types = {}
+    for resource_type, records in resources.items():
+        record_hashes = (
+            hashes[resource_type]
+            if hashes and resource_type in hashes
+            else [content_hash(record) for record in records]
+        )
+        index = index_resources(resource_type, records, record_hashes)
+        by_key = {key: record_hashes[position] for key, position in index.items()}
+        types[resource_type] = {"root": content_hash(by_key), "resources": by_key}
+    return {
+        "version": DIGEST_VERSION,
+        "root": content_hash({t: digest["root"] for t, digest in types.items()}),
+        "types": types,
+    }
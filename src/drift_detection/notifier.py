@@ -12,8 +12,13 @@ logger = logging.getLogger(__name__)
 class SNSNotifier:
     """Sends drift alerts via AWS SNS."""
 
-    def __init__(self, region: str = "us-east-1"):
-        self.sns = boto3.client("sns", region_name=region)
+    def __init__(
+        self, region: str = "us-east-1", session: Optional[boto3.Session] = None
+    ):
+        if session is not None:
+            self.sns = session.client("sns")
+        else:
+            self.sns = boto3.client("sns", region_name=region)
 
     def send_alert(
         self, report: Dict[str, Any], topic_arn: str, min_risk: str = "high"
@@ -72,10 +77,21 @@ class SNSNotifier:
         cost = report["cost_impact"]
         if cost["monthly_impact"] != 0:
             sign = "+" if cost["monthly_impact"] > 0 else ""
+            percentage = (
+                f" ({cost['impact_percentage']:+.1f}%)"
+                if "impact_percentage" in cost
+                else ""
+            )
             lines.append(
-                f"Cost Impact: {sign}${cost['monthly_impact']:.2f}/month "
-                f"({cost['impact_percentage']:+.1f}%)"
+                f"Cost Impact: {sign}${cost['monthly_impact']:.2f}/month{percentage}"
             )
+            for mover in report.get("cost_movers", [])[:3]:
+                delta = mover["monthly_delta"]
+                lines.append(
+                    f"  - {mover['resource_type']} {mover['resource_id']} "
+                    f"({mover['change_type']}): "
+                    f"{'+' if delta > 0 else '-'}${abs(delta):.2f}/month"
+                )
             lines.append("")
 
         # Top recommendations
@@ -0,0 +1,160 @@
+"""Parallel scans across regions and assumed-role accounts."""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import boto3
+
+from drift_detection.defaults import DEFAULT_MAX_CONCURRENCY
+from drift_detection.scanner import AWSScanner
+
+logger = logging.getLogger(__name__)
+
+
+class ScanTarget(NamedTuple):
+    """One account/region pair to scan."""
+
+    region: str
+    role_arn: Optional[str] = None
+
+
+class ScanOrchestrator:
+    """Scans a matrix of regions and accounts concurrently.
+
+    Every target gets its own ``AWSScanner`` (and so its own rate limiter,
+    since AWS limits are per account and region), while one semaphore caps
+    the resource-type scans running at once across all of them.
+    """
+
+    def __init__(
+        self,
+        targets: Sequence[ScanTarget],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        profile_name: Optional[str] = None,
+        session_name: str = "drift-detection",
+    ):
+        self.targets = list(targets)
+        self.max_concurrency = max_concurrency
+        self.profile_name = profile_name
+        self.session = boto3.Session(profile_name=profile_name)
+        self.session_name = session_name
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    @classmethod
+    def from_matrix(
+        cls,
+        regions: Sequence[str],
+        role_arns: Sequence[Optional[str]] = (None,),
+        **kwargs: Any,
+    ) -> "ScanOrchestrator":
+        """Build targets for every account and region combination."""
+        for role_arn in role_arns:
+            # Reject a malformed ARN before any target is scanned
+            _account_from_role(role_arn)
+        targets = [
+            ScanTarget(region=region, role_arn=role_arn)
+            for role_arn in role_arns or (None,)
+            for region in regions
+        ]
+        return cls(targets, **kwargs)
+
+    def scan(self, environments: Sequence[str]) -> Dict[str, Any]:
+        """Scan all targets and merge results keyed by ``account/region``."""
+        timestamp = datetime.utcnow().isoformat()
+        logger.info(
+            f"Scanning {len(self.targets)} targets "
+            f"(max concurrency {self.max_concurrency})"
+        )
+
+        if not self.targets:
+            return {"timestamp": timestamp, "targets": {}}
+
+        # Sessions are not thread-safe, so the STS client is made up front
+        sts = self.session.client("sts")
+        with ThreadPoolExecutor(
+            max_workers=len(self.targets), thread_name_prefix="drift-target"
+        ) as executor:
+            results = list(
+                executor.map(
+                    lambda target: self._scan_target(target, list(environments), sts),
+                    self.targets,
+                )
+            )
+
+        return {
+            "timestamp": timestamp,
+            "targets": {
+                f"{result['account_id']}/{result['region']}": result
+                for result in results
+            },
+        }
+
+    def _scan_target(
+        self, target: ScanTarget, environments: List[str], sts: Any
+    ) -> Dict[str, Any]:
+        """Scan one target, recording timing and failures instead of raising."""
+        start = time.perf_counter()
+        result: Dict[str, Any] = {
+            "account_id": None,
+            "region": target.region,
+            "role_arn": target.role_arn,
+        }
+
+        try:
+            result["account_id"] = _account_from_role(target.role_arn)
+            session = self._target_session(target, sts)
+            if result["account_id"] is None:
+                result["account_id"] = session.client("sts").get_caller_identity()[
+                    "Account"
+                ]
+            scanner = AWSScanner(
+                region=target.region, session=session, slots=self._slots
+            )
+            result["environments"] = scanner.scan_account(environments)
+            result["scan_errors"] = {
+                env: errors for env, errors in scanner.scan_errors.items() if errors
+            }
+            result["status"] = "failed" if result["scan_errors"] else "ok"
+        except Exception as e:
+            # One unreachable account must not sink the whole matrix
+            logger.error(f"Scan of {target.role_arn or 'default'}/{target.region}: {e}")
+            result["status"] = "failed"
+            result["error"] = str(e)
+            result["account_id"] = result["account_id"] or "unknown"
+
+        result["duration_seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    def _target_session(self, target: ScanTarget, sts: Any) -> boto3.Session:
+        """Return a session for the target, assuming its role if it has one."""
+        if target.role_arn is None:
+            return boto3.Session(
+                profile_name=self.profile_name, region_name=target.region
+            )
+
+        credentials = sts.assume_role(
+            RoleArn=target.role_arn, RoleSessionName=self.session_name
+        )["Credentials"]
+        return boto3.Session(
+            aws_access_key_id=credentials["AccessKeyId"],
+            aws_secret_access_key=credentials["SecretAccessKey"],
+            aws_session_token=credentials["SessionToken"],
+            region_name=target.region,
+        )
+
+
+def _account_from_role(role_arn: Optional[str]) -> Optional[str]:
+    """Extract the account ID from an IAM role ARN."""
+    if not role_arn:
+        return None
+    parts = role_arn.split(":")
+    if len(parts) < 6 or parts[0] != "arn" or not parts[4]:
+        raise ValueError(
+            f"Malformed role ARN '{role_arn}'; "
+            "expected arn:aws:iam::<account-id>:role/<name>"
+        )
+    return parts[4]
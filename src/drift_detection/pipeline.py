@@ -0,0 +1,138 @@
+"""Concurrent drift detection across environments."""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from drift_detection.defaults import DEFAULT_PIPELINE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class EnvironmentOutcome(NamedTuple):
+    """Result of running detection for one environment.
+
+    ``status`` is one of ``no_baseline``, ``scan_failed``, ``no_drift`` or
+    ``drift_detected``; the remaining fields are set as far as it got.
+    """
+
+    environment: str
+    status: str
+    drift_result: Optional[Dict[str, Any]] = None
+    report: Optional[Dict[str, Any]] = None
+    report_key: Optional[str] = None
+    message_id: Optional[str] = None
+    scan_errors: Optional[Dict[str, str]] = None
+
+
+class DetectionPipeline:
+    """Runs load, scan, compare, report, save and notify for many environments."""
+
+    def __init__(
+        self,
+        scanner: Any,
+        storage: Any,
+        comparator: Any,
+        reporter: Any,
+        notifier: Optional[Callable[[], Any]] = None,
+        sns_topic: Optional[str] = None,
+        min_risk: str = "high",
+        max_workers: int = DEFAULT_PIPELINE_WORKERS,
+    ):
+        self.scanner = scanner
+        self.storage = storage
+        self.comparator = comparator
+        self.reporter = reporter
+        self.sns_topic = sns_topic
+        self.min_risk = min_risk
+        self.max_workers = max_workers
+        # Built on first alert, once, however many workers need it
+        self._notifier_factory = notifier
+        self._notifier: Any = None
+        self._notifier_lock = threading.Lock()
+
+    def run(
+        self,
+        environments: Sequence[str],
+        incremental: bool = False,
+        per_environment: bool = False,
+    ) -> List[EnvironmentOutcome]:
+        """Detect drift in every environment, returning outcomes in order.
+
+        With ``per_environment`` each environment is scanned separately on
+        its worker instead of sharing one account pass.
+        """
+        environments = list(environments)
+        baselines = dict(
+            zip(environments, self._map(self.storage.load_baseline, environments))
+        )
+        scanned = [env for env in environments if baselines[env]]
+        previous: Optional[Dict[str, Any]] = None
+        if incremental:
+            previous = dict(
+                zip(scanned, self._map(self.storage.load_snapshot, scanned))
+            )
+
+        snapshot: Dict[str, Dict[str, Any]] = {}
+        if scanned and not per_environment:
+            snapshot = self.scanner.scan_account(scanned, previous)
+
+        # One worker per environment, so its S3 and SNS round trips overlap
+        # another environment's comparison
+        def process(env: str) -> EnvironmentOutcome:
+            baseline = baselines[env]
+            if not baseline:
+                return EnvironmentOutcome(env, "no_baseline")
+            current = snapshot.get(env)
+            if current is None:
+                current = self.scanner.scan_environment(
+                    env,
+                    incremental=incremental,
+                    previous=previous.get(env) if previous else None,
+                )
+            return self._detect(env, baseline, current)
+
+        return self._map(process, environments)
+
+    def _detect(
+        self, env: str, baseline: Dict[str, Any], current: Dict[str, Any]
+    ) -> EnvironmentOutcome:
+        scan_errors = self.scanner.scan_errors.get(env)
+        if scan_errors:
+            # Comparing an incomplete scan would report false removals
+            return EnvironmentOutcome(env, "scan_failed", scan_errors=scan_errors)
+        if "change_markers" in current:
+            self.storage.save_snapshot(env, current)
+
+        drift_result = self.comparator.compare(baseline, current)
+        report = self.reporter.generate_report(drift_result)
+        report_key = self.storage.save_report(env, report)
+
+        if not drift_result["drift_detected"]:
+            return EnvironmentOutcome(env, "no_drift", drift_result, report, report_key)
+
+        message_id = None
+        if self.sns_topic and self._notifier_factory:
+            message_id = self._get_notifier().send_alert(
+                report, self.sns_topic, min_risk=self.min_risk
+            )
+        return EnvironmentOutcome(
+            env, "drift_detected", drift_result, report, report_key, message_id
+        )
+
+    def _get_notifier(self) -> Any:
+        with self._notifier_lock:
+            if self._notifier is None and self._notifier_factory is not None:
+                self._notifier = self._notifier_factory()
+            return self._notifier
+
+    def _map(self, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """Apply ``func`` to ``items`` on the worker pool, preserving order."""
+        if len(items) <= 1 or self.max_workers <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(items)),
+            thread_name_prefix="drift-env",
+        ) as executor:
+            return list(executor.map(func, items))
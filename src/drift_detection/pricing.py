@@ -0,0 +1,209 @@
+"""Offline pricing catalog built from AWS bulk price-list exports."""
+
+import csv
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Offer codes of the price lists we import, by service name used here
+OFFER_CODES = {"AmazonEC2": "ec2", "AmazonRDS": "rds"}
+
+# On-demand rows priced per instance-hour, narrowed to the configuration
+# drift costs assume: shared-tenancy Linux for EC2, single-AZ MySQL for RDS
+ROW_FILTERS = {
+    "ec2": {
+        "TermType": "OnDemand",
+        "Unit": "Hrs",
+        "Tenancy": "Shared",
+        "Operating System": "Linux",
+        "Pre Installed S/W": "NA",
+        "CapacityStatus": "Used",
+    },
+    "rds": {
+        "TermType": "OnDemand",
+        "Unit": "Hrs",
+        "Database Engine": "MySQL",
+        "Deployment Option": "Single-AZ",
+    },
+}
+
+# Columns every imported price list must have besides its filter columns
+PRICE_COLUMNS = ("Region Code", "Instance Type", "PricePerUnit")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    region TEXT NOT NULL,
+    service TEXT NOT NULL,
+    family TEXT NOT NULL,
+    size TEXT NOT NULL,
+    hourly REAL NOT NULL,
+    PRIMARY KEY (region, service, family, size)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    service TEXT PRIMARY KEY,
+    version TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+Price = Tuple[str, str, str, str, float]
+
+
+def split_instance_type(instance_type: str) -> Tuple[str, str]:
+    """Split ``m5.large`` into (``m5``, ``large``), ``db.r6g.xl`` likewise."""
+    family, _, size = instance_type.rpartition(".")
+    return family, size
+
+
+def read_price_list(path: str) -> Tuple[str, str, Iterator[Price]]:
+    """Stream an AWS bulk price-list CSV as price rows.
+
+    Returns the service, the price list's version and an iterator of
+    ``(region, service, family, size, hourly)``; the export is read row by
+    row, so multi-gigabyte files never sit in memory.
+    """
+    f = open(path, newline="", encoding="utf-8")
+    try:
+        reader = csv.reader(f)
+        metadata: Dict[str, str] = {}
+        for row in reader:
+            if row and row[0] == "SKU":
+                header = row
+                break
+            if len(row) >= 2:
+                metadata[row[0]] = row[1]
+        else:
+            raise ValueError(f"{path} is not an AWS price-list CSV (no SKU header)")
+
+        service = OFFER_CODES.get(metadata.get("OfferCode", ""))
+        if service is None:
+            raise ValueError(
+                f"Unsupported price list offer {metadata.get('OfferCode')!r}"
+            )
+        version = metadata.get("Version") or metadata.get("Publication Date", "")
+
+        column = {name: index for index, name in enumerate(header)}
+        required = [*ROW_FILTERS[service], *PRICE_COLUMNS]
+        missing = [name for name in required if name not in column]
+        if missing:
+            raise ValueError(f"{path} lacks price-list columns: {', '.join(missing)}")
+    except BaseException:
+        # rows() owns the file once we return; until then it is ours to close
+        f.close()
+        raise
+
+    filters = [(column[name], value) for name, value in ROW_FILTERS[service].items()]
+    region_col, type_col = column["Region Code"], column["Instance Type"]
+    price_col = column["PricePerUnit"]
+
+    def rows() -> Iterator[Price]:
+        with f:
+            for row in reader:
+                if len(row) != len(header):
+                    continue
+                if any(row[index] != value for index, value in filters):
+                    continue
+                family, size = split_instance_type(row[type_col])
+                if not family:
+                    continue
+                yield row[region_col], service, family, size, float(row[price_col])
+
+    return service, version, rows()
+
+
+def import_price_lists(db_path: str, paths: Iterable[str]) -> Dict[str, int]:
+    """Load price-list CSVs into the catalog at ``db_path``.
+
+    Rows replace any earlier prices for the same key, so re-importing a
+    newer export updates the catalog in place. Returns rows per service.
+    """
+    counts: Dict[str, int] = {}
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.executescript(SCHEMA)
+        for path in paths:
+            service, version, rows = read_price_list(path)
+            with connection:
+                before = connection.total_changes
+                connection.executemany(
+                    "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?)", rows
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)", (service, version)
+                )
+                imported = connection.total_changes - before - 1
+            counts[service] = counts.get(service, 0) + imported
+            logger.info(f"Imported {imported} {service} prices from {path}")
+    finally:
+        connection.close()
+    return counts
+
+
+class PricingCatalog:
+    """Read-only hourly prices keyed by region, service, family and size.
+
+    The SQLite file is only opened on the first lookup, and every answer,
+    including misses, is memoized, so a run touches the database once per
+    distinct instance type no matter how many resources share it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._prices: Dict[Tuple[str, str, str], Optional[float]] = {}
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def hourly(self, region: str, service: str, instance_type: str) -> Optional[float]:
+        """Return the on-demand hourly price, or None if the catalog lacks it."""
+        key = (region, service, instance_type)
+        try:
+            return self._prices[key]
+        except KeyError:
+            pass
+        family, size = split_instance_type(instance_type)
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT hourly FROM prices "
+                    "WHERE region = ? AND service = ? AND family = ? AND size = ?",
+                    (region, service, family, size),
+                )
+                .fetchone()
+            )
+        self._prices[key] = price = row[0] if row else None
+        return price
+
+    @property
+    def version(self) -> str:
+        """Identify the imported price lists, e.g. for invalidating totals."""
+        if self._version is None:
+            with self._lock:
+                rows: List[Tuple[str, str]] = (
+                    self._connect()
+                    .execute("SELECT service, version FROM meta ORDER BY service")
+                    .fetchall()
+                )
+            self._version = ",".join(f"{s}:{v}" for s, v in rows)
+        return self._version
+
+    def close(self) -> None:
+        """Close the database connection, if it was opened."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f"Pricing catalog not found: {self.path}")
+            # Shared by pipeline workers; queries are serialized by _lock
+            self._connection = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+            )
+        return self._connection
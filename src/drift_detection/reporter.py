@@ -1,20 +1,28 @@
 """Report generation for drift detection results."""
 
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from drift_detection.cost_analyzer import CostAnalyzer
 from drift_detection.risk_scorer import RiskScorer
 
 logger = logging.getLogger(__name__)
 
+# Resources listed as the largest cost movers in each report
+TOP_COST_MOVERS = 5
+
 
 class DriftReporter:
     """Generates drift detection reports."""
 
-    def __init__(self):
-        self.cost_analyzer = CostAnalyzer()
+    def __init__(
+        self,
+        cost_analyzer: Optional[CostAnalyzer] = None,
+        top_cost_movers: int = TOP_COST_MOVERS,
+    ):
+        self.cost_analyzer = cost_analyzer or CostAnalyzer()
         self.risk_scorer = RiskScorer()
+        self.top_cost_movers = top_cost_movers
 
     def generate_report(self, drift_result: Dict[str, Any]) -> Dict[str, Any]:
         """Generate comprehensive drift report."""
@@ -32,6 +40,8 @@ class DriftReporter:
             "details": drift_result["drift_summary"],
             "risk_assessment": risk_assessment,
             "cost_impact": cost_impact,
+            # Cost rows come largest movement first
+            "cost_movers": cost_impact["details"][: self.top_cost_movers],
             "recommendations": self._generate_recommendations(
                 drift_result, risk_assessment
             ),
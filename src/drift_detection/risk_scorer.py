@@ -2,7 +2,9 @@
 
 import logging
 from enum import Enum
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from drift_detection.changes import CHANGE_TYPES, Change, parse_change_path
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +19,21 @@ class RiskLevel(str, Enum):
     INFO = "info"
 
 
+# Levels in ascending severity; a level's index is its integer severity
+SEVERITY_ORDER = (
+    RiskLevel.INFO,
+    RiskLevel.LOW,
+    RiskLevel.MEDIUM,
+    RiskLevel.HIGH,
+    RiskLevel.CRITICAL,
+)
+SEVERITY = {level: index for index, level in enumerate(SEVERITY_ORDER)}
+
+DEFAULT_REASON = "Infrastructure change detected"
+
+_Rule = Tuple[int, RiskLevel, str]
+
+
 class RiskScorer:
     """Scores risk level of infrastructure drift."""
 
@@ -49,138 +66,119 @@ class RiskScorer:
         "memory_size",
     }
 
+    RISK_REASONS = {
+        "rds": "Database changes can cause downtime or data loss",
+        "vpc": "Network changes can break connectivity",
+        "ec2": "Compute changes affect performance and cost",
+        "ecs": "Container changes can disrupt services",
+        "lambda": "Function changes may break integrations",
+        "s3": "Storage changes can affect data access",
+    }
+
+    def __init__(self) -> None:
+        # (resource type, change type, critical field or None) ->
+        # (severity index, level, reason); critical fields fill in on use
+        self._rules: Dict[Tuple[str, str, Optional[str]], _Rule] = {
+            (resource_type, change_type, None): self._rule(
+                resource_type, change_type, None
+            )
+            for resource_type in (*self.RESOURCE_RISK, "unknown")
+            for change_type in self.CHANGE_RISK
+        }
+
     def score_drift(self, drift_result: Dict[str, Any]) -> Dict[str, Any]:
         """Score risk for all detected drift."""
         if not drift_result["drift_detected"]:
             return {"overall_risk": RiskLevel.INFO, "scored_changes": []}
 
+        if "changes" in drift_result:
+            return self.score_changes(drift_result["changes"])
+
+        # DeepDiff engine results only carry paths
+        summary = drift_result["drift_summary"]
+        return self.score_changes(
+            parse_change_path(path, change_type)
+            for change_type in CHANGE_TYPES
+            for path in summary.get(change_type, [])
+        )
+
+    def score_changes(self, changes: Iterable[Change]) -> Dict[str, Any]:
+        """Score a batch of structured changes.
+
+        Each change costs one lookup in a table of precomputed severities
+        and reasons; the overall risk and distribution come from integer
+        counts per severity rather than comparing levels pairwise.
+        """
+        rules = self._rules
+        critical_fields = self.CRITICAL_FIELDS
+        counts = [0] * len(SEVERITY_ORDER)
         scored_changes = []
-        risk_levels = []
-
-        for change_type in ["added", "removed", "changed"]:
-            for item in drift_result["drift_summary"].get(change_type, []):
-                score = self._score_change(item, change_type)
-                scored_changes.append(score)
-                risk_levels.append(score["risk_level"])
-
-        overall_risk = self._calculate_overall_risk(risk_levels)
 
+        for change_type, resource_type, resource_id, field_name, _, _, path in changes:
+            key = (
+                resource_type,
+                change_type,
+                field_name if field_name in critical_fields else None,
+            )
+            rule = rules.get(key)
+            if rule is None:
+                rule = rules[key] = self._rule(*key)
+            severity, risk_level, reason = rule
+            counts[severity] += 1
+            scored_changes.append(
+                {
+                    "change_path": path,
+                    "change_type": change_type,
+                    "resource_type": resource_type,
+                    "resource_id": resource_id,
+                    # Whole-resource changes have no field
+                    "field_name": field_name or "unknown",
+                    "risk_level": risk_level,
+                    "reason": reason,
+                }
+            )
+
+        overall = max(
+            (severity for severity, count in enumerate(counts) if count), default=0
+        )
         return {
-            "overall_risk": overall_risk,
+            "overall_risk": SEVERITY_ORDER[overall],
             "scored_changes": scored_changes,
-            "risk_distribution": self._count_by_risk(risk_levels),
+            "risk_distribution": {
+                level.value: counts[SEVERITY[level]] for level in RiskLevel
+            },
         }
 
-    def _score_change(self, change_path: str, change_type: str) -> Dict[str, Any]:
-        """Score individual change."""
-        resource_type = self._extract_resource_type(change_path)
-        field_name = self._extract_field_name(change_path)
-
+    def _rule(
+        self, resource_type: str, change_type: str, critical_field: Optional[str]
+    ) -> "_Rule":
+        """Compute severity, level and reason for one kind of change."""
         base_risk = self.RESOURCE_RISK.get(resource_type, RiskLevel.LOW)
         change_risk = self.CHANGE_RISK.get(change_type, RiskLevel.LOW)
 
         # Start with higher of base or change risk
-        final_risk = self._max_risk(base_risk, change_risk)
+        severity = max(SEVERITY[base_risk], SEVERITY[change_risk])
 
         # Elevate risk if critical field changed
-        if field_name in self.CRITICAL_FIELDS:
-            final_risk = self._elevate_risk(final_risk)
+        if critical_field is not None:
+            severity = min(severity + 1, len(SEVERITY_ORDER) - 1)
 
-        return {
-            "change_path": change_path,
-            "change_type": change_type,
-            "resource_type": resource_type,
-            "field_name": field_name,
-            "risk_level": final_risk,
-            "reason": self._get_risk_reason(resource_type, change_type, field_name),
-        }
+        reason = self._get_risk_reason(resource_type, change_type, critical_field or "")
+        return severity, SEVERITY_ORDER[severity], reason
 
     def _extract_resource_type(self, path: str) -> str:
         """Extract resource type from change path."""
-        if "['vpc']" in path:
-            return "vpc"
-        elif "['ec2']" in path:
-            return "ec2"
-        elif "['rds']" in path:
-            return "rds"
-        elif "['s3']" in path:
-            return "s3"
-        elif "['lambda']" in path:
-            return "lambda"
-        elif "['ecs']" in path:
-            return "ecs"
-        return "unknown"
+        return parse_change_path(path, "changed").resource_type
 
     def _extract_field_name(self, path: str) -> str:
         """Extract field name from change path."""
-        parts = path.split("'")
-        if len(parts) >= 4:
-            return parts[-2]
-        return "unknown"
-
-    def _max_risk(self, risk1: RiskLevel, risk2: RiskLevel) -> RiskLevel:
-        """Return the higher risk level."""
-        order = [
-            RiskLevel.INFO,
-            RiskLevel.LOW,
-            RiskLevel.MEDIUM,
-            RiskLevel.HIGH,
-            RiskLevel.CRITICAL,
-        ]
-        idx1 = order.index(risk1) if risk1 in order else 0
-        idx2 = order.index(risk2) if risk2 in order else 0
-        return order[max(idx1, idx2)]
-
-    def _elevate_risk(self, risk: RiskLevel) -> RiskLevel:
-        """Elevate risk by one level."""
-        elevation = {
-            RiskLevel.INFO: RiskLevel.LOW,
-            RiskLevel.LOW: RiskLevel.MEDIUM,
-            RiskLevel.MEDIUM: RiskLevel.HIGH,
-            RiskLevel.HIGH: RiskLevel.CRITICAL,
-            RiskLevel.CRITICAL: RiskLevel.CRITICAL,
-        }
-        return elevation.get(risk, risk)
-
-    def _calculate_overall_risk(self, risk_levels: List[RiskLevel]) -> RiskLevel:
-        """Calculate overall risk from individual risks."""
-        if not risk_levels:
-            return RiskLevel.INFO
-
-        order = [
-            RiskLevel.INFO,
-            RiskLevel.LOW,
-            RiskLevel.MEDIUM,
-            RiskLevel.HIGH,
-            RiskLevel.CRITICAL,
-        ]
-        max_risk = RiskLevel.INFO
-        for risk in risk_levels:
-            if risk in order and order.index(risk) > order.index(max_risk):
-                max_risk = risk
-        return max_risk
-
-    def _count_by_risk(self, risk_levels: List[RiskLevel]) -> Dict[str, int]:
-        """Count changes by risk level."""
-        counts = {level.value: 0 for level in RiskLevel}
-        for level in risk_levels:
-            counts[level.value] += 1
-        return counts
+        return parse_change_path(path, "changed").field_name or "unknown"
 
     def _get_risk_reason(
         self, resource_type: str, change_type: str, field_name: str
     ) -> str:
         """Generate human-readable risk reason."""
-        reasons = {
-            "rds": "Database changes can cause downtime or data loss",
-            "vpc": "Network changes can break connectivity",
-            "ec2": "Compute changes affect performance and cost",
-            "ecs": "Container changes can disrupt services",
-            "lambda": "Function changes may break integrations",
-            "s3": "Storage changes can affect data access",
-        }
-
-        base_reason = reasons.get(resource_type, "Infrastructure change detected")
+        base_reason = self.RISK_REASONS.get(resource_type, DEFAULT_REASON)
 
         if change_type == "removed":
             return f"{base_reason} - Resource removed"
@@ -1,202 +1,567 @@
 """AWS infrastructure scanner for drift detection."""
 
 import logging
-from datetime import datetime
-from typing import Any, Dict, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from drift_detection.defaults import DEFAULT_MAX_WORKERS
+from drift_detection.hashing import resource_digests
+from drift_detection.tag_index import TagIndex, TagResolver
+from drift_detection.throttling import DEFAULT_MAX_ATTEMPTS, AdaptiveRateLimiter
+
 logger = logging.getLogger(__name__)
 
+# describe_services accepts at most this many services per call
+ECS_DESCRIBE_BATCH_SIZE = 10
+
+# Buckets per list_buckets page; any page size makes AWS report BucketRegion
+S3_LIST_PAGE_SIZE = 1000
+
+# get_bucket_tagging errors that mean "no usable tags" rather than a failure
+S3_SKIPPABLE_ERRORS = {"NoSuchTagSet", "NoSuchBucket", "AccessDenied"}
+
+# Resource types in scan output order, with their log labels
+RESOURCE_TYPES = {
+    "vpc": "VPC",
+    "ec2": "EC2",
+    "rds": "RDS",
+    "s3": "S3",
+    "lambda": "Lambda",
+    "ecs": "ECS",
+}
+
+# Scan results for one resource type, keyed by environment
+Partition = Dict[str, List[Dict[str, Any]]]
+# Streams (environment, record) pairs for one resource type
+ResourceIterator = Callable[
+    [List[str], TagResolver], Iterator[Tuple[str, Dict[str, Any]]]
+]
+
+# Tag changes do not move change markers, so cached tags are only trusted
+# for this long before an incremental scan falls back to a full one
+DEFAULT_INCREMENTAL_MAX_AGE = timedelta(hours=1)
+
+
+class _LazyClient:
+    """Creates a scanner's boto3 client on first access."""
+
+    def __init__(self, service: str):
+        self.service = service
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, scanner: Any, owner: type) -> Any:
+        if scanner is None:
+            return self
+        # boto3 sessions are not thread-safe, and scanners run in parallel
+        with scanner._client_lock:
+            if self.name not in scanner.__dict__:
+                scanner.__dict__[self.name] = scanner._client(self.service)
+        return scanner.__dict__[self.name]
+
 
 class AWSScanner:
     """Scans AWS infrastructure and extracts configuration data."""
 
-    def __init__(self, region: str = "us-east-1"):
+    ec2 = _LazyClient("ec2")
+    rds = _LazyClient("rds")
+    s3 = _LazyClient("s3")
+    lambda_client = _LazyClient("lambda")
+    ecs = _LazyClient("ecs")
+    tagging = _LazyClient("resourcegroupstaggingapi")
+
+    def __init__(
+        self,
+        region: str = "us-east-1",
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        use_tag_index: bool = True,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        incremental_max_age: timedelta = DEFAULT_INCREMENTAL_MAX_AGE,
+        session: Optional[boto3.Session] = None,
+        slots: Optional[threading.Semaphore] = None,
+    ):
         self.region = region
-        self.session = boto3.Session(region_name=region)
-        self.ec2 = self.session.client("ec2")
-        self.rds = self.session.client("rds")
-        self.s3 = self.session.client("s3")
-        self.lambda_client = self.session.client("lambda")
-        self.ecs = self.session.client("ecs")
-
-    def scan_environment(self, environment: str) -> Dict[str, Any]:
-        """Scan all resources for an environment."""
+        self.incremental_max_age = incremental_max_age
+        # Shared by scanners that must respect a global concurrency cap
+        self.slots = slots
+        self.max_workers = max_workers
+        self.use_tag_index = use_tag_index
+        self.scan_errors: Dict[str, Dict[str, str]] = {}
+        # One limiter paces every client; pass a shared one to pace scanners
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.client_config = Config(
+            retries={"mode": "standard", "max_attempts": max_attempts},
+            max_pool_connections=max(10, max_workers * 2),
+        )
+        self.session = session or boto3.Session(region_name=region)
+        self._client_lock = threading.Lock()
+
+    def _client(self, service: str) -> Any:
+        """Create a client with retries and shared rate limiting."""
+        client = self.session.client(service, config=self.client_config)
+        return self.rate_limiter.attach(client)
+
+    def scan_environment(
+        self,
+        environment: str,
+        incremental: bool = False,
+        previous: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Scan all resources for an environment.
+
+        With ``incremental`` the result carries ``change_markers``, and
+        resources whose markers match ``previous`` reuse its tags instead
+        of being looked up again.
+        """
         logger.info(f"Scanning environment: {environment}")
+        previous_scans = {environment: previous} if incremental else None
+        return self._scan([environment], previous_scans)[environment]
+
+    def scan_account(
+        self,
+        environments: Sequence[str],
+        previous: Optional[Mapping[str, Optional[Dict[str, Any]]]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Scan several environments with one pass over the account.
+
+        Each resource type and its tags are enumerated once and partitioned
+        by ``Environment`` tag, so every environment gets the same result
+        ``scan_environment`` would return. Passing ``previous`` snapshots
+        (keyed by environment) makes the scan incremental.
+        """
+        logger.info(f"Scanning account snapshot: {', '.join(environments)}")
+        return self._scan(environments, previous)
+
+    def _scan(
+        self,
+        environments: Sequence[str],
+        previous: Optional[Mapping[str, Optional[Dict[str, Any]]]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Scan and assemble per-environment results."""
+        if not environments:
+            return {}
+
+        timestamp = datetime.utcnow().isoformat()
+        for environment in environments:
+            self.scan_errors[environment] = {}
+
+        tags = self._tag_resolver(environments, previous)
+        partitions = self._scan_resources(list(environments), tags)
 
+        if tags.incremental:
+            logger.info(
+                f"Incremental scan reused tags for {tags.reused} resources, "
+                f"refreshed {tags.refreshed}"
+            )
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for environment in environments:
+            results[environment] = {
+                "environment": environment,
+                "timestamp": timestamp,
+                "region": self.region,
+                "resources": {
+                    resource_type: partition[environment]
+                    for resource_type, partition in partitions.items()
+                },
+            }
+            if previous is not None:
+                results[environment]["change_markers"] = tags.markers
+                # Carried forward unchanged until the next full tag refresh
+                results[environment]["tags_refreshed_at"] = (
+                    tags.refreshed_at or timestamp
+                )
+            # Lets comparisons of unchanged scans stop at the root hash
+            results[environment]["digests"] = resource_digests(
+                results[environment]["resources"]
+            )
+        return results
+
+    def _tag_resolver(
+        self,
+        environments: Sequence[str],
+        previous: Optional[Mapping[str, Optional[Dict[str, Any]]]] = None,
+    ) -> TagResolver:
+        """Reuse fresh change markers, or bulk-load tags for a full scan."""
+        reusable = self._previous_markers(previous)
+        if reusable is not None:
+            markers, refreshed_at = reusable
+            return TagResolver(previous_markers=markers, refreshed_at=refreshed_at)
+        return TagResolver(self._build_tag_index(environments))
+
+    def _previous_markers(
+        self, previous: Optional[Mapping[str, Optional[Dict[str, Any]]]]
+    ) -> Optional[Tuple[Dict[str, Dict[str, List[Any]]], str]]:
+        """Merge markers from previous snapshots with their oldest refresh time.
+
+        Returns None if any snapshot is missing or its tags were last fully
+        refreshed more than ``incremental_max_age`` ago. The snapshot's own
+        timestamp is not used: every incremental run re-saves it.
+        """
+        if not previous:
+            return None
+
+        cutoff = datetime.utcnow() - self.incremental_max_age
+        markers: Dict[str, Dict[str, List[Any]]] = {}
+        refresh_times = []
+        for snapshot in previous.values():
+            if not snapshot or "change_markers" not in snapshot:
+                return None
+            refreshed_at = snapshot.get("tags_refreshed_at")
+            if not refreshed_at or datetime.fromisoformat(refreshed_at) < cutoff:
+                return None
+            refresh_times.append(refreshed_at)
+            for resource_type, by_arn in snapshot["change_markers"].items():
+                markers.setdefault(resource_type, {}).update(by_arn)
+        return markers, min(refresh_times)
+
+    def _build_tag_index(self, environments: Sequence[str]) -> Optional[TagIndex]:
+        """Bulk-load tags, or None to fall back to per-resource lookups."""
+        if not self.use_tag_index:
+            return None
+        try:
+            return TagIndex.build(self.tagging, environments)
+        except ClientError as e:
+            logger.warning(f"Tag index unavailable, using per-resource tags: {e}")
+            return None
+
+    def iter_resources(
+        self,
+        environments: Sequence[str],
+        resource_types: Optional[Sequence[str]] = None,
+    ) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (resource_type, environment, record) as API pages arrive.
+
+        Unlike ``scan_account`` this never materialises a full result list,
+        and AWS errors propagate to the caller instead of being recorded.
+        """
+        environments = list(environments)
+        tags = self._tag_resolver(environments)
+        iterators = self._resource_iterators()
+        for resource_type in resource_types or list(iterators):
+            for environment, record in iterators[resource_type](environments, tags):
+                yield resource_type, environment, record
+
+    def _resource_iterators(self) -> Dict[str, ResourceIterator]:
+        """Return resource generators keyed by resource type, in output order."""
         return {
-            "environment": environment,
-            "timestamp": datetime.utcnow().isoformat(),
-            "region": self.region,
-            "resources": {
-                "vpc": self._scan_vpc(environment),
-                "ec2": self._scan_ec2(environment),
-                "rds": self._scan_rds(environment),
-                "s3": self._scan_s3(environment),
-                "lambda": self._scan_lambda(environment),
-                "ecs": self._scan_ecs(environment),
-            },
+            "vpc": self._iter_vpc,
+            "ec2": self._iter_ec2,
+            "rds": self._iter_rds,
+            "s3": self._iter_s3,
+            "lambda": self._iter_lambda,
+            "ecs": self._iter_ecs,
         }
 
-    def _scan_vpc(self, environment: str) -> List[Dict[str, Any]]:
-        """Scan VPC resources."""
+    def _scan_resources(
+        self, environments: List[str], tags: TagResolver
+    ) -> Dict[str, Partition]:
+        """Run every resource scanner, concurrently when max_workers > 1."""
+        if self.max_workers <= 1:
+            return {
+                resource_type: self._collect(resource_type, environments, tags)
+                for resource_type in RESOURCE_TYPES
+            }
+
+        workers = min(self.max_workers, len(RESOURCE_TYPES))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="drift-scan"
+        ) as executor:
+            futures = {
+                resource_type: executor.submit(
+                    self._collect, resource_type, environments, tags
+                )
+                for resource_type in RESOURCE_TYPES
+            }
+            # Collect in scanner order so output matches a sequential scan
+            return {name: future.result() for name, future in futures.items()}
+
+    def _collect(
+        self,
+        resource_type: str,
+        environments: List[str],
+        tags: TagResolver,
+    ) -> Partition:
+        """Drain one resource generator into per-environment lists."""
+        results = _empty_partition(environments)
         try:
-            vpcs = self.ec2.describe_vpcs(
-                Filters=[{"Name": "tag:Environment", "Values": [environment]}]
-            )["Vpcs"]
-
-            results = []
-            for vpc in vpcs:
-                vpc_id = vpc["VpcId"]
-                subnets = self.ec2.describe_subnets(
-                    Filters=[{"Name": "vpc-id", "Values": [vpc_id]}]
-                )["Subnets"]
-
-                results.append(
+            with self.slots or nullcontext():
+                iterate = self._resource_iterators()[resource_type]
+                for environment, record in iterate(environments, tags):
+                    results[environment].append(record)
+            return results
+        except ClientError as e:
+            logger.error(f"{RESOURCE_TYPES[resource_type]} scan error: {e}")
+            return self._record_error(environments, resource_type, e)
+
+    def _record_error(
+        self, environments: List[str], resource_type: str, error: Exception
+    ) -> Partition:
+        """Record a scan failure for one resource type and return no results."""
+        for environment in environments:
+            self.scan_errors.setdefault(environment, {})[resource_type] = str(error)
+        return _empty_partition(environments)
+
+    def _iter_vpc(
+        self, environments: List[str], tags: TagResolver
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream VPC resources."""
+        vpcs = _paginate(
+            self.ec2,
+            "describe_vpcs",
+            "Vpcs",
+            Filters=[{"Name": "tag:Environment", "Values": environments}],
+        )
+        for vpc in vpcs:
+            vpc_tags = {tag["Key"]: tag["Value"] for tag in vpc.get("Tags", [])}
+            environment = vpc_tags.get("Environment")
+            if environment not in environments:
+                continue
+
+            vpc_id = vpc["VpcId"]
+            subnets = _paginate(
+                self.ec2,
+                "describe_subnets",
+                "Subnets",
+                Filters=[{"Name": "vpc-id", "Values": [vpc_id]}],
+            )
+
+            yield environment, {
+                "vpc_id": vpc_id,
+                "cidr_block": vpc["CidrBlock"],
+                "state": vpc["State"],
+                "tags": vpc_tags,
+                "subnets": [
                     {
-                        "vpc_id": vpc_id,
-                        "cidr_block": vpc["CidrBlock"],
-                        "state": vpc["State"],
-                        "tags": {
-                            tag["Key"]: tag["Value"] for tag in vpc.get("Tags", [])
-                        },
-                        "subnets": [
-                            {
-                                "subnet_id": s["SubnetId"],
-                                "cidr_block": s["CidrBlock"],
-                                "availability_zone": s["AvailabilityZone"],
-                            }
-                            for s in subnets
-                        ],
+                        "subnet_id": s["SubnetId"],
+                        "cidr_block": s["CidrBlock"],
+                        "availability_zone": s["AvailabilityZone"],
                     }
+                    for s in subnets
+                ],
+            }
+
+    def _iter_ec2(
+        self, environments: List[str], tags: TagResolver
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream EC2 instances."""
+        reservations = _paginate(
+            self.ec2,
+            "describe_instances",
+            "Reservations",
+            Filters=[
+                {"Name": "tag:Environment", "Values": environments},
+                {"Name": "instance-state-name", "Values": ["running", "stopped"]},
+            ],
+        )
+        for reservation in reservations:
+            for instance in reservation["Instances"]:
+                environment = _environment_tag(instance.get("Tags", []))
+                if environment not in environments:
+                    continue
+                yield environment, {
+                    "instance_id": instance["InstanceId"],
+                    "instance_type": instance["InstanceType"],
+                    "state": instance["State"]["Name"],
+                }
+
+    def _iter_rds(
+        self, environments: List[str], tags: TagResolver
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream RDS instances."""
+        for instance in _paginate(self.rds, "describe_db_instances", "DBInstances"):
+            arn = instance["DBInstanceArn"]
+            if "TagList" in instance:
+                # Current tags come with the description; nothing to cache
+                environment = _environment_tag(instance["TagList"])
+            else:
+                # RDS exposes no modification time to use as a change marker,
+                # so incremental scans resolve these tags every time
+                environment = tags.environment(
+                    "rds",
+                    arn,
+                    lambda: _environment_tag(
+                        self.rds.list_tags_for_resource(ResourceName=arn)["TagList"]
+                    ),
                 )
-            return results
-        except ClientError as e:
-            logger.error(f"VPC scan error: {e}")
-            return []
 
-    def _scan_ec2(self, environment: str) -> List[Dict[str, Any]]:
-        """Scan EC2 instances."""
-        try:
-            response = self.ec2.describe_instances(
-                Filters=[
-                    {"Name": "tag:Environment", "Values": [environment]},
-                    {"Name": "instance-state-name", "Values": ["running", "stopped"]},
-                ]
+            if environment in environments:
+                yield environment, {
+                    "db_instance_identifier": instance["DBInstanceIdentifier"],
+                    "db_instance_class": instance["DBInstanceClass"],
+                    "engine": instance["Engine"],
+                }
+
+    def _iter_s3(
+        self, environments: List[str], tags: TagResolver
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream S3 buckets."""
+        # Without a page size AWS leaves BucketRegion out of the listing
+        buckets = _paginate(
+            self.s3, "list_buckets", "Buckets", page_size=S3_LIST_PAGE_SIZE
+        )
+        for bucket in buckets:
+            name = bucket["Name"]
+            arn = f"arn:aws:s3:::{name}"
+            # The tag index is regional; buckets elsewhere need a lookup, as
+            # do unindexed ones when the listing did not say where they live
+            region = bucket.get("BucketRegion")
+            in_region = region == self.region or (
+                region is None and tags.index is not None and arn in tags.index
+            )
+            environment = tags.environment(
+                "s3",
+                arn,
+                lambda: self._bucket_environment(name),
+                marker=str(bucket.get("CreationDate")),
+                indexed=in_region,
             )
 
-            instances = []
-            for reservation in response["Reservations"]:
-                for instance in reservation["Instances"]:
-                    instances.append(
-                        {
-                            "instance_id": instance["InstanceId"],
-                            "instance_type": instance["InstanceType"],
-                            "state": instance["State"]["Name"],
-                        }
-                    )
-            return instances
-        except ClientError as e:
-            logger.error(f"EC2 scan error: {e}")
-            return []
+            if environment in environments:
+                yield environment, {"bucket_name": name}
 
-    def _scan_rds(self, environment: str) -> List[Dict[str, Any]]:
-        """Scan RDS instances."""
+    def _bucket_environment(self, bucket_name: str) -> Optional[str]:
+        """Look up one bucket's Environment tag."""
         try:
-            instances = self.rds.describe_db_instances()["DBInstances"]
-            results = []
+            tag_set = self.s3.get_bucket_tagging(Bucket=bucket_name)["TagSet"]
+        except ClientError as e:
+            # Untagged or inaccessible buckets are skipped, but
+            # throttling and service errors must fail the scan
+            if e.response["Error"]["Code"] in S3_SKIPPABLE_ERRORS:
+                return None
+            raise
+        return _environment_tag(tag_set)
 
-            for instance in instances:
-                tags = self.rds.list_tags_for_resource(
-                    ResourceName=instance["DBInstanceArn"]
-                )["TagList"]
-                tag_dict = {tag["Key"]: tag["Value"] for tag in tags}
+    def _iter_lambda(
+        self, environments: List[str], tags: TagResolver
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream Lambda functions."""
+        for function in _paginate(self.lambda_client, "list_functions", "Functions"):
+            arn = function["FunctionArn"]
+            environment = tags.environment(
+                "lambda",
+                arn,
+                lambda: self.lambda_client.list_tags(Resource=arn)["Tags"].get(
+                    "Environment"
+                ),
+                marker=f"{function.get('LastModified')}|{function.get('CodeSha256')}",
+            )
 
-                if tag_dict.get("Environment") == environment:
-                    results.append(
-                        {
-                            "db_instance_identifier": instance["DBInstanceIdentifier"],
-                            "db_instance_class": instance["DBInstanceClass"],
-                            "engine": instance["Engine"],
-                        }
-                    )
-            return results
-        except ClientError as e:
-            logger.error(f"RDS scan error: {e}")
-            return []
+            if environment in environments:
+                yield environment, {
+                    "function_name": function["FunctionName"],
+                    "runtime": function["Runtime"],
+                    "memory_size": function["MemorySize"],
+                }
 
-    def _scan_s3(self, environment: str) -> List[Dict[str, Any]]:
-        """Scan S3 buckets."""
-        try:
-            buckets = self.s3.list_buckets()["Buckets"]
-            results = []
+    def _iter_ecs(
+        self, environments: List[str], tags: TagResolver
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream ECS services, scanning clusters in parallel."""
+        clusters = list(_paginate(self.ecs, "list_clusters", "clusterArns"))
+        if self.max_workers <= 1 or len(clusters) <= 1:
+            for cluster in clusters:
+                yield from self._scan_ecs_cluster(cluster, environments, tags)
+            return
 
-            for bucket in buckets:
-                try:
-                    tags = self.s3.get_bucket_tagging(Bucket=bucket["Name"])["TagSet"]
-                    tag_dict = {tag["Key"]: tag["Value"] for tag in tags}
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(clusters)),
+            thread_name_prefix="drift-scan-ecs",
+        ) as executor:
+            # map() keeps cluster order, so output matches a sequential scan
+            for services in executor.map(
+                lambda cluster: self._scan_ecs_cluster(cluster, environments, tags),
+                clusters,
+            ):
+                yield from services
 
-                    if tag_dict.get("Environment") == environment:
-                        results.append({"bucket_name": bucket["Name"]})
-                except ClientError:
-                    continue
-            return results
-        except ClientError as e:
-            logger.error(f"S3 scan error: {e}")
-            return []
+    def _scan_ecs_cluster(
+        self, cluster: str, environments: List[str], tags: TagResolver
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Describe one cluster's services in batches of the API maximum."""
+        service_arns = list(
+            _paginate(self.ecs, "list_services", "serviceArns", cluster=cluster)
+        )
 
-    def _scan_lambda(self, environment: str) -> List[Dict[str, Any]]:
-        """Scan Lambda functions."""
-        try:
-            functions = self.lambda_client.list_functions()["Functions"]
-            results = []
-
-            for function in functions:
-                tags = self.lambda_client.list_tags(Resource=function["FunctionArn"])[
-                    "Tags"
-                ]
-                if tags.get("Environment") == environment:
+        results = []
+        for start in range(0, len(service_arns), ECS_DESCRIBE_BATCH_SIZE):
+            batch = service_arns[start : start + ECS_DESCRIBE_BATCH_SIZE]
+            if tags.index is not None:
+                described = self.ecs.describe_services(cluster=cluster, services=batch)
+            else:
+                # Fetch tags with the batch instead of one call per service
+                described = self.ecs.describe_services(
+                    cluster=cluster, services=batch, include=["TAGS"]
+                )
+
+            for service in described["services"]:
+                environment = tags.environment(
+                    "ecs",
+                    service["serviceArn"],
+                    lambda: _environment_tag(service.get("tags", []), "key", "value"),
+                )
+
+                if environment in environments:
                     results.append(
-                        {
-                            "function_name": function["FunctionName"],
-                            "runtime": function["Runtime"],
-                            "memory_size": function["MemorySize"],
-                        }
+                        (
+                            environment,
+                            {
+                                "service_name": service["serviceName"],
+                                "desired_count": service["desiredCount"],
+                            },
+                        )
                     )
-            return results
-        except ClientError as e:
-            logger.error(f"Lambda scan error: {e}")
-            return []
+        return results
 
-    def _scan_ecs(self, environment: str) -> List[Dict[str, Any]]:
-        """Scan ECS services."""
-        try:
-            clusters = self.ecs.list_clusters()["clusterArns"]
-            results = []
 
-            for cluster in clusters:
-                services = self.ecs.list_services(cluster=cluster)["serviceArns"]
-                if services:
-                    described = self.ecs.describe_services(
-                        cluster=cluster, services=services
-                    )["services"]
-
-                    for service in described:
-                        tags = self.ecs.list_tags_for_resource(
-                            resourceArn=service["serviceArn"]
-                        )["tags"]
-                        tag_dict = {tag["key"]: tag["value"] for tag in tags}
-
-                        if tag_dict.get("Environment") == environment:
-                            results.append(
-                                {
-                                    "service_name": service["serviceName"],
-                                    "desired_count": service["desiredCount"],
-                                }
-                            )
-            return results
-        except ClientError as e:
-            logger.error(f"ECS scan error: {e}")
-            return []
+def _paginate(
+    client: Any,
+    operation: str,
+    result_key: str,
+    page_size: Optional[int] = None,
+    **kwargs: Any,
+) -> Iterator[Any]:
+    """Yield items from every page of a list/describe call."""
+    if not client.can_paginate(operation):
+        # Older botocore releases have no paginator for some operations
+        yield from getattr(client, operation)(**kwargs)[result_key]
+        return
+
+    if page_size is not None:
+        kwargs["PaginationConfig"] = {"PageSize": page_size}
+    for page in client.get_paginator(operation).paginate(**kwargs):
+        yield from page.get(result_key, [])
+
+
+def _empty_partition(environments: List[str]) -> Partition:
+    """Return an empty result list for each environment."""
+    return {environment: [] for environment in environments}
+
+
+def _environment_tag(
+    tags: List[Dict[str, str]], key_field: str = "Key", value_field: str = "Value"
+) -> Optional[str]:
+    """Return the Environment tag value from an AWS tag list."""
+    for tag in tags:
+        if tag[key_field] == "Environment":
+            return tag[value_field]
+    return None
@@ -0,0 +1,131 @@
+"""Bulk tag lookups via the Resource Groups Tagging API."""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Tagging API resource types for scanners that need per-resource tags
+RESOURCE_TYPE_FILTERS = ["rds:db", "s3", "lambda:function", "ecs:service"]
+
+
+class TagIndex:
+    """ARN to tags map built with paginated ``get_resources`` calls."""
+
+    def __init__(self, tags_by_arn: Optional[Dict[str, Dict[str, str]]] = None):
+        self.tags_by_arn = tags_by_arn or {}
+
+    @classmethod
+    def build(
+        cls,
+        client: Any,
+        environments: Sequence[str],
+        resource_types: Iterable[str] = RESOURCE_TYPE_FILTERS,
+    ) -> "TagIndex":
+        """Index every resource tagged with one of the given environments."""
+        paginator = client.get_paginator("get_resources")
+        pages = paginator.paginate(
+            TagFilters=[{"Key": "Environment", "Values": list(environments)}],
+            ResourceTypeFilters=list(resource_types),
+        )
+
+        tags_by_arn = {}
+        for page in pages:
+            for mapping in page["ResourceTagMappingList"]:
+                tags_by_arn[mapping["ResourceARN"]] = {
+                    tag["Key"]: tag["Value"] for tag in mapping.get("Tags", [])
+                }
+
+        logger.info(f"Indexed tags for {len(tags_by_arn)} resources")
+        return cls(tags_by_arn)
+
+    def tags(self, arn: str) -> Dict[str, str]:
+        """Return tags for a resource, empty if it is not indexed."""
+        return self.tags_by_arn.get(arn, {})
+
+    def environment(self, arn: str) -> Optional[str]:
+        """Return the Environment tag for a resource."""
+        return self.tags(arn).get("Environment")
+
+    def __contains__(self, arn: object) -> bool:
+        return arn in self.tags_by_arn
+
+    def __len__(self) -> int:
+        return len(self.tags_by_arn)
+
+
+class TagResolver:
+    """Resolves resources' Environment tags for one scan.
+
+    A resource whose change marker matches the previous snapshot reuses the
+    environment recorded there. Otherwise the tag comes from the bulk
+    ``TagIndex`` if one was built, or from a per-resource lookup.
+    """
+
+    def __init__(
+        self,
+        index: Optional[TagIndex] = None,
+        previous_markers: Optional[Dict[str, Dict[str, List[Any]]]] = None,
+        refreshed_at: Optional[str] = None,
+    ):
+        self.index = index
+        self.previous_markers = previous_markers
+        # When the reused tags were last fully refreshed, None for a full scan
+        self.refreshed_at = refreshed_at
+        self.markers: Dict[str, Dict[str, List[Any]]] = {}
+        self.reused = 0
+        self.refreshed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def incremental(self) -> bool:
+        """Whether markers from a previous snapshot are available."""
+        return self.previous_markers is not None
+
+    def environment(
+        self,
+        resource_type: str,
+        arn: str,
+        lookup: Callable[[], Optional[str]],
+        marker: Optional[str] = None,
+        indexed: bool = True,
+    ) -> Optional[str]:
+        """Return the Environment tag for a resource.
+
+        ``indexed=False`` marks resources the tag index cannot cover, which
+        always use ``lookup`` when their marker has moved.
+        """
+        if marker is not None and self.previous_markers is not None:
+            cached = self.previous_markers.get(resource_type, {}).get(arn)
+            if cached is not None and cached[0] == marker and cached[1] is not None:
+                environment: Optional[str] = cached[1]
+                self._remember(resource_type, arn, marker, environment, reused=True)
+                return environment
+
+        if self.index is not None and indexed:
+            environment = self.index.environment(arn)
+        else:
+            environment = lookup()
+
+        if marker is not None:
+            self._remember(resource_type, arn, marker, environment, reused=False)
+        return environment
+
+    def _remember(
+        self,
+        resource_type: str,
+        arn: str,
+        marker: str,
+        environment: Optional[str],
+        reused: bool,
+    ) -> None:
+        with self._lock:
+            # No tag only means none of this scan's environments; a scan of
+            # other environments must look the resource up for itself
+            if environment is not None:
+                self.markers.setdefault(resource_type, {})[arn] = [marker, environment]
+            if reused:
+                self.reused += 1
+            else:
+                self.refreshed += 1
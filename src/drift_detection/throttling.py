@@ -0,0 +1,204 @@
+"""Shared client-side rate limiting for AWS API calls."""
+
+import logging
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Error codes AWS services return when a caller is being throttled
+THROTTLE_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "ProvisionedThroughputExceededException",
+    "SlowDown",
+    "BandwidthLimitExceeded",
+}
+
+DEFAULT_MAX_RATE = 50.0  # Requests per second per service before any throttling
+DEFAULT_MIN_RATE = 1.0
+DEFAULT_MAX_ATTEMPTS = 8
+
+
+class TokenBucket:
+    """Thread-safe token bucket that paces callers to a target rate."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        # Without an explicit capacity the burst size follows the rate
+        self._fixed_capacity = capacity is not None
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available. Returns seconds waited."""
+        with self._lock:
+            self._refill()
+            # Reserve the token even if it is not there yet, so waiting
+            # callers queue up instead of racing for the next refill
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def update_rate(self, update: Callable[[float], float]) -> float:
+        """Atomically set the rate to ``update(rate)``, returning the new rate."""
+        with self._lock:
+            # Tokens earned so far accrue at the old rate
+            self._refill()
+            self.rate = update(self.rate)
+            if not self._fixed_capacity:
+                self.capacity = max(self.rate, 1.0)
+                self.tokens = min(self.tokens, self.capacity)
+            return self.rate
+
+    def _refill(self) -> None:
+        # Caller holds self._lock
+        now = self._clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+
+class AdaptiveRateLimiter:
+    """Per-service token buckets that back off on throttling.
+
+    One limiter is attached to every client a scanner uses. The rate for a
+    service is cut by ``backoff`` on each throttle response and recovers
+    additively on success, so concurrency can be raised until the account's
+    limits push back.
+    """
+
+    def __init__(
+        self,
+        max_rate: float = DEFAULT_MAX_RATE,
+        min_rate: float = DEFAULT_MIN_RATE,
+        backoff: float = 0.5,
+        recovery: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.backoff = backoff
+        self.recovery = recovery
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._metrics: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, client: Any) -> Any:
+        """Route a boto3 client's requests through the limiter."""
+        service = client.meta.service_model.service_name
+        events = client.meta.events
+        events.register("before-send", partial(self._before_send, service))
+        events.register("needs-retry", partial(self._needs_retry, service))
+        events.register("after-call", partial(self._after_call, service))
+        return client
+
+    def acquire(self, service: str) -> float:
+        """Wait for a request slot for a service."""
+        wait = self._bucket(service).acquire()
+        with self._lock:
+            stats = self._stats(service)
+            stats["requests"] += 1
+            stats["wait_seconds"] += wait
+        return wait
+
+    def record_throttle(self, service: str) -> None:
+        """Slow a service down after a throttle response."""
+        rate = self._bucket(service).update_rate(
+            lambda rate: max(self.min_rate, rate * self.backoff)
+        )
+        with self._lock:
+            self._stats(service)["throttles"] += 1
+        logger.warning(f"{service} throttled, rate lowered to {rate:.1f}/s")
+
+    def record_success(self, service: str) -> None:
+        """Let a service speed back up after a successful call."""
+        bucket = self._bucket(service)
+        # Unlocked read: a bucket already at full rate needs no update
+        if bucket.rate < self.max_rate:
+            bucket.update_rate(lambda rate: min(self.max_rate, rate + self.recovery))
+
+    def record_retry(self, service: str) -> None:
+        """Count a retried request."""
+        with self._lock:
+            self._stats(service)["retries"] += 1
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Return request, throttle, retry and wait-time counters per service."""
+        with self._lock:
+            return {
+                service: {
+                    **stats,
+                    "wait_seconds": round(stats["wait_seconds"], 3),
+                    "rate": round(self._buckets[service].rate, 2),
+                }
+                for service, stats in self._metrics.items()
+            }
+
+    def reset_metrics(self) -> None:
+        """Zero the counters, keeping each service's learned rate."""
+        with self._lock:
+            self._metrics = {service: {} for service in self._metrics}
+            for service in self._metrics:
+                self._stats(service)
+
+    def _bucket(self, service: str) -> TokenBucket:
+        with self._lock:
+            if service not in self._buckets:
+                self._buckets[service] = TokenBucket(
+                    self.max_rate, clock=self._clock, sleep=self._sleep
+                )
+                self._stats(service)
+            return self._buckets[service]
+
+    def _stats(self, service: str) -> Dict[str, float]:
+        # Caller holds self._lock
+        stats = self._metrics.setdefault(service, {})
+        if not stats:
+            stats.update(
+                {"requests": 0, "throttles": 0, "retries": 0, "wait_seconds": 0.0}
+            )
+        return stats
+
+    def _before_send(self, service: str, request: Any = None, **kwargs: Any) -> None:
+        context = getattr(request, "context", None) or {}
+        attempt = context.get("retries", {}).get("attempt", 1)
+        if attempt > 1:
+            self.record_retry(service)
+        self.acquire(service)
+
+    def _needs_retry(self, service: str, response: Any = None, **kwargs: Any) -> None:
+        if response is not None:
+            code = response[1].get("Error", {}).get("Code")
+            if code in THROTTLE_CODES:
+                self.record_throttle(service)
+
+    def _after_call(
+        self, service: str, http_response: Any = None, **kwargs: Any
+    ) -> None:
+        if http_response is not None and http_response.status_code < 400:
+            self.record_success(service)
@@ -51,10 +51,12 @@ resource "aws_iam_role_policy" "lambda_policy" {
         Action = [
           "ec2:Describe*",
           "rds:Describe*",
+          "rds:ListTagsForResource",
           "s3:*",
           "lambda:ListFunctions",
           "lambda:ListTags",
-          "ecs:*"
+          "ecs:*",
+          "tag:GetResources"
         ]
         Resource = "*"
       },
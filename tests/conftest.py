@@ -0,0 +1,56 @@
+"""Shared fixtures for pipeline and CLI tests."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from drift_detection.storage import MemoryStorage
+
+
+def _scan(env, instance_type="t3.micro"):
+    return {
+        "environment": env,
+        "timestamp": "2024-01-02T00:00:00",
+        "resources": {
+            "ec2": [
+                {
+                    "instance_id": f"i-{env}",
+                    "instance_type": instance_type,
+                    "state": "running",
+                }
+            ]
+        },
+    }
+
+
+@pytest.fixture
+def make_scan():
+    """Build a scan with one running instance per environment."""
+    return _scan
+
+
+@pytest.fixture
+def baseline_environments():
+    """Environments the storage fixture holds a baseline for."""
+    return ("dev", "staging", "prod")
+
+
+@pytest.fixture
+def storage(baseline_environments):
+    """In-memory storage holding a baseline per environment."""
+    storage = MemoryStorage()
+    for env in baseline_environments:
+        storage.save_baseline(env, _scan(env))
+    return storage
+
+
+@pytest.fixture
+def scanner():
+    """Mock scanner whose account pass finds an upsized instance in prod."""
+    scanner = MagicMock(scan_errors={})
+    scanner.rate_limiter.metrics.return_value = {}
+    scanner.scan_account.side_effect = lambda envs, previous: {
+        env: _scan(env, "t3.large" if env == "prod" else "t3.micro") for env in envs
+    }
+    scanner.scan_environment.side_effect = lambda env, **kwargs: _scan(env)
+    return scanner
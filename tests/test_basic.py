@@ -2,6 +2,9 @@
 Basic tests to verify setup is working
 """
 
+import subprocess
+import sys
+
 from drift_detection import __version__
 
 
@@ -17,6 +20,28 @@ def test_import():
     assert drift_detection is not None
 
 
+def test_import_is_lazy():
+    """Test importing the package and CLI does not load AWS or diff libraries"""
+    code = (
+        "import sys, drift_detection, drift_detection.cli; "
+        "print(sorted(m for m in ('boto3', 'deepdiff', 'structlog') "
+        "if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_lazy_exports_resolve():
+    """Test public names are still importable from the package"""
+    from drift_detection import AWSScanner, RiskLevel
+
+    assert AWSScanner.__name__ == "AWSScanner"
+    assert RiskLevel.CRITICAL == "critical"
+
+
 class TestBasicFunctionality:
     """Basic functionality tests"""
 
@@ -0,0 +1,39 @@
+"""Tests for the local baseline cache."""
+
+from drift_detection.cache import CacheEntry, LocalCache
+
+
+def test_put_and_get(tmp_path):
+    """Test entries round-trip with their metadata."""
+    cache = LocalCache(str(tmp_path), max_bytes=1024)
+    cache.put("bucket", "baselines/dev/baseline.json", CacheEntry('"abc"', b"{}"))
+
+    entry = cache.get("bucket", "baselines/dev/baseline.json")
+
+    assert entry.etag == '"abc"'
+    assert entry.body == b"{}"
+    assert cache.get("bucket", "baselines/prod/baseline.json") is None
+
+
+def test_lru_eviction(tmp_path):
+    """Test the least recently used entry is evicted past the size bound."""
+    cache = LocalCache(str(tmp_path), max_bytes=20)
+    cache.put("b", "one", CacheEntry("1", b"x" * 8))
+    cache.put("b", "two", CacheEntry("2", b"x" * 8))
+    cache.get("b", "one")
+    cache.put("b", "three", CacheEntry("3", b"x" * 8))
+
+    assert cache.get("b", "two") is None
+    assert cache.get("b", "one") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 16
+
+
+def test_survives_restart(tmp_path):
+    """Test a new cache over the same directory sees earlier entries."""
+    LocalCache(str(tmp_path), max_bytes=1024).put("b", "k", CacheEntry("e", b"data"))
+
+    cache = LocalCache(str(tmp_path), max_bytes=1024)
+
+    assert cache.get("b", "k").body == b"data"
+    assert cache.stats()["entries"] == 1
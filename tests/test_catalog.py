@@ -0,0 +1,72 @@
+"""Tests for the scan and report catalog."""
+
+from datetime import datetime
+
+from drift_detection.catalog import Catalog, CatalogEntry, format_timestamp
+
+
+def _entry(day, kind="report", risk="low", drift=True):
+    timestamp = format_timestamp(datetime(2024, 1, day))
+    return CatalogEntry(f"{kind}s/prod/{day}.json", kind, timestamp, drift, risk, 0.0)
+
+
+def test_entries_stay_time_ordered():
+    """Test out-of-order inserts are kept sorted by timestamp."""
+    catalog = Catalog("prod", [_entry(3), _entry(1)])
+    catalog.add(_entry(2))
+
+    assert [e.key for e in catalog.entries] == [
+        "reports/prod/1.json",
+        "reports/prod/2.json",
+        "reports/prod/3.json",
+    ]
+
+
+def test_oldest_entries_trimmed_past_max():
+    """Test the catalog keeps only its newest entries, however they arrive."""
+    catalog = Catalog("prod", [_entry(day) for day in (5, 1, 3)], max_entries=2)
+    assert [e.key for e in catalog.entries] == [
+        "reports/prod/3.json",
+        "reports/prod/5.json",
+    ]
+
+    catalog.add(_entry(4))
+    restored = Catalog.from_dict(catalog.to_dict(), max_entries=2)
+
+    assert [e.key for e in restored.entries] == [
+        "reports/prod/4.json",
+        "reports/prod/5.json",
+    ]
+    assert len(restored.query(since=datetime(2024, 1, 4))) == 2
+
+
+def test_range_and_filters():
+    """Test time range, kind, drift and risk filters combine."""
+    catalog = Catalog(
+        "prod",
+        [
+            _entry(1, risk="critical"),
+            _entry(5, risk="critical"),
+            _entry(6, kind="scan", risk=None, drift=None),
+            _entry(7, risk="medium"),
+            _entry(8, risk="critical", drift=False),
+        ],
+    )
+
+    matches = catalog.query(
+        kind="report",
+        since=datetime(2024, 1, 2),
+        until=datetime(2024, 1, 8),
+        min_risk="high",
+        drift_only=True,
+    )
+
+    assert [e.key for e in matches] == ["reports/prod/5.json"]
+    assert len(catalog.query(since=datetime(2024, 1, 6))) == 3
+
+
+def test_dict_round_trip():
+    """Test catalogs survive serialization."""
+    catalog = Catalog("prod", [_entry(1), _entry(2, kind="scan")])
+
+    assert Catalog.from_dict(catalog.to_dict()).entries == catalog.entries
@@ -0,0 +1,223 @@
+"""Tests for the command-line interface."""
+
+import csv
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from drift_detection import cli
+
+
+@pytest.fixture
+def baseline_environments():
+    """Leave staging without a baseline."""
+    return ("dev", "prod")
+
+
+@pytest.fixture
+def notifier():
+    """Mock notifier whose alerts all succeed."""
+    notifier = MagicMock()
+    notifier.send_alert.return_value = "msg-1"
+    return notifier
+
+
+@pytest.fixture
+def invoke(scanner, storage, notifier):
+    """Run the CLI with mocked AWS components."""
+    factories = {
+        "scanner": lambda obj: scanner,
+        "storage": lambda obj: storage,
+        "notifier": lambda obj: notifier,
+    }
+
+    def invoke(*args):
+        with patch.dict(cli._Components.factories, factories):
+            return CliRunner().invoke(cli.cli, list(args), obj={})
+
+    return invoke
+
+
+def test_detect_all_reports_every_environment_then_fails(invoke, notifier):
+    """Test a missing baseline fails the run after all outcomes are shown."""
+    result = invoke("--sns-topic", "arn:topic", "detect-all", "--pipeline-workers", "3")
+
+    assert result.exit_code == 1
+    headers = [line for line in result.output.splitlines() if "Environment:" in line]
+    assert headers == [
+        "Environment: dev",
+        "Environment: staging",
+        "Environment: prod",
+    ]
+    assert "No drift detected in dev" in result.output
+    assert "No baseline found for staging" in result.output
+    assert "Drift detected in prod" in result.output
+    assert "Alert sent to SNS topic" in result.output
+    notifier.send_alert.assert_called_once()
+
+
+def test_detect_all_succeeds_when_every_environment_has_a_baseline(
+    invoke, storage, scanner, make_scan
+):
+    """Test detect-all exits 0 with one sequential per-environment pass."""
+    storage.save_baseline("staging", make_scan("staging"))
+
+    result = invoke("detect-all", "--per-environment", "--pipeline-workers", "1")
+
+    assert result.exit_code == 0, result.output
+    assert result.output.count("No drift detected") == 3
+    scanner.scan_account.assert_not_called()
+
+
+def test_detect_shows_cost_impact(invoke, storage, make_scan):
+    """Test single-environment detection prints drift and its cost."""
+    storage.save_baseline("prod", {**make_scan("prod"), "resources": {"ec2": []}})
+
+    result = invoke("detect", "prod")
+
+    assert result.exit_code == 0, result.output
+    assert "Drift detected in prod" in result.output
+    assert "Cost Impact: +$" in result.output
+    assert "Report saved: reports/prod/" in result.output
+
+
+def test_detect_fails_on_incomplete_scan(invoke, scanner):
+    """Test scan errors are printed and skip comparison."""
+    scanner.scan_errors = {"dev": {"rds": "AccessDenied"}}
+
+    result = invoke("detect", "dev")
+
+    assert result.exit_code == 1
+    assert "rds scan failed: AccessDenied" in result.stderr
+    assert "Scan of dev incomplete" in result.output
+
+
+def test_baseline_not_saved_on_incomplete_scan(invoke, scanner, storage):
+    """Test a partial scan never replaces the baseline."""
+    scanner.scan_errors = {"staging": {"ec2": "Throttling"}}
+
+    result = invoke("baseline", "staging")
+
+    assert result.exit_code == 1
+    assert storage.load_baseline("staging") is None
+
+
+def test_baseline_saves_cost_totals(invoke, storage):
+    """Test baselines carry cost totals for later delta pricing."""
+    result = invoke("baseline", "staging")
+
+    assert result.exit_code == 0, result.output
+    assert storage.load_baseline("staging")["cost_totals"]["hourly_cost"] > 0
+
+
+def test_scan_matrix_prints_targets_and_saves(invoke, storage):
+    """Test matrix scans report each target and save the merged snapshot."""
+    orchestrator = MagicMock(targets=[MagicMock(), MagicMock()])
+    orchestrator.scan.return_value = {
+        "timestamp": "2024-01-02T00:00:00",
+        "targets": {
+            "111/us-east-1": {
+                "status": "ok",
+                "duration_seconds": 1.5,
+                "scan_errors": {"dev": {"s3": "AccessDenied", "ecs": "Throttling"}},
+            },
+            "111/eu-west-1": {
+                "status": "failed",
+                "duration_seconds": 0.25,
+                "error": "AccessDenied",
+            },
+        },
+    }
+
+    with patch(
+        "drift_detection.orchestrator.ScanOrchestrator.from_matrix",
+        return_value=orchestrator,
+    ) as from_matrix:
+        result = invoke("scan-matrix", "dev", "--regions", "us-east-1, eu-west-1")
+
+    assert result.exit_code == 0, result.output
+    from_matrix.assert_called_once_with(
+        regions=["us-east-1", "eu-west-1"],
+        role_arns=[None],
+        max_concurrency=cli.DEFAULT_MAX_CONCURRENCY,
+    )
+    assert "✓ 111/us-east-1: 1.50s" in result.output
+    assert "dev: failed ecs, s3" in result.output
+    assert "✗ 111/eu-west-1: 0.25s" in result.output
+    key = result.output.split("Matrix scan saved: ")[1].strip()
+    assert storage._load_json(key)["targets"]["111/eu-west-1"]["status"] == "failed"
+
+
+def test_history_filters_reports(invoke, storage, make_scan):
+    """Test history lists matching catalog entries with risk and cost."""
+    storage.save_scan("prod", make_scan("prod"))
+    for risk, cost in (("low", 0.0), ("critical", 12.5)):
+        storage.save_report(
+            "prod",
+            {
+                "drift_detected": True,
+                "risk_assessment": {"overall_risk": risk},
+                "cost_impact": {"monthly_impact": cost},
+            },
+        )
+
+    result = invoke("history", "prod", "--kind", "report", "--min-risk", "high")
+
+    assert result.exit_code == 0, result.output
+    lines = result.output.splitlines()
+    assert len([line for line in lines if "reports/prod/" in line]) == 1
+    assert "CRITICAL  $+12.50/mo" in result.output
+    assert "1 entries" in result.output
+
+
+def _price_list(path, offer):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["OfferCode", offer])
+        writer.writerow(["Version", "20240101000000"])
+        writer.writerow(
+            ["SKU", "TermType", "Unit", "PricePerUnit", "Region Code"]
+            + ["Instance Type", "Tenancy", "Operating System"]
+            + ["Pre Installed S/W", "CapacityStatus"]
+        )
+        writer.writerow(
+            ["A", "OnDemand", "Hrs", "0.096", "us-east-1", "m5.large"]
+            + ["Shared", "Linux", "NA", "Used"]
+        )
+    return str(path)
+
+
+def test_import_pricing_builds_catalog(tmp_path):
+    """Test price lists are imported into the catalog file."""
+    output = str(tmp_path / "pricing.db")
+
+    result = CliRunner().invoke(
+        cli.cli,
+        ["import-pricing", _price_list(tmp_path / "ec2.csv", "AmazonEC2")]
+        + ["--output", output],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "✓ 1 ec2 prices imported" in result.output
+    assert (tmp_path / "pricing.db").exists()
+
+
+def test_import_pricing_rejects_unsupported_offer(tmp_path):
+    """Test a bad price list is an error message, not a traceback."""
+    result = CliRunner().invoke(
+        cli.cli,
+        ["import-pricing", _price_list(tmp_path / "s3.csv", "AmazonS3")]
+        + ["--output", str(tmp_path / "pricing.db")],
+    )
+
+    assert result.exit_code == 1
+    assert "Unsupported price list offer 'AmazonS3'" in result.output
+
+
+def test_missing_pricing_db_is_a_usage_error(invoke, tmp_path):
+    """Test a mistyped --pricing-db fails before any scan."""
+    result = invoke("--pricing-db", str(tmp_path / "missing.db"), "detect", "dev")
+
+    assert result.exit_code == 2
+    assert "--pricing-db" in result.output
@@ -0,0 +1,52 @@
+"""Tests for the shared client registry."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from drift_detection.clients import ClientRegistry
+
+
+@pytest.fixture
+def mock_session():
+    """Mock boto3 session creation."""
+    with patch("drift_detection.clients.boto3.Session") as mock:
+        mock.side_effect = lambda region_name: MagicMock(region_name=region_name)
+        yield mock
+
+
+def test_session_created_once_per_region(mock_session):
+    """Test sessions are reused for the same region."""
+    registry = ClientRegistry()
+
+    first = registry.session("us-east-1")
+    second = registry.session("us-east-1")
+    other = registry.session("eu-west-1")
+
+    assert first is second
+    assert other is not first
+    assert mock_session.call_count == 2
+
+
+def test_components_built_once_and_share_session(mock_session):
+    """Test factories run on first use only, with the region's session."""
+    registry = ClientRegistry()
+    factory = MagicMock(side_effect=lambda session: object())
+
+    scanner = registry.get("scanner", "us-east-1", factory)
+    again = registry.get("scanner", "us-east-1", factory)
+
+    assert scanner is again
+    factory.assert_called_once_with(registry.session("us-east-1"))
+
+
+def test_clear_forces_rebuild(mock_session):
+    """Test clearing the registry drops cached components."""
+    registry = ClientRegistry()
+    factory = MagicMock(side_effect=lambda session: object())
+
+    registry.get("storage", "us-east-1", factory)
+    registry.clear()
+    registry.get("storage", "us-east-1", factory)
+
+    assert factory.call_count == 2
@@ -1,8 +1,14 @@
 """Tests for drift comparator module."""
 
+import copy
+from unittest.mock import patch
+
 import pytest
 
+from drift_detection import comparator as comparator_module
+from drift_detection.changes import Change
 from drift_detection.comparator import DriftComparator
+from drift_detection.hashing import resource_digests
 
 
 @pytest.fixture
@@ -65,3 +71,220 @@ def test_drift_detected_added_resource(comparator):
     result = comparator.compare(baseline, current)
 
     assert result["drift_detected"] is True
+
+
+def _snapshot(timestamp, resources):
+    return {"environment": "dev", "timestamp": timestamp, "resources": resources}
+
+
+def test_keyed_paths_use_resource_ids(comparator):
+    """Test changes, additions and removals are reported by resource ID."""
+    baseline = _snapshot(
+        "2024-01-01T00:00:00",
+        {
+            "ec2": [
+                {"instance_id": "i-1", "instance_type": "t3.micro"},
+                {"instance_id": "i-2", "instance_type": "t3.micro"},
+            ],
+            "s3": [{"bucket_name": "logs"}],
+        },
+    )
+    current = _snapshot(
+        "2024-01-02T00:00:00",
+        {
+            "ec2": [
+                {"instance_id": "i-3", "instance_type": "t3.micro"},
+                {"instance_id": "i-2", "instance_type": "t3.large"},
+            ],
+            "s3": [{"bucket_name": "logs"}],
+        },
+    )
+
+    result = comparator.compare(baseline, current)
+
+    assert result["drift_summary"] == {
+        "added": ["root['ec2']['i-3']"],
+        "removed": ["root['ec2']['i-1']"],
+        "changed": ["root['ec2']['i-2']['instance_type']"],
+    }
+    assert result["detailed_diff"]["values_changed"][
+        "root['ec2']['i-2']['instance_type']"
+    ] == {"old_value": "t3.micro", "new_value": "t3.large"}
+
+
+def test_keyed_ignores_ordering(comparator):
+    """Test reordered resources and nested lists are not drift."""
+    vpc = {
+        "vpc_id": "vpc-1",
+        "subnets": [{"subnet_id": "a"}, {"subnet_id": "b"}],
+        "tags": {"Environment": "dev"},
+    }
+    reordered = dict(vpc, subnets=list(reversed(vpc["subnets"])))
+    baseline = _snapshot(
+        "2024-01-01T00:00:00",
+        {"vpc": [vpc], "lambda": [{"function_name": "a"}, {"function_name": "b"}]},
+    )
+    current = _snapshot(
+        "2024-01-02T00:00:00",
+        {
+            "vpc": [reordered],
+            "lambda": [{"function_name": "b"}, {"function_name": "a"}],
+        },
+    )
+
+    assert comparator.compare(baseline, current)["drift_detected"] is False
+
+
+def test_keyed_reports_nested_field_paths(comparator):
+    """Test nested dict changes get a path down to the changed key."""
+    baseline = _snapshot(
+        "2024-01-01T00:00:00", {"vpc": [{"vpc_id": "vpc-1", "tags": {"Team": "a"}}]}
+    )
+    current = _snapshot(
+        "2024-01-02T00:00:00", {"vpc": [{"vpc_id": "vpc-1", "tags": {"Team": "b"}}]}
+    )
+
+    result = comparator.compare(baseline, current)
+
+    assert result["drift_summary"]["changed"] == [
+        "root['vpc']['vpc-1']['tags']['Team']"
+    ]
+
+
+def test_deepdiff_engine_still_available():
+    """Test the whole-tree DeepDiff engine can be selected."""
+    comparator = DriftComparator(engine="deepdiff")
+    baseline = _snapshot("2024-01-01T00:00:00", {"ec2": [{"instance_id": "i-1"}]})
+    current = _snapshot("2024-01-02T00:00:00", {"ec2": [{"instance_id": "i-2"}]})
+
+    assert comparator.compare(baseline, current)["drift_detected"] is True
+    with pytest.raises(ValueError):
+        DriftComparator(engine="fuzzy")
+
+
+def _hashed(timestamp, resources):
+    scan = _snapshot(timestamp, resources)
+    scan["digests"] = resource_digests(resources)
+    return scan
+
+
+def test_equal_digest_roots_skip_comparison(comparator):
+    """Test scans with equal digest roots are not compared record by record."""
+    resources = {"ec2": [{"instance_id": f"i-{i}"} for i in range(100)]}
+    baseline = _hashed("2024-01-01T00:00:00", resources)
+    current = _hashed("2024-01-02T00:00:00", copy.deepcopy(resources))
+
+    with patch("drift_detection.comparator.index_resources") as index:
+        result = comparator.compare(baseline, current)
+
+    assert result["drift_detected"] is False
+    index.assert_not_called()
+
+
+def test_digests_limit_comparison_to_changed_types(comparator):
+    """Test only types and resources whose hashes differ are diffed."""
+    baseline = _hashed(
+        "2024-01-01T00:00:00",
+        {
+            "ec2": [{"instance_id": "i-1", "state": "running"}, {"instance_id": "i-2"}],
+            "s3": [{"bucket_name": "logs"}],
+        },
+    )
+    current = _hashed(
+        "2024-01-02T00:00:00",
+        {
+            "ec2": [{"instance_id": "i-1", "state": "stopped"}, {"instance_id": "i-2"}],
+            "s3": [{"bucket_name": "logs"}],
+        },
+    )
+
+    with patch(
+        "drift_detection.comparator._diff_values", wraps=comparator_module._diff_values
+    ) as diff_values:
+        result = comparator.compare(baseline, current)
+
+    assert result["drift_summary"]["changed"] == ["root['ec2']['i-1']['state']"]
+    # Only i-1 is descended into (the call for its field recurses)
+    assert {c.args[0] for c in diff_values.call_args_list} == {
+        "root['ec2']['i-1']",
+        "root['ec2']['i-1']['state']",
+    }
+
+
+def test_slim_results_carry_only_changed_resources():
+    """Test slim results drop the resource trees but keep changed records."""
+    baseline = _snapshot(
+        "2024-01-01T00:00:00",
+        {
+            "ec2": [
+                {"instance_id": "i-1", "instance_type": "t3.micro"},
+                {"instance_id": "i-2", "instance_type": "t3.micro"},
+                {"instance_id": "i-3", "instance_type": "t3.micro"},
+            ]
+        },
+    )
+    current = _snapshot(
+        "2024-01-02T00:00:00",
+        {
+            "ec2": [
+                {"instance_id": "i-1", "instance_type": "t3.large"},
+                {"instance_id": "i-2", "instance_type": "t3.micro"},
+                {"instance_id": "i-4", "instance_type": "t3.small"},
+            ]
+        },
+    )
+
+    result = DriftComparator(slim=True).compare(baseline, current)
+
+    assert "baseline_resources" not in result
+    assert "current_resources" not in result
+    assert result["changed_resources"] == {
+        "ec2": {
+            "i-1": {
+                "before": {"instance_id": "i-1", "instance_type": "t3.micro"},
+                "after": {"instance_id": "i-1", "instance_type": "t3.large"},
+            },
+            "i-3": {
+                "before": {"instance_id": "i-3", "instance_type": "t3.micro"},
+                "after": None,
+            },
+            "i-4": {
+                "before": None,
+                "after": {"instance_id": "i-4", "instance_type": "t3.small"},
+            },
+        }
+    }
+
+
+def test_slim_requires_keyed_engine():
+    """Test slim results are rejected for the DeepDiff engine."""
+    with pytest.raises(ValueError):
+        DriftComparator(engine="deepdiff", slim=True)
+
+
+def test_keyed_emits_change_records(comparator):
+    """Test the keyed engine returns typed records with IDs and values."""
+    baseline = _snapshot(
+        "2024-01-01T00:00:00",
+        {"ec2": [{"instance_id": "i-1", "tags": {"Name": "web"}, "state": "running"}]},
+    )
+    current = _snapshot(
+        "2024-01-02T00:00:00",
+        {"ec2": [{"instance_id": "i-1", "tags": {"Name": "api"}, "state": "running"}]},
+    )
+
+    result = comparator.compare(baseline, current)
+
+    assert result["changes"] == [
+        Change(
+            "changed",
+            "ec2",
+            "i-1",
+            "Name",
+            "web",
+            "api",
+            "root['ec2']['i-1']['tags']['Name']",
+        )
+    ]
+    assert result["drift_summary"]["changed"] == [result["changes"][0].path]
+    assert "detailed_diff" not in DriftComparator(slim=True).compare(baseline, current)
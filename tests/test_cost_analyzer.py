@@ -1,7 +1,11 @@
 """Tests for cost analyzer module."""
 
+from unittest.mock import patch
+
 import pytest
 
+from drift_detection.changes import Change
+from drift_detection.comparator import DriftComparator
 from drift_detection.cost_analyzer import CostAnalyzer
 
 
@@ -77,3 +81,124 @@ def test_cost_calculation_multiple_resources(analyzer):
 
     assert result["monthly_impact"] > 0
     assert "impact_percentage" in result
+
+
+def test_slim_result_cost_matches_full_result(analyzer):
+    """Test pricing changed resources alone gives the full-tree impact."""
+    baseline = {
+        "ec2": [
+            {"instance_id": "i-1", "instance_type": "t3.micro", "state": "running"},
+            {"instance_id": "i-2", "instance_type": "t3.large", "state": "running"},
+        ],
+        "rds": [{"db_instance_identifier": "db", "db_instance_class": "db.t3.small"}],
+        "s3": [{"bucket_name": "logs"}],
+    }
+    current = {
+        "ec2": [
+            {"instance_id": "i-1", "instance_type": "t3.xlarge", "state": "running"},
+            {"instance_id": "i-3", "instance_type": "t3.small", "state": "running"},
+        ],
+        "rds": [{"db_instance_identifier": "db", "db_instance_class": "db.t3.small"}],
+        "s3": [{"bucket_name": "logs"}, {"bucket_name": "data"}],
+    }
+    slim_result = {
+        "drift_detected": True,
+        "changed_resources": {
+            "ec2": {
+                "i-1": {"before": baseline["ec2"][0], "after": current["ec2"][0]},
+                "i-2": {"before": baseline["ec2"][1], "after": None},
+                "i-3": {"before": None, "after": current["ec2"][1]},
+            },
+            "s3": {"data": {"before": None, "after": current["s3"][1]}},
+        },
+    }
+    full_result = {
+        "drift_detected": True,
+        "baseline_resources": baseline,
+        "current_resources": current,
+    }
+
+    slim = analyzer.analyze_cost_impact(slim_result)
+    full = analyzer.analyze_cost_impact(full_result)
+
+    assert slim["monthly_impact"] == full["monthly_impact"]
+    assert "impact_percentage" not in slim
+
+
+def test_slim_result_skips_unpriced_changes(analyzer):
+    """Test resources whose changed fields carry no price are not priced."""
+    before = {"instance_id": "i-1", "instance_type": "t3.micro", "state": "running"}
+    after = dict(before, tags={"team": "web"})
+    slim_result = {
+        "drift_detected": True,
+        "changes": [
+            Change("changed", "ec2", "i-1", "tags", None, {"team": "web"}, "p"),
+        ],
+        "changed_resources": {"ec2": {"i-1": {"before": before, "after": after}}},
+    }
+
+    with patch.object(analyzer, "_resource_cost") as resource_cost:
+        result = analyzer.analyze_cost_impact(slim_result)
+
+    assert result["monthly_impact"] == 0
+    resource_cost.assert_not_called()
+
+
+def test_baseline_cost_totals_restore_full_impact(analyzer):
+    """Test totals saved with the baseline give slim results full figures."""
+    baseline = {
+        "ec2": [
+            {"instance_id": "i-1", "instance_type": "t3.micro", "state": "running"}
+        ],
+        "rds": [{"db_instance_identifier": "db", "db_instance_class": "db.t3.small"}],
+    }
+    current = {
+        "ec2": [
+            {"instance_id": "i-1", "instance_type": "t3.large", "state": "running"}
+        ],
+        "rds": baseline["rds"],
+    }
+    baseline_scan = {
+        "environment": "dev",
+        "timestamp": "2024-01-01T00:00:00",
+        "resources": baseline,
+        "cost_totals": analyzer.environment_totals(baseline),
+    }
+    current_scan = dict(baseline_scan, timestamp="2024-01-02T00:00:00")
+    current_scan["resources"] = current
+    full_result = {
+        "drift_detected": True,
+        "baseline_resources": baseline,
+        "current_resources": current,
+    }
+
+    slim = analyzer.analyze_cost_impact(
+        DriftComparator(slim=True).compare(baseline_scan, current_scan)
+    )
+    full = analyzer.analyze_cost_impact(full_result)
+
+    assert slim == full
+    assert slim["details"] == [
+        {
+            "resource_type": "ec2",
+            "resource_id": "i-1",
+            "change_type": "changed",
+            "before_hourly": 0.0104,
+            "after_hourly": 0.0832,
+            "hourly_delta": pytest.approx(0.0832 - 0.0104),
+            "monthly_delta": full["monthly_impact"],
+        }
+    ]
+
+
+def test_stale_cost_totals_are_ignored(analyzer):
+    """Test totals from another pricing version are not trusted."""
+    slim_result = {
+        "drift_detected": True,
+        "changed_resources": {},
+        "baseline_cost_totals": {"version": 0, "hourly_cost": 1.0},
+    }
+
+    result = analyzer.analyze_cost_impact(slim_result)
+
+    assert "impact_percentage" not in result
@@ -0,0 +1,37 @@
+"""Tests for canonical content hashing."""
+
+from drift_detection.hashing import canonical_json, content_hash, resource_digests
+
+
+def test_hash_ignores_key_order():
+    """Test equal documents hash equally regardless of key order."""
+    assert content_hash({"a": 1, "b": [1, 2]}) == content_hash({"b": [1, 2], "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": 2})
+
+
+def test_canonical_json_is_compact():
+    """Test the canonical encoding has no optional whitespace."""
+    assert canonical_json({"b": 1, "a": None}) == b'{"a":null,"b":1}'
+
+
+def test_digest_roots_track_content():
+    """Test digest roots ignore resource order but catch any change."""
+    resources = {"ec2": [{"instance_id": "i-1"}, {"instance_id": "i-2"}]}
+    reordered = {"ec2": list(reversed(resources["ec2"]))}
+    changed = {"ec2": [{"instance_id": "i-1"}, {"instance_id": "i-2", "x": 1}]}
+
+    digests = resource_digests(resources)
+
+    assert digests["root"] == resource_digests(reordered)["root"]
+    assert digests["root"] != resource_digests(changed)["root"]
+    assert digests["types"]["ec2"]["resources"]["i-1"] == content_hash(
+        {"instance_id": "i-1"}
+    )
+
+
+def test_digests_accept_precomputed_hashes():
+    """Test manifest record hashes produce the same digest tree."""
+    resources = {"s3": [{"bucket_name": "a"}], "vpc": [{"cidr": "10.0.0.0/16"}]}
+    hashes = {t: [content_hash(r) for r in rs] for t, rs in resources.items()}
+
+    assert resource_digests(resources, hashes) == resource_digests(resources)
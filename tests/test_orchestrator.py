@@ -0,0 +1,118 @@
+"""Tests for multi-region, multi-account scan orchestration."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from drift_detection.orchestrator import ScanOrchestrator, ScanTarget
+
+
+@pytest.fixture
+def mock_session():
+    """Mock boto3 sessions created by the orchestrator."""
+    with patch("drift_detection.orchestrator.boto3.Session") as mock:
+        sts = mock.return_value.client.return_value
+        sts.assume_role.return_value = {
+            "Credentials": {
+                "AccessKeyId": "AKIA",
+                "SecretAccessKey": "secret",
+                "SessionToken": "token",
+            }
+        }
+        sts.get_caller_identity.return_value = {"Account": "111111111111"}
+        yield mock
+
+
+@pytest.fixture
+def mock_scanner():
+    """Mock per-target scanners."""
+    with patch("drift_detection.orchestrator.AWSScanner") as mock:
+
+        def _scanner(region, session, slots):
+            scanner = MagicMock(scan_errors={})
+            scanner.scan_account.side_effect = lambda envs: {
+                env: {"environment": env, "region": region, "resources": {}}
+                for env in envs
+            }
+            return scanner
+
+        mock.side_effect = _scanner
+        yield mock
+
+
+def test_from_matrix_builds_every_target():
+    """Test every account is combined with every region."""
+    with patch("drift_detection.orchestrator.boto3.Session"):
+        orchestrator = ScanOrchestrator.from_matrix(
+            regions=["us-east-1", "eu-west-1"],
+            role_arns=["arn:aws:iam::222222222222:role/a", None],
+        )
+
+    assert orchestrator.targets == [
+        ScanTarget("us-east-1", "arn:aws:iam::222222222222:role/a"),
+        ScanTarget("eu-west-1", "arn:aws:iam::222222222222:role/a"),
+        ScanTarget("us-east-1", None),
+        ScanTarget("eu-west-1", None),
+    ]
+
+
+def test_from_matrix_rejects_malformed_role_arn():
+    """Test a bad role ARN fails up front with the ARN in the message."""
+    with pytest.raises(ValueError, match="Malformed role ARN 'role/scan'"):
+        ScanOrchestrator.from_matrix(regions=["us-east-1"], role_arns=["role/scan"])
+
+
+def test_scan_merges_targets_by_account_and_region(mock_session, mock_scanner):
+    """Test results are keyed by account/region with per-target timing."""
+    orchestrator = ScanOrchestrator.from_matrix(
+        regions=["us-east-1", "eu-west-1"],
+        role_arns=["arn:aws:iam::222222222222:role/scan", None],
+        max_concurrency=2,
+    )
+
+    snapshot = orchestrator.scan(["dev", "prod"])
+
+    assert list(snapshot["targets"]) == [
+        "222222222222/us-east-1",
+        "222222222222/eu-west-1",
+        "111111111111/us-east-1",
+        "111111111111/eu-west-1",
+    ]
+    target = snapshot["targets"]["222222222222/eu-west-1"]
+    assert target["status"] == "ok"
+    assert target["duration_seconds"] >= 0
+    assert target["environments"]["prod"]["region"] == "eu-west-1"
+    slots = {call.kwargs["slots"] for call in mock_scanner.call_args_list}
+    assert len(slots) == 1
+
+
+def test_failed_target_does_not_stop_others(mock_session, mock_scanner):
+    """Test one failing account is reported while the rest still scan."""
+    sts = mock_session.return_value.client.return_value
+    sts.assume_role.side_effect = [RuntimeError("access denied")]
+    orchestrator = ScanOrchestrator(
+        [
+            ScanTarget("us-east-1", "arn:aws:iam::333333333333:role/scan"),
+            ScanTarget("us-east-1"),
+        ]
+    )
+
+    snapshot = orchestrator.scan(["dev"])
+
+    failed = snapshot["targets"]["333333333333/us-east-1"]
+    assert failed["status"] == "failed"
+    assert failed["error"] == "access denied"
+    assert snapshot["targets"]["111111111111/us-east-1"]["status"] == "ok"
+
+
+def test_malformed_target_recorded_as_failed(mock_session, mock_scanner):
+    """Test a target built with a bad ARN fails alone instead of raising."""
+    orchestrator = ScanOrchestrator(
+        [ScanTarget("us-east-1", "not-an-arn"), ScanTarget("us-east-1")]
+    )
+
+    snapshot = orchestrator.scan(["dev"])
+
+    assert snapshot["targets"]["unknown/us-east-1"]["status"] == "failed"
+    assert "Malformed role ARN" in snapshot["targets"]["unknown/us-east-1"]["error"]
+    assert snapshot["targets"]["111111111111/us-east-1"]["status"] == "ok"
@@ -0,0 +1,104 @@
+"""Tests for the concurrent environment detection pipeline."""
+
+import threading
+from unittest.mock import MagicMock
+
+from drift_detection.comparator import DriftComparator
+from drift_detection.pipeline import DetectionPipeline
+from drift_detection.reporter import DriftReporter
+
+ENVIRONMENTS = ["dev", "staging", "prod"]
+
+
+def _pipeline(scanner, storage, **kwargs):
+    return DetectionPipeline(
+        scanner=scanner,
+        storage=storage,
+        comparator=DriftComparator(slim=True),
+        reporter=DriftReporter(),
+        **kwargs,
+    )
+
+
+def test_outcomes_keep_environment_order(scanner, storage):
+    """Test outcomes come back in input order when workers finish out of order."""
+    comparator = DriftComparator(slim=True)
+    prod_done = threading.Event()
+
+    def compare(baseline, current):
+        if current["environment"] == "dev":
+            # dev only finishes after prod has
+            assert prod_done.wait(timeout=5)
+        result = comparator.compare(baseline, current)
+        if current["environment"] == "prod":
+            prod_done.set()
+        return result
+
+    pipeline = _pipeline(scanner, storage, max_workers=3)
+    pipeline.comparator = MagicMock(compare=MagicMock(side_effect=compare))
+
+    outcomes = pipeline.run(ENVIRONMENTS)
+
+    assert [o.environment for o in outcomes] == ENVIRONMENTS
+    assert [o.status for o in outcomes] == ["no_drift", "no_drift", "drift_detected"]
+    scanner.scan_account.assert_called_once_with(ENVIRONMENTS, None)
+    for outcome in outcomes:
+        assert storage._load_json(outcome.report_key)["environment"] == (
+            outcome.environment
+        )
+
+
+def test_missing_baseline_is_not_scanned(scanner, storage):
+    """Test environments without a baseline are skipped before the scan."""
+    outcomes = _pipeline(scanner, storage).run(["dev", "qa"])
+
+    assert [o.status for o in outcomes] == ["no_drift", "no_baseline"]
+    scanner.scan_account.assert_called_once_with(["dev"], None)
+
+
+def test_scan_errors_skip_comparison(scanner, storage):
+    """Test an incomplete scan is reported instead of compared."""
+    scanner.scan_errors = {"staging": {"ec2": "AccessDenied"}}
+
+    outcomes = _pipeline(scanner, storage).run(ENVIRONMENTS)
+
+    assert outcomes[1].status == "scan_failed"
+    assert outcomes[1].scan_errors == {"ec2": "AccessDenied"}
+    assert outcomes[1].report is None
+
+
+def test_notifier_built_once_for_drifted_environments(scanner, storage, make_scan):
+    """Test alerts go out only for drift, through one shared notifier."""
+    scanner.scan_account.side_effect = lambda envs, previous: {
+        env: make_scan(env, "t3.large") for env in envs
+    }
+    notifier = MagicMock()
+    notifier.send_alert.return_value = "msg-1"
+    factory = MagicMock(return_value=notifier)
+
+    outcomes = _pipeline(
+        scanner, storage, notifier=factory, sns_topic="arn:topic", max_workers=3
+    ).run(ENVIRONMENTS)
+
+    factory.assert_called_once_with()
+    assert notifier.send_alert.call_count == 3
+    assert all(o.message_id == "msg-1" for o in outcomes)
+
+
+def test_per_environment_scans_on_workers(scanner, storage):
+    """Test per-environment mode scans each environment separately."""
+    outcomes = _pipeline(scanner, storage).run(ENVIRONMENTS, per_environment=True)
+
+    assert [o.status for o in outcomes] == ["no_drift"] * 3
+    scanner.scan_account.assert_not_called()
+    assert sorted(c.args[0] for c in scanner.scan_environment.call_args_list) == (
+        sorted(ENVIRONMENTS)
+    )
+
+
+def test_no_notifier_skips_alerts(scanner, storage):
+    """Test drift without a notifier factory is reported but not alerted."""
+    outcomes = _pipeline(scanner, storage, sns_topic="arn:topic").run(ENVIRONMENTS)
+
+    assert outcomes[2].status == "drift_detected"
+    assert outcomes[2].message_id is None
@@ -0,0 +1,175 @@
+"""Tests for the offline pricing catalog."""
+
+import csv
+from unittest.mock import patch
+
+import pytest
+
+from drift_detection.cost_analyzer import CostAnalyzer
+from drift_detection.pricing import (
+    PricingCatalog,
+    import_price_lists,
+    read_price_list,
+)
+
+HEADER = [
+    "SKU",
+    "TermType",
+    "Unit",
+    "PricePerUnit",
+    "Region Code",
+    "Instance Type",
+    "Tenancy",
+    "Operating System",
+    "Pre Installed S/W",
+    "CapacityStatus",
+    "Database Engine",
+    "Deployment Option",
+]
+
+
+def _price_list(path, offer, rows, version="20240101000000"):
+    """Write a price list shaped like an AWS bulk CSV export."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(["FormatVersion", "v1.0"])
+        writer.writerow(["Version", version])
+        writer.writerow(["OfferCode", offer])
+        writer.writerow(HEADER)
+        for row in rows:
+            writer.writerow([row.get(column, "") for column in HEADER])
+    return str(path)
+
+
+def _ec2(instance_type, price, region="us-east-1", **overrides):
+    row = {
+        "SKU": f"{region}-{instance_type}",
+        "TermType": "OnDemand",
+        "Unit": "Hrs",
+        "PricePerUnit": str(price),
+        "Region Code": region,
+        "Instance Type": instance_type,
+        "Tenancy": "Shared",
+        "Operating System": "Linux",
+        "Pre Installed S/W": "NA",
+        "CapacityStatus": "Used",
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    """Catalog imported from small EC2 and RDS price lists."""
+    ec2 = _price_list(
+        tmp_path / "ec2.csv",
+        "AmazonEC2",
+        [
+            _ec2("m5.large", 0.096),
+            _ec2("m5.large", 0.107, region="eu-west-1"),
+            _ec2("m5.large", 0.192, **{"Operating System": "Windows"}),
+            _ec2("m5.large", 0.05, TermType="Reserved"),
+        ],
+    )
+    rds = _price_list(
+        tmp_path / "rds.csv",
+        "AmazonRDS",
+        [
+            {
+                "TermType": "OnDemand",
+                "Unit": "Hrs",
+                "PricePerUnit": "0.171",
+                "Region Code": "us-east-1",
+                "Instance Type": "db.r6g.large",
+                "Database Engine": "MySQL",
+                "Deployment Option": "Single-AZ",
+            }
+        ],
+    )
+    path = str(tmp_path / "pricing.db")
+    assert import_price_lists(path, [ec2, rds]) == {"ec2": 2, "rds": 1}
+    return path
+
+
+def test_counts_add_up_across_price_lists_for_a_service(tmp_path):
+    """Test a service split over several files reports every imported row."""
+    paths = [
+        _price_list(
+            tmp_path / f"ec2-{region}.csv", "AmazonEC2", [_ec2("m5.large", 0.1, region)]
+        )
+        for region in ("us-east-1", "eu-west-1")
+    ]
+
+    assert import_price_lists(str(tmp_path / "pricing.db"), paths) == {"ec2": 2}
+
+
+def test_lookup_by_region_service_and_type(catalog_path):
+    """Test on-demand Linux prices are keyed by region and instance type."""
+    catalog = PricingCatalog(catalog_path)
+
+    assert catalog.hourly("us-east-1", "ec2", "m5.large") == 0.096
+    assert catalog.hourly("eu-west-1", "ec2", "m5.large") == 0.107
+    assert catalog.hourly("us-east-1", "rds", "db.r6g.large") == 0.171
+    assert catalog.hourly("us-east-1", "ec2", "m5.xlarge") is None
+    assert catalog.version == "ec2:20240101000000,rds:20240101000000"
+
+
+def test_catalog_opens_lazily_and_memoizes(catalog_path):
+    """Test the database is opened on first lookup and queried once per key."""
+    catalog = PricingCatalog(catalog_path)
+    assert catalog._connection is None
+
+    with patch("drift_detection.pricing.sqlite3.connect") as connect:
+        connect.return_value.execute.return_value.fetchone.return_value = (0.5,)
+        for _ in range(3):
+            assert catalog.hourly("us-east-1", "ec2", "c7g.medium") == 0.5
+
+    connect.assert_called_once()
+    assert connect.return_value.execute.call_count == 1
+
+
+def test_rejects_unknown_price_lists(tmp_path):
+    """Test files that are not EC2/RDS price lists are refused."""
+    path = _price_list(tmp_path / "s3.csv", "AmazonS3", [])
+
+    with pytest.raises(ValueError):
+        import_price_lists(str(tmp_path / "pricing.db"), [path])
+
+
+def test_missing_price_columns_rejected_and_file_closed(tmp_path):
+    """Test a price list without a required column fails before streaming."""
+    path = tmp_path / "ec2.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["OfferCode", "AmazonEC2"])
+        writer.writerow([c for c in HEADER if c != "PricePerUnit"])
+    opened = []
+
+    def tracking_open(*args, **kwargs):
+        opened.append(open(*args, **kwargs))
+        return opened[-1]
+
+    with patch("drift_detection.pricing.open", tracking_open, create=True):
+        with pytest.raises(ValueError, match="PricePerUnit"):
+            read_price_list(str(path))
+
+    assert opened and opened[0].closed
+
+
+def test_cost_analyzer_prices_from_catalog(catalog_path):
+    """Test catalog prices are used, with the built-in table as fallback."""
+    analyzer = CostAnalyzer(region="us-east-1", pricing=PricingCatalog(catalog_path))
+    resources = {
+        "ec2": [
+            {"instance_type": "m5.large", "state": "running"},
+            {"instance_type": "t3.micro", "state": "running"},
+        ],
+        "rds": [{"db_instance_class": "db.r6g.large"}],
+    }
+
+    totals = analyzer.environment_totals(resources)
+
+    assert totals["hourly_cost"] == pytest.approx(0.096 + 0.0104 + 0.171)
+    assert totals["pricing"] == "us-east-1/ec2:20240101000000,rds:20240101000000"
+    # Totals priced differently are not reused
+    assert CostAnalyzer().environment_totals(resources)["pricing"] is None
@@ -2,6 +2,7 @@
 
 import pytest
 
+from drift_detection.comparator import DriftComparator
 from drift_detection.reporter import DriftReporter
 
 
@@ -70,3 +71,34 @@ def test_report_with_drift(reporter):
     assert "risk_assessment" in report
     assert "overall_risk" in report["risk_assessment"]
     assert "cost_impact" in report
+
+
+def test_report_lists_top_cost_movers():
+    """Test reports name the resources that moved cost most, largest first."""
+    running = {"state": "running"}
+    baseline = {
+        "ec2": [
+            dict(running, instance_id=f"i-{i}", instance_type="t3.micro")
+            for i in range(4)
+        ]
+    }
+    current = {
+        "ec2": [
+            dict(running, instance_id="i-0", instance_type="t3.2xlarge"),
+            dict(running, instance_id="i-1", instance_type="t3.small"),
+            dict(running, instance_id="i-2", instance_type="t3.large"),
+            dict(running, instance_id="i-3", instance_type="t3.micro"),
+        ]
+    }
+    drift_result = DriftComparator(slim=True).compare(
+        {"environment": "dev", "timestamp": "t0", "resources": baseline},
+        {"environment": "dev", "timestamp": "t1", "resources": current},
+    )
+
+    report = DriftReporter(top_cost_movers=2).generate_report(drift_result)
+
+    assert [row["resource_id"] for row in report["cost_movers"]] == ["i-0", "i-2"]
+    assert report["cost_movers"][0]["before_hourly"] == 0.0104
+    assert report["cost_movers"][0]["after_hourly"] == 0.3328
+    # The full rows stay in the cost impact; i-3 did not move
+    assert len(report["cost_impact"]["details"]) == 3
@@ -2,6 +2,8 @@
 
 import unittest
 
+from drift_detection.changes import Change, parse_change_path
+from drift_detection.comparator import DriftComparator
 from drift_detection.risk_scorer import RiskLevel, RiskScorer
 
 
@@ -122,6 +124,96 @@ class TestRiskScorer(unittest.TestCase):
         # Should be HIGH (elevated from MEDIUM due to critical field)
         self.assertIn(result["overall_risk"], [RiskLevel.HIGH, RiskLevel.CRITICAL])
 
+    def test_change_records_score_like_their_paths(self):
+        """Test comparator change records score the same as their diff paths."""
+        baseline = {
+            "environment": "dev",
+            "timestamp": "2024-01-01T00:00:00",
+            "resources": {
+                "ec2": [{"instance_id": "i-1", "instance_type": "t3.micro"}],
+                "rds": [{"db_instance_identifier": "db-1"}],
+                "lambda": [{"function_name": "fn", "tags": {"team": "a"}}],
+            },
+        }
+        current = {
+            "environment": "dev",
+            "timestamp": "2024-01-02T00:00:00",
+            "resources": {
+                "ec2": [{"instance_id": "i-1", "instance_type": "t3.large"}],
+                "lambda": [{"function_name": "fn", "tags": {"team": "b"}}],
+                "s3": [{"bucket_name": "logs"}],
+            },
+        }
+        drift_result = DriftComparator(slim=True).compare(baseline, current)
+        paths_only = {
+            "drift_detected": True,
+            "drift_summary": drift_result["drift_summary"],
+        }
+
+        batch = self.scorer.score_drift(drift_result)
+        by_path = self.scorer.score_drift(paths_only)
+
+        # Records come in comparator order, paths grouped by change type
+        self.assertCountEqual(batch["scored_changes"], by_path["scored_changes"])
+        self.assertEqual(batch["risk_distribution"], by_path["risk_distribution"])
+        self.assertEqual(
+            [
+                (c["resource_id"], c["field_name"], c["risk_level"])
+                for c in batch["scored_changes"]
+            ],
+            [
+                ("i-1", "instance_type", RiskLevel.CRITICAL),
+                ("db-1", "unknown", RiskLevel.CRITICAL),
+                ("fn", "team", RiskLevel.MEDIUM),
+                ("logs", "unknown", RiskLevel.MEDIUM),
+            ],
+        )
+        self.assertEqual(
+            batch["scored_changes"][0]["reason"],
+            "Compute changes affect performance and cost"
+            " - Critical field 'instance_type' modified",
+        )
+        self.assertEqual(batch["risk_distribution"]["critical"], 2)
+
+    def test_score_changes_unknown_types_default_to_low(self):
+        """Test unknown resource and change types score LOW, elevated if critical."""
+        result = self.scorer.score_changes(
+            [
+                Change("renamed", "iam", "r", "name", "a", "b", "root['iam']['r']"),
+                Change("renamed", "iam", "r", "state", "a", "b", "root['iam']['r']"),
+            ]
+        )
+
+        self.assertEqual(
+            [c["risk_level"] for c in result["scored_changes"]],
+            [RiskLevel.LOW, RiskLevel.MEDIUM],
+        )
+        self.assertEqual(result["overall_risk"], RiskLevel.MEDIUM)
+
+    def test_score_changes_empty_batch_is_info(self):
+        """Test an empty batch has INFO overall risk."""
+        result = self.scorer.score_changes([])
+
+        self.assertEqual(result["overall_risk"], RiskLevel.INFO)
+        self.assertEqual(sum(result["risk_distribution"].values()), 0)
+
+    def test_parse_change_path(self):
+        """Test keyed and index-based paths parse to the same type and field."""
+        path = "root['ecs']['api']['desired_count']"
+        self.assertEqual(
+            parse_change_path(path, "changed"),
+            Change("changed", "ecs", "api", "desired_count", None, None, path),
+        )
+        self.assertEqual(
+            parse_change_path("root['resources']['vpc'][0]['tags']['Name']", "changed")[
+                1:4
+            ],
+            ("vpc", 0, "Name"),
+        )
+        self.assertEqual(
+            parse_change_path("root[0]", "added")[1:4], ("unknown", None, None)
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
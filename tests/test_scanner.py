@@ -1,10 +1,13 @@
 """Tests for AWS scanner module."""
 
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 import pytest
+from botocore.exceptions import ClientError
 
-from drift_detection.scanner import AWSScanner
+from drift_detection.hashing import resource_digests
+from drift_detection.scanner import S3_LIST_PAGE_SIZE, AWSScanner
 
 
 @pytest.fixture
@@ -44,3 +47,470 @@ def test_scan_environment_structure(mock_boto3_session):
     assert "resources" in result
     assert "vpc" in result["resources"]
     assert "ec2" in result["resources"]
+    assert result["digests"] == resource_digests(result["resources"])
+
+
+def _mock_clients(scanner):
+    """Replace scanner clients with mocks returning one resource each."""
+    scanner.ec2 = MagicMock()
+    scanner.rds = MagicMock()
+    scanner.s3 = MagicMock()
+    scanner.lambda_client = MagicMock()
+    scanner.ecs = MagicMock()
+
+    scanner.ec2.describe_vpcs.return_value = {
+        "Vpcs": [
+            {
+                "VpcId": "vpc-1",
+                "CidrBlock": "10.0.0.0/16",
+                "State": "available",
+                "Tags": [{"Key": "Environment", "Value": "dev"}],
+            }
+        ]
+    }
+    scanner.ec2.describe_subnets.return_value = {"Subnets": []}
+    scanner.ec2.describe_instances.return_value = {
+        "Reservations": [
+            {
+                "Instances": [
+                    {
+                        "InstanceId": "i-1",
+                        "InstanceType": "t3.micro",
+                        "State": {"Name": "running"},
+                        "Tags": [{"Key": "Environment", "Value": "dev"}],
+                    }
+                ]
+            }
+        ]
+    }
+    scanner.rds.describe_db_instances.return_value = {"DBInstances": []}
+    scanner.s3.list_buckets.return_value = {"Buckets": []}
+    scanner.lambda_client.list_functions.return_value = {"Functions": []}
+    scanner.ecs.list_clusters.return_value = {"clusterArns": []}
+    scanner.tagging = MagicMock()
+    _mock_tag_index(scanner, {})
+    for client in (
+        scanner.ec2,
+        scanner.rds,
+        scanner.s3,
+        scanner.lambda_client,
+        scanner.ecs,
+    ):
+        _route_paginators(client)
+
+
+def _route_paginators(client):
+    """Serve each paginated operation as one page from its mocked method."""
+    client.can_paginate.return_value = True
+    client.get_paginator.side_effect = lambda operation: MagicMock(
+        paginate=lambda **kwargs: [getattr(client, operation)(**kwargs)]
+    )
+
+
+def _mock_tag_index(scanner, environments_by_arn):
+    """Serve a single get_resources page mapping ARNs to Environment tags."""
+    page = {
+        "ResourceTagMappingList": [
+            {"ResourceARN": arn, "Tags": [{"Key": "Environment", "Value": env}]}
+            for arn, env in environments_by_arn.items()
+        ]
+    }
+    scanner.tagging.get_paginator.return_value.paginate.return_value = [page]
+
+
+def test_concurrent_scan_matches_sequential(mock_boto3_session):
+    """Test concurrent and sequential scans produce identical resources."""
+    sequential = AWSScanner(max_workers=1)
+    concurrent = AWSScanner(max_workers=6)
+    _mock_clients(sequential)
+    _mock_clients(concurrent)
+
+    seq_result = sequential.scan_environment("dev")
+    con_result = concurrent.scan_environment("dev")
+
+    assert list(con_result["resources"]) == ["vpc", "ec2", "rds", "s3", "lambda", "ecs"]
+    assert con_result["resources"] == seq_result["resources"]
+
+
+def test_scan_errors_reported_per_resource_type(mock_boto3_session):
+    """Test a failing resource type is recorded without affecting others."""
+    scanner = AWSScanner()
+    _mock_clients(scanner)
+    scanner.rds.describe_db_instances.side_effect = ClientError(
+        {"Error": {"Code": "AccessDenied", "Message": "denied"}},
+        "DescribeDBInstances",
+    )
+
+    result = scanner.scan_environment("dev")
+
+    assert result["resources"]["rds"] == []
+    assert len(result["resources"]["ec2"]) == 1
+    assert list(scanner.scan_errors["dev"]) == ["rds"]
+
+
+def test_scan_account_partitions_by_environment(mock_boto3_session):
+    """Test account snapshot enumerates once and splits by Environment tag."""
+    scanner = AWSScanner()
+    _mock_clients(scanner)
+    scanner.s3.list_buckets.return_value = {
+        "Buckets": [{"Name": "dev-bucket"}, {"Name": "prod-bucket"}]
+    }
+    _mock_tag_index(
+        scanner,
+        {"arn:aws:s3:::dev-bucket": "dev", "arn:aws:s3:::prod-bucket": "prod"},
+    )
+
+    snapshot = scanner.scan_account(["dev", "prod"])
+
+    assert set(snapshot) == {"dev", "prod"}
+    assert snapshot["dev"]["resources"]["s3"] == [{"bucket_name": "dev-bucket"}]
+    assert snapshot["prod"]["resources"]["s3"] == [{"bucket_name": "prod-bucket"}]
+    assert snapshot["dev"]["resources"]["ec2"][0]["instance_id"] == "i-1"
+    assert snapshot["prod"]["resources"]["ec2"] == []
+    scanner.s3.list_buckets.assert_called_once()
+    scanner.s3.get_bucket_tagging.assert_not_called()
+    assert snapshot["dev"] == {
+        **scanner.scan_environment("dev"),
+        "timestamp": snapshot["dev"]["timestamp"],
+    }
+
+
+def test_tag_index_replaces_per_resource_tag_calls(mock_boto3_session):
+    """Test scanners join against the tag index instead of listing tags."""
+    scanner = AWSScanner()
+    _mock_clients(scanner)
+    arn = "arn:aws:lambda:us-east-1:123456789012:function:api"
+    scanner.lambda_client.list_functions.return_value = {
+        "Functions": [
+            {
+                "FunctionName": "api",
+                "FunctionArn": arn,
+                "Runtime": "python3.11",
+                "MemorySize": 256,
+            }
+        ]
+    }
+    _mock_tag_index(scanner, {arn: "dev"})
+
+    result = scanner.scan_environment("dev")
+
+    assert result["resources"]["lambda"][0]["function_name"] == "api"
+    scanner.lambda_client.list_tags.assert_not_called()
+    paginate = scanner.tagging.get_paginator.return_value.paginate
+    assert paginate.call_args.kwargs["TagFilters"] == [
+        {"Key": "Environment", "Values": ["dev"]}
+    ]
+
+
+def test_tag_index_failure_falls_back_to_per_resource_tags(mock_boto3_session):
+    """Test scanners look up tags directly when the tagging API is denied."""
+    scanner = AWSScanner()
+    _mock_clients(scanner)
+    scanner.tagging.get_paginator.return_value.paginate.side_effect = ClientError(
+        {"Error": {"Code": "AccessDenied", "Message": "denied"}}, "GetResources"
+    )
+    scanner.s3.list_buckets.return_value = {"Buckets": [{"Name": "dev-bucket"}]}
+    scanner.s3.get_bucket_tagging.return_value = {
+        "TagSet": [{"Key": "Environment", "Value": "dev"}]
+    }
+
+    result = scanner.scan_environment("dev")
+
+    assert result["resources"]["s3"] == [{"bucket_name": "dev-bucket"}]
+    assert scanner.scan_errors["dev"] == {}
+
+
+def test_scan_follows_every_page(mock_boto3_session):
+    """Test enumeration continues past the first page of results."""
+    scanner = AWSScanner()
+    _mock_clients(scanner)
+    pages = [
+        {
+            "Reservations": [
+                {
+                    "Instances": [
+                        {
+                            "InstanceId": f"i-{page}{n}",
+                            "InstanceType": "t3.micro",
+                            "State": {"Name": "running"},
+                            "Tags": [{"Key": "Environment", "Value": "dev"}],
+                        }
+                        for n in range(3)
+                    ]
+                }
+            ]
+        }
+        for page in range(4)
+    ]
+    scanner.ec2.get_paginator.side_effect = None
+    scanner.ec2.get_paginator.return_value.paginate.return_value = pages
+
+    result = scanner.scan_environment("dev")
+
+    assert len(result["resources"]["ec2"]) == 12
+    assert result["resources"]["ec2"][-1]["instance_id"] == "i-32"
+
+
+def test_iter_resources_streams_records(mock_boto3_session):
+    """Test resources can be consumed lazily, one record at a time."""
+    scanner = AWSScanner()
+    _mock_clients(scanner)
+
+    stream = scanner.iter_resources(["dev"], resource_types=["ec2"])
+
+    assert next(stream) == (
+        "ec2",
+        "dev",
+        {"instance_id": "i-1", "instance_type": "t3.micro", "state": "running"},
+    )
+    assert list(stream) == []
+    scanner.rds.describe_db_instances.assert_not_called()
+
+
+def test_ecs_describe_services_batched_per_cluster(mock_boto3_session):
+    """Test services are described ten at a time across parallel clusters."""
+    scanner = AWSScanner(max_workers=4)
+    _mock_clients(scanner)
+    clusters = ["cluster-a", "cluster-b"]
+    arns = {
+        cluster: [f"arn:aws:ecs:::service/{cluster}/svc-{n:02d}" for n in range(25)]
+        for cluster in clusters
+    }
+    scanner.ecs.list_clusters.return_value = {"clusterArns": clusters}
+    scanner.ecs.list_services.side_effect = lambda cluster: {
+        "serviceArns": arns[cluster]
+    }
+    scanner.ecs.describe_services.side_effect = lambda cluster, services: {
+        "services": [
+            {"serviceArn": arn, "serviceName": arn.split("/")[-1], "desiredCount": 1}
+            for arn in services
+        ]
+    }
+    _mock_tag_index(scanner, {arn: "dev" for arn in arns["cluster-a"]})
+
+    result = scanner.scan_environment("dev")
+
+    batch_sizes = [
+        len(call.kwargs["services"])
+        for call in scanner.ecs.describe_services.call_args_list
+    ]
+    assert sorted(batch_sizes) == [5, 5, 10, 10, 10, 10]
+    names = [service["service_name"] for service in result["resources"]["ecs"]]
+    assert names == [f"svc-{n:02d}" for n in range(25)]
+    scanner.ecs.list_tags_for_resource.assert_not_called()
+
+
+def test_buckets_without_region_missing_from_index_are_looked_up(
+    mock_boto3_session,
+):
+    """Test buckets the regional tag index cannot see are not dropped."""
+    scanner = AWSScanner(region="us-east-1")
+    _mock_clients(scanner)
+    scanner.s3.list_buckets.return_value = {
+        "Buckets": [
+            {"Name": "local"},
+            {"Name": "elsewhere"},
+            {"Name": "listed-elsewhere", "BucketRegion": "eu-west-1"},
+        ]
+    }
+    scanner.s3.get_bucket_tagging.return_value = {
+        "TagSet": [{"Key": "Environment", "Value": "dev"}]
+    }
+    _mock_tag_index(scanner, {"arn:aws:s3:::local": "dev"})
+
+    result = scanner.scan_environment("dev")
+
+    assert [b["bucket_name"] for b in result["resources"]["s3"]] == [
+        "local",
+        "elsewhere",
+        "listed-elsewhere",
+    ]
+    looked_up = [c.kwargs["Bucket"] for c in scanner.s3.get_bucket_tagging.mock_calls]
+    assert looked_up == ["elsewhere", "listed-elsewhere"]
+    scanner.s3.list_buckets.assert_called_once_with(
+        PaginationConfig={"PageSize": S3_LIST_PAGE_SIZE}
+    )
+
+
+def test_throttled_bucket_tagging_fails_s3_scan(mock_boto3_session):
+    """Test throttling is reported as a scan error, not a missing bucket."""
+    scanner = AWSScanner(use_tag_index=False)
+    _mock_clients(scanner)
+    scanner.s3.list_buckets.return_value = {"Buckets": [{"Name": "dev-bucket"}]}
+    scanner.s3.get_bucket_tagging.side_effect = ClientError(
+        {"Error": {"Code": "SlowDown", "Message": "slow down"}}, "GetBucketTagging"
+    )
+
+    scanner.scan_environment("dev")
+
+    assert "s3" in scanner.scan_errors["dev"]
+
+
+def _mock_functions(scanner, code_sha):
+    """Serve two tagged Lambda functions with the given code hashes."""
+    scanner.lambda_client.list_functions.return_value = {
+        "Functions": [
+            {
+                "FunctionName": name,
+                "FunctionArn": f"arn:aws:lambda:us-east-1:123456789012:function:{name}",
+                "Runtime": "python3.11",
+                "MemorySize": 128,
+                "LastModified": "2024-01-01T00:00:00.000+0000",
+                "CodeSha256": code_sha[name],
+            }
+            for name in ("api", "worker")
+        ]
+    }
+    scanner.lambda_client.list_tags.return_value = {"Tags": {"Environment": "dev"}}
+
+
+def test_incremental_scan_reuses_unchanged_resource_tags(mock_boto3_session):
+    """Test only resources whose change markers moved are looked up again."""
+    scanner = AWSScanner()
+    _mock_clients(scanner)
+    _mock_functions(scanner, {"api": "aaa", "worker": "bbb"})
+    _mock_tag_index(
+        scanner,
+        {
+            "arn:aws:lambda:us-east-1:123456789012:function:api": "dev",
+            "arn:aws:lambda:us-east-1:123456789012:function:worker": "dev",
+        },
+    )
+
+    first = scanner.scan_environment("dev", incremental=True)
+    assert len(first["change_markers"]["lambda"]) == 2
+
+    scanner.tagging.get_paginator.reset_mock()
+    _mock_functions(scanner, {"api": "aaa", "worker": "ccc"})
+    second = scanner.scan_environment("dev", incremental=True, previous=first)
+
+    scanner.tagging.get_paginator.assert_not_called()
+    scanner.lambda_client.list_tags.assert_called_once_with(
+        Resource="arn:aws:lambda:us-east-1:123456789012:function:worker"
+    )
+    assert second["resources"]["lambda"] == first["resources"]["lambda"]
+
+
+def test_incremental_snapshots_of_other_environments_keep_tags(mock_boto3_session):
+    """Test one environment's snapshot does not untag another's resources."""
+    scanner = AWSScanner()
+    _mock_clients(scanner)
+    _mock_functions(scanner, {"api": "aaa", "worker": "bbb"})
+    api = "arn:aws:lambda:us-east-1:123456789012:function:api"
+    worker = "arn:aws:lambda:us-east-1:123456789012:function:worker"
+
+    # The tag index only covers the environments being scanned
+    _mock_tag_index(scanner, {api: "dev"})
+    dev = scanner.scan_environment("dev", incremental=True)
+    _mock_tag_index(scanner, {worker: "prod"})
+    prod = scanner.scan_environment("prod", incremental=True)
+
+    result = scanner.scan_account(["dev", "prod"], previous={"dev": dev, "prod": prod})
+
+    assert [f["function_name"] for f in result["dev"]["resources"]["lambda"]] == ["api"]
+    assert [f["function_name"] for f in result["prod"]["resources"]["lambda"]] == [
+        "worker"
+    ]
+
+
+def test_incremental_scan_ignores_stale_snapshot(mock_boto3_session):
+    """Test an old snapshot triggers a full scan with the tag index."""
+    scanner = AWSScanner()
+    _mock_clients(scanner)
+    _mock_functions(scanner, {"api": "aaa", "worker": "bbb"})
+    previous = scanner.scan_environment("dev", incremental=True)
+    previous["tags_refreshed_at"] = "2020-01-01T00:00:00"
+    scanner.tagging.get_paginator.reset_mock()
+
+    scanner.scan_environment("dev", incremental=True, previous=previous)
+
+    scanner.tagging.get_paginator.assert_called_once()
+    scanner.lambda_client.list_tags.assert_not_called()
+
+
+def test_incremental_scan_always_resolves_rds_tags(mock_boto3_session):
+    """Test RDS tags are never reused from a snapshot."""
+    scanner = AWSScanner()
+    _mock_clients(scanner)
+    scanner.rds.describe_db_instances.return_value = {
+        "DBInstances": [
+            {
+                "DBInstanceArn": f"arn:aws:rds:us-east-1:123456789012:db:{name}",
+                "DBInstanceIdentifier": name,
+                "DBInstanceClass": "db.t3.micro",
+                "Engine": "postgres",
+                **extra,
+            }
+            for name, extra in (
+                ("described", {"TagList": [{"Key": "Environment", "Value": "dev"}]}),
+                ("untagged-response", {}),
+            )
+        ]
+    }
+    scanner.rds.list_tags_for_resource.return_value = {
+        "TagList": [{"Key": "Environment", "Value": "dev"}]
+    }
+    first = scanner.scan_environment("dev", incremental=True)
+    assert "rds" not in first["change_markers"]
+
+    scanner.scan_environment("dev", incremental=True, previous=first)
+    scanner.rds.list_tags_for_resource.assert_called_once_with(
+        ResourceName="arn:aws:rds:us-east-1:123456789012:db:untagged-response"
+    )
+
+    # A retag shows up on the next scan, however recent the snapshot
+    scanner.rds.describe_db_instances.return_value["DBInstances"][0]["TagList"] = [
+        {"Key": "Environment", "Value": "prod"}
+    ]
+    third = scanner.scan_environment("dev", incremental=True, previous=first)
+    assert [db["db_instance_identifier"] for db in third["resources"]["rds"]] == [
+        "untagged-response"
+    ]
+
+
+def test_incremental_scans_refresh_tags_after_max_age(mock_boto3_session):
+    """Test chained incremental scans still pick up retags once tags age out."""
+    start = datetime(2024, 1, 1)
+
+    class Clock(datetime):
+        now = start
+
+        @classmethod
+        def utcnow(cls):
+            return cls.now
+
+    scanner = AWSScanner()
+    _mock_clients(scanner)
+    _mock_functions(scanner, {"api": "aaa", "worker": "bbb"})
+    arn = "arn:aws:lambda:us-east-1:123456789012:function:api"
+    _mock_tag_index(scanner, {arn: "dev"})
+    environments = ["dev", "prod"]
+
+    with patch("drift_detection.scanner.datetime", Clock):
+        first = scanner.scan_account(environments, previous={})
+        # Retagging moves no change marker
+        _mock_tag_index(scanner, {arn: "prod"})
+        scanner.lambda_client.list_tags.side_effect = lambda Resource: {
+            "Tags": {"Environment": "prod"} if Resource == arn else {}
+        }
+
+        Clock.now = start + timedelta(minutes=40)
+        second = scanner.scan_account(environments, previous=first)
+        Clock.now = start + timedelta(minutes=70)
+        third = scanner.scan_account(environments, previous=second)
+
+    assert second["dev"]["tags_refreshed_at"] == first["dev"]["tags_refreshed_at"]
+    assert second["prod"]["resources"]["lambda"] == []
+    assert [f["function_name"] for f in third["prod"]["resources"]["lambda"]] == ["api"]
+    assert third["dev"]["tags_refreshed_at"] == Clock.now.isoformat()
+
+
+def test_clients_created_on_first_use(mock_boto3_session):
+    """Test no AWS clients are built until a scanner attribute is used."""
+    scanner = AWSScanner()
+    session = mock_boto3_session.return_value
+    session.client.assert_not_called()
+
+    assert scanner.rds is scanner.rds
+    assert session.client.call_count == 1
+    assert session.client.call_args.args == ("rds",)
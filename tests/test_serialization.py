@@ -0,0 +1,58 @@
+"""Tests for snapshot serialization formats."""
+
+import pytest
+
+from drift_detection.serialization import StorageFormat, decode
+
+DOC = {
+    "environment": "dev",
+    "resources": {"ec2": [{"id": "i-1", "tags": {"Environment": "dev"}}] * 50},
+}
+
+
+@pytest.mark.parametrize("name", ["json", "json-pretty", "json+gzip"])
+def test_round_trip(name):
+    """Test each built-in format decodes back to the original document."""
+    fmt = StorageFormat(name)
+    body = fmt.encode(DOC)
+
+    assert decode(body, fmt.content_type, fmt.content_encoding) == DOC
+
+
+@pytest.mark.parametrize(
+    "name,module", [("json+zstd", "zstandard"), ("msgpack+gzip", "msgpack")]
+)
+def test_round_trip_optional(name, module):
+    """Test formats backed by optional dependencies."""
+    pytest.importorskip(module)
+    fmt = StorageFormat(name)
+
+    assert decode(fmt.encode(DOC), fmt.content_type, fmt.content_encoding) == DOC
+
+
+def test_compression_shrinks_snapshot():
+    """Test compressed output is much smaller than pretty JSON."""
+    pretty = StorageFormat("json-pretty").encode(DOC)
+    compressed = StorageFormat("json+gzip").encode(DOC)
+
+    assert len(compressed) * 5 < len(pretty)
+
+
+def test_decode_sniffs_compression_without_metadata():
+    """Test objects missing Content-Encoding are still decoded."""
+    body = StorageFormat("json+gzip").encode(DOC)
+
+    assert decode(body) == DOC
+
+
+def test_put_args():
+    """Test S3 metadata only carries an encoding when compressed."""
+    assert StorageFormat("json").put_args() == {"ContentType": "application/json"}
+    assert StorageFormat("json+gzip").put_args()["ContentEncoding"] == "gzip"
+
+
+@pytest.mark.parametrize("name", ["yaml", "json+lz4"])
+def test_unknown_format(name):
+    """Test unknown serializers and compressions are rejected."""
+    with pytest.raises(ValueError):
+        StorageFormat(name)
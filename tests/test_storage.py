@@ -1,12 +1,20 @@
 """Tests for S3 storage module."""
 
+import gzip
 import json
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 import pytest
 from botocore.exceptions import ClientError
 
-from drift_detection.storage import S3Storage
+from drift_detection.cache import LocalCache
+from drift_detection.storage import (
+    LocalStorage,
+    MemoryStorage,
+    S3Storage,
+    open_storage,
+)
 
 
 @pytest.fixture
@@ -16,6 +24,13 @@ def mock_s3_client():
         yield mock.return_value
 
 
+@pytest.fixture
+def small_parts():
+    """Allow tiny parts so multipart paths run on small documents."""
+    with patch("drift_detection.storage.MIN_PART_SIZE", 1):
+        yield
+
+
 def test_save_baseline(mock_s3_client):
     """Test saving baseline to S3."""
     storage = S3Storage(bucket_name="test-bucket")
@@ -53,3 +68,300 @@ def test_load_baseline_not_found(mock_s3_client):
     result = storage.load_baseline("dev")
 
     assert result is None
+
+
+def test_snapshot_round_trip_key(mock_s3_client):
+    """Test incremental snapshots live under a fixed latest key."""
+    storage = S3Storage(bucket_name="test-bucket")
+
+    key = storage.save_snapshot("dev", {"environment": "dev"})
+
+    assert key == "snapshots/dev/latest.json"
+
+
+def test_save_compresses_with_metadata(mock_s3_client):
+    """Test objects are written compressed with matching S3 metadata."""
+    storage = S3Storage(bucket_name="test-bucket", storage_format="json+gzip")
+    data = {"environment": "dev", "resources": {"ec2": []}}
+
+    storage.save_baseline("dev", data)
+
+    kwargs = mock_s3_client.put_object.call_args.kwargs
+    assert kwargs["Key"] == "baselines/dev/baseline.json"
+    assert kwargs["ContentType"] == "application/json"
+    assert kwargs["ContentEncoding"] == "gzip"
+    assert (
+        gzip.decompress(kwargs["Body"])
+        == b'{"environment":"dev","resources":{"ec2":[]}}'
+    )
+
+
+def test_load_reads_legacy_and_compressed(mock_s3_client):
+    """Test loads accept both plain pretty JSON and compressed objects."""
+    storage = S3Storage(bucket_name="test-bucket")
+    data = {"environment": "dev"}
+    legacy = json.dumps(data, indent=2).encode()
+    compressed = gzip.compress(json.dumps(data).encode())
+
+    for body, extra in ((legacy, {}), (compressed, {"ContentEncoding": "gzip"})):
+        mock_s3_client.get_object.return_value = {
+            "Body": MagicMock(read=lambda body=body: body),
+            **extra,
+        }
+        assert storage.load_baseline("dev") == data
+
+
+def test_cached_baseline_revalidates_with_etag(mock_s3_client, tmp_path):
+    """Test an unchanged baseline is served from cache after a 304."""
+    storage = S3Storage(
+        bucket_name="test-bucket", cache=LocalCache(str(tmp_path), max_bytes=4096)
+    )
+    body = json.dumps({"environment": "dev"}).encode()
+    mock_s3_client.get_object.return_value = {
+        "Body": MagicMock(read=lambda: body),
+        "ETag": '"v1"',
+    }
+    assert storage.load_baseline("dev") == {"environment": "dev"}
+
+    mock_s3_client.get_object.side_effect = ClientError(
+        {"Error": {"Code": "304", "Message": "Not Modified"}}, "GetObject"
+    )
+    assert storage.load_baseline("dev") == {"environment": "dev"}
+
+    assert mock_s3_client.get_object.call_args.kwargs["IfNoneMatch"] == '"v1"'
+    assert storage.cache.stats()["hits"] == 1
+    assert storage.cache.stats()["misses"] == 1
+
+
+def test_save_scan_deduplicates_records(mock_s3_client):
+    """Test scans are manifests and unchanged records are uploaded once."""
+    storage = S3Storage(bucket_name="test-bucket", transfer_workers=1)
+    mock_s3_client.get_object.side_effect = ClientError(
+        {"Error": {"Code": "NoSuchKey", "Message": "Not found"}}, "GetObject"
+    )
+    scan = {
+        "environment": "dev",
+        "resources": {"ec2": [{"id": "i-1"}, {"id": "i-2"}], "s3": []},
+    }
+
+    storage.save_scan("dev", scan)
+    scan["resources"]["ec2"].append({"id": "i-3"})
+    key = storage.save_scan("dev", scan)
+
+    bodies = {
+        c.kwargs["Key"]: c.kwargs["Body"]
+        for c in mock_s3_client.put_object.call_args_list
+    }
+    assert len([k for k in bodies if k.startswith("objects/")]) == 3
+    manifest = gzip.decompress(bodies[key])
+    assert len(json.loads(manifest)["resources"]["ec2"]) == 3
+
+
+def test_load_scan_reassembles_manifest():
+    """Test a saved scan round-trips through manifest and objects."""
+    objects = {}
+
+    def put_object(Key, Body, **kwargs):
+        objects[Key] = {"Body": Body, **kwargs}
+        return {"ETag": '"etag"'}
+
+    def get_object(Key, **kwargs):
+        if Key not in objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        stored = dict(objects[Key])
+        body = stored.pop("Body")
+        return {"Body": MagicMock(read=lambda: body), **stored}
+
+    with patch("drift_detection.storage.boto3.client") as client:
+        client.return_value.put_object.side_effect = put_object
+        client.return_value.get_object.side_effect = get_object
+        storage = S3Storage(bucket_name="test-bucket")
+        scan = {
+            "environment": "dev",
+            "timestamp": "2024-01-01T00:00:00",
+            "resources": {"ec2": [{"id": "i-1"}, {"id": "i-1"}], "rds": []},
+        }
+
+        key = storage.save_scan("dev", scan)
+
+        assert storage.load_scan(key) == scan
+
+
+def test_load_scan_names_missing_object():
+    """Test a manifest pointing at a deleted object fails with its digest."""
+    objects = {}
+
+    def put_object(Key, Body, **kwargs):
+        objects[Key] = Body
+        return {}
+
+    def get_object(Key, **kwargs):
+        if Key not in objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return {"Body": MagicMock(read=lambda: objects[Key])}
+
+    with patch("drift_detection.storage.boto3.client") as client:
+        client.return_value.put_object.side_effect = put_object
+        client.return_value.get_object.side_effect = get_object
+        storage = S3Storage(bucket_name="test-bucket", storage_format="json")
+        key = storage.save_scan(
+            "dev", {"resources": {"ec2": [{"id": "i-1"}, {"id": "i-2"}]}}
+        )
+        deleted = sorted(k for k in objects if k.startswith("objects/"))[0]
+        del objects[deleted]
+
+        with pytest.raises(ValueError, match=f"{key}.*{deleted}$"):
+            storage.load_scan(key)
+
+
+def test_reports_are_cataloged_and_queryable():
+    """Test saved reports can be found by time and risk without bodies."""
+    objects = {}
+
+    def put_object(Key, Body, **kwargs):
+        objects[Key] = Body
+        return {}
+
+    def get_object(Key, **kwargs):
+        if Key not in objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return {"Body": MagicMock(read=lambda: objects[Key])}
+
+    with patch("drift_detection.storage.boto3.client") as client:
+        client.return_value.put_object.side_effect = put_object
+        client.return_value.get_object.side_effect = get_object
+        storage = S3Storage(bucket_name="test-bucket")
+        for risk in ("low", "critical", "high"):
+            storage.save_report(
+                "prod",
+                {
+                    "drift_detected": True,
+                    "risk_assessment": {"overall_risk": risk},
+                    "cost_impact": {"monthly_impact": 10.0},
+                },
+            )
+
+        since = datetime.utcnow() - timedelta(days=30)
+        entries = storage.query_history(
+            "prod", kind="report", since=since, min_risk="high"
+        )
+
+    assert [e.overall_risk for e in entries] == ["critical", "high"]
+    assert len({e.key for e in storage.query_history("prod")}) == 3
+    assert entries[0].cost_impact == 10.0
+
+
+def test_large_documents_use_multipart_upload(mock_s3_client, small_parts):
+    """Test documents larger than one part are streamed as a multipart upload."""
+    storage = S3Storage(bucket_name="test-bucket", storage_format="json", part_size=64)
+    mock_s3_client.create_multipart_upload.return_value = {"UploadId": "u-1"}
+    mock_s3_client.upload_part.side_effect = lambda **kw: {
+        "ETag": f'"{kw["PartNumber"]}"'
+    }
+    data = {"resources": {"ec2": [{"id": f"i-{i}"} for i in range(20)]}}
+
+    storage.save_baseline("dev", data)
+
+    mock_s3_client.put_object.assert_not_called()
+    calls = mock_s3_client.upload_part.call_args_list
+    assert json.loads(b"".join(c.kwargs["Body"] for c in calls)) == data
+    parts = mock_s3_client.complete_multipart_upload.call_args.kwargs[
+        "MultipartUpload"
+    ]["Parts"]
+    assert [p["PartNumber"] for p in parts] == list(range(1, len(calls) + 1))
+
+
+def test_multipart_upload_aborts_on_failure(mock_s3_client, small_parts):
+    """Test a failed part aborts the upload instead of leaving it open."""
+    storage = S3Storage(bucket_name="test-bucket", storage_format="json", part_size=8)
+    mock_s3_client.create_multipart_upload.return_value = {"UploadId": "u-1"}
+    mock_s3_client.upload_part.side_effect = ClientError(
+        {"Error": {"Code": "InternalError"}}, "UploadPart"
+    )
+
+    with pytest.raises(ClientError):
+        storage.save_baseline("dev", {"resources": {"ec2": ["x" * 32]}})
+
+    mock_s3_client.abort_multipart_upload.assert_called_once()
+    mock_s3_client.complete_multipart_upload.assert_not_called()
+
+
+def test_part_size_below_s3_minimum_rejected(mock_s3_client):
+    """Test parts S3 would refuse mid-upload are rejected up front."""
+    with pytest.raises(ValueError, match="part_size"):
+        S3Storage(bucket_name="test-bucket", part_size=5 * 1024 * 1024 - 1)
+
+    S3Storage(bucket_name="test-bucket", part_size=5 * 1024 * 1024)
+
+
+def test_load_fetches_ranges_in_parallel(mock_s3_client, small_parts):
+    """Test large objects are read as ranged GETs and decoded in order."""
+    data = {"resources": {"ec2": [{"id": f"i-{i}"} for i in range(50)]}}
+    body = gzip.compress(json.dumps(data).encode())
+
+    def get_object(Bucket, Key, Range, **kwargs):
+        start, end = (int(n) for n in Range[len("bytes=") :].split("-"))
+        return {
+            "Body": MagicMock(read=lambda: body[start : end + 1]),
+            "ContentRange": f"bytes {start}-{end}/{len(body)}",
+            "ContentEncoding": "gzip",
+            "ETag": '"v1"',
+        }
+
+    mock_s3_client.get_object.side_effect = get_object
+    storage = S3Storage(bucket_name="test-bucket", part_size=16)
+
+    assert storage.load_baseline("dev") == data
+    ranged = mock_s3_client.get_object.call_args_list[1:]
+    assert len(ranged) == (len(body) - 1) // 16
+    assert all(c.kwargs["IfMatch"] == '"v1"' for c in ranged)
+
+
+@pytest.fixture(params=["local", "memory"])
+def offline_storage(request, tmp_path):
+    """Storage backends that need no AWS access."""
+    if request.param == "local":
+        return LocalStorage(str(tmp_path))
+    return MemoryStorage()
+
+
+def test_offline_backends_round_trip(offline_storage):
+    """Test local and in-memory backends run the full storage pipeline."""
+    scan = {"environment": "dev", "resources": {"ec2": [{"id": "i-1"}]}}
+
+    assert offline_storage.load_baseline("dev") is None
+    offline_storage.save_baseline("dev", scan)
+    key = offline_storage.save_scan("dev", scan)
+    offline_storage.save_report("dev", {"drift_detected": False})
+
+    assert offline_storage.load_baseline("dev") == scan
+    assert offline_storage.load_scan(key) == scan
+    assert [e.kind for e in offline_storage.query_history("dev")] == [
+        "scan",
+        "report",
+    ]
+
+
+def test_local_storage_reads_any_format(tmp_path):
+    """Test files written in one format load after switching formats."""
+    LocalStorage(str(tmp_path), storage_format="json-pretty").save_baseline(
+        "dev", {"environment": "dev"}
+    )
+
+    assert LocalStorage(str(tmp_path)).load_baseline("dev") == {"environment": "dev"}
+
+
+def test_local_storage_rejects_escaping_keys(tmp_path):
+    """Test keys cannot address files outside the storage root."""
+    with pytest.raises(ValueError):
+        LocalStorage(str(tmp_path)).load_baseline("../../etc")
+
+
+def test_open_storage_schemes(tmp_path, mock_s3_client):
+    """Test storage URIs select the matching backend."""
+    assert isinstance(open_storage("s3://bucket"), S3Storage)
+    assert open_storage("bucket").bucket_name == "bucket"
+    assert open_storage(f"file://{tmp_path}").root == str(tmp_path)
+    assert open_storage("mem://shared") is open_storage("mem://shared")
+    with pytest.raises(ValueError):
+        open_storage("ftp://host/dir")
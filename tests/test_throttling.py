@@ -0,0 +1,102 @@
+"""Tests for shared AWS rate limiting."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from drift_detection.throttling import AdaptiveRateLimiter, TokenBucket
+
+
+class FakeClock:
+    """Deterministic clock whose sleep advances time."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """Create a fake clock."""
+    return FakeClock()
+
+
+def test_token_bucket_paces_after_burst(clock):
+    """Test callers wait once the burst capacity is spent."""
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.5)
+    assert waits[3] == pytest.approx(0.5)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_limiter_backs_off_and_recovers(clock):
+    """Test throttles cut the service rate and successes restore it."""
+    limiter = AdaptiveRateLimiter(
+        max_rate=10.0, min_rate=1.0, recovery=1.0, clock=clock, sleep=clock.sleep
+    )
+    limiter.acquire("ec2")
+
+    limiter.record_throttle("ec2")
+    limiter.record_throttle("ec2")
+    assert limiter.metrics()["ec2"]["rate"] == 2.5
+
+    for _ in range(3):
+        limiter.record_success("ec2")
+    assert limiter.metrics()["ec2"]["rate"] == 5.5
+
+    for _ in range(10):
+        limiter.record_throttle("ec2")
+    assert limiter.metrics()["ec2"]["rate"] == 1.0
+    assert limiter.metrics()["ec2"]["throttles"] == 12
+
+
+def test_throttle_shrinks_burst_to_new_rate(clock):
+    """Test a throttled service cannot burst at its old rate."""
+    limiter = AdaptiveRateLimiter(
+        max_rate=8.0, min_rate=1.0, clock=clock, sleep=clock.sleep
+    )
+    limiter.acquire("s3")
+
+    limiter.record_throttle("s3")
+
+    bucket = limiter._buckets["s3"]
+    assert bucket.capacity == 4.0
+    assert bucket.tokens == 4.0
+    waits = [limiter.acquire("s3") for _ in range(5)]
+    assert waits[:4] == [0.0] * 4
+    assert waits[4] == pytest.approx(0.25)
+
+
+def test_limiter_hooks_count_requests_retries_and_throttles(clock):
+    """Test client event hooks feed the shared metrics."""
+    limiter = AdaptiveRateLimiter(clock=clock, sleep=clock.sleep)
+    client = MagicMock()
+    client.meta.service_model.service_name = "rds"
+    handlers = {}
+    client.meta.events.register.side_effect = lambda event, handler: handlers.update(
+        {event: handler}
+    )
+
+    limiter.attach(client)
+    handlers["before-send"](request=MagicMock(context={"retries": {"attempt": 1}}))
+    handlers["needs-retry"](
+        response=(MagicMock(), {"Error": {"Code": "Throttling"}}), attempts=1
+    )
+    handlers["before-send"](request=MagicMock(context={"retries": {"attempt": 2}}))
+    handlers["after-call"](http_response=MagicMock(status_code=200))
+
+    metrics = limiter.metrics()["rds"]
+    assert metrics["requests"] == 2
+    assert metrics["retries"] == 1
+    assert metrics["throttles"] == 1